@@ -5,3 +5,8 @@ class APIConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "contro.apps.api"
     verbose_name = "API"
+
+    def ready(self):
+        from contro.apps.api.cache import register_cache_invalidation
+
+        register_cache_invalidation()
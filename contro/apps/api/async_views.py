@@ -0,0 +1,199 @@
+"""Async list and retrieve for content reads, served natively under ASGI.
+
+The views reuse ``DynamicContentViewSet`` for everything that does not touch
+the database (negotiation, field selection, caching, rendering) and run the
+queries on the async ORM. Requests they do not cover fall through to the
+synchronous viewset: writes, ``populate``, formats other than JSON, and reads
+while compiled serializers are disabled.
+"""
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.response import Response
+
+from contro.apps.api.cache import aget_cached_response, aresponse_key, astore_response
+from contro.apps.api.conditional import alist_validators, detail_validators, not_modified_response
+from contro.apps.api.encoding import aiter_array
+from contro.apps.api.permissions import ahas_content_permission
+from contro.apps.api.views import STREAM_CHUNK_SIZE
+from contro.apps.content.services.registry import aget_content_type
+from contro.apps.content.services.schema import aget_dynamic_model_by_slug
+from contro.apps.content.services.serializers import get_read_serializer
+from contro.apps.iam.authentication import aauthenticate
+
+
+ASYNC_FORMATS = {"json"}
+
+
+def async_content_view(sync_view):
+    """Wrap a ``DynamicContentViewSet.as_view(...)`` view: GET reads run natively, the rest in a thread."""
+    fallback = sync_to_async(sync_view)
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        if request.method != "GET":
+            return await fallback(request, *args, **kwargs)
+        viewset = _setup_viewset(sync_view, request, args, kwargs)
+        try:
+            response = await _read(viewset)
+        except Exception as exc:
+            response = viewset.handle_exception(exc)
+        if response is None:
+            return await fallback(request, *args, **kwargs)
+        return _finalize(viewset, response)
+
+    return view
+
+
+def _setup_viewset(sync_view, request, args, kwargs):
+    """What ``ViewSetMixin.as_view`` and ``APIView.dispatch`` do before the handler runs."""
+    viewset = sync_view.cls(**sync_view.initkwargs)
+    viewset.action_map = sync_view.actions
+    for method, action in sync_view.actions.items():
+        setattr(viewset, method, getattr(viewset, action))
+    if hasattr(viewset, "get") and not hasattr(viewset, "head"):
+        viewset.head = viewset.get
+    viewset.args, viewset.kwargs = args, kwargs
+    viewset.request = viewset.initialize_request(request, *args, **kwargs)
+    viewset.headers = viewset.default_response_headers
+    return viewset
+
+
+async def _read(viewset):
+    request = viewset.request
+    viewset.format_kwarg = viewset.get_format_suffix(**viewset.kwargs)
+    request.accepted_renderer, request.accepted_media_type = viewset.perform_content_negotiation(request)
+    if (
+        request.accepted_renderer.format not in ASYNC_FORMATS
+        or request.query_params.get("populate")
+        or not settings.CONTRO_API_COMPILED_SERIALIZERS
+    ):
+        return None
+
+    result = await aauthenticate(request)
+    if result is None:
+        request._not_authenticated()
+    else:
+        request.user, request.auth = result
+
+    content_type = await aget_content_type(viewset.kwargs["content_type"], active_only=True)
+    if content_type is None:
+        raise Http404("No content type matches the given query.")
+    model = await aget_dynamic_model_by_slug(content_type.slug)
+    viewset.content_type = content_type
+    viewset.model = model
+    viewset._model = model
+    if not await ahas_content_permission(request, model):
+        _permission_denied(request)
+
+    if viewset.action == "list":
+        return await _list(viewset)
+    return await _retrieve(viewset)
+
+
+async def _list(viewset):
+    request = viewset.request
+    cache_key = await _aresponse_cache_key(viewset)
+    if cache_key is not None:
+        cached = await aget_cached_response(cache_key)
+        if cached is not None:
+            return viewset._cached_response(cached)
+    queryset = await _afilter_queryset(viewset, viewset.get_queryset())
+    validators = None
+    if await viewset.paginator.acounts_exactly(queryset, request, view=viewset):
+        validators = await alist_validators(queryset, viewset.content_type.schema_generation, viewset._variant())
+        not_modified = not_modified_response(request, validators)
+        if not_modified is not None:
+            return not_modified
+        viewset.known_count = validators.total
+
+    compiled = get_read_serializer(viewset.model, viewset.get_requested_fields())
+    queryset = queryset.values(*viewset._list_columns(compiled))
+    page = await viewset.paginator.apaginate_queryset(queryset, request, view=viewset)
+    if page is not None:
+        response = viewset.get_paginated_response(await compiled.aserialize_rows(page))
+    elif viewset._streams_list():
+        response = viewset._streaming_response(aiter_array(compiled.aiter_chunks(queryset, STREAM_CHUNK_SIZE)))
+    else:
+        response = Response(await compiled.aserialize_rows([row async for row in queryset]))
+    if validators is not None:
+        return await _afinalize_read(viewset, response, validators, cache_key)
+    validators = viewset._page_validators()
+    response = await _afinalize_read(viewset, response, validators, cache_key)
+    not_modified = not_modified_response(request, validators) if validators is not None else None
+    return not_modified if not_modified is not None else response
+
+
+async def _retrieve(viewset):
+    request = viewset.request
+    queryset = await _afilter_queryset(viewset, viewset.get_queryset())
+    try:
+        instance = await queryset.aget(pk=viewset.kwargs["pk"])
+    except (queryset.model.DoesNotExist, TypeError, ValueError, DjangoValidationError):
+        raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+    if not await ahas_content_permission(request, viewset.model, obj=instance):
+        _permission_denied(request)
+    cache_key = await _aresponse_cache_key(viewset) if instance.is_published else None
+    if cache_key is not None:
+        cached = await aget_cached_response(cache_key)
+        if cached is not None:
+            return viewset._cached_response(cached)
+
+    validators = detail_validators(instance, viewset.content_type.schema_generation, viewset._variant())
+    not_modified = not_modified_response(request, validators)
+    if not_modified is not None:
+        return not_modified
+    compiled = get_read_serializer(viewset.model, viewset.get_requested_fields())
+    response = Response(await compiled.aserialize_instance(instance))
+    return await _afinalize_read(viewset, response, validators, cache_key)
+
+
+async def _aresponse_cache_key(viewset) -> str | None:
+    """Async ``DynamicContentViewSet._response_cache_key``."""
+    if not viewset._caches_response():
+        return None
+    content_type = viewset.content_type
+    return await aresponse_key(viewset.request, content_type.slug, content_type.schema_generation, viewset._variant())
+
+
+async def _afinalize_read(viewset, response, validators, cache_key):
+    """Async ``DynamicContentViewSet._finalize_read``."""
+    response = viewset._finalize_read(response, validators, None)
+    if cache_key is not None and response.status_code == status.HTTP_200_OK:
+        await astore_response(cache_key, viewset._cache_entry(response, validators))
+        response["X-Cache"] = "MISS"
+    return response
+
+
+async def _afilter_queryset(viewset, queryset):
+    # The stock backends only build querysets; ours may check table sizes for the index policy.
+    for backend_class in viewset.filter_backends:
+        backend = backend_class()
+        if hasattr(backend, "afilter_queryset"):
+            queryset = await backend.afilter_queryset(viewset.request, queryset, viewset)
+        else:
+            queryset = backend.filter_queryset(viewset.request, queryset, viewset)
+    return queryset
+
+
+def _permission_denied(request):
+    if not request.user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    raise exceptions.PermissionDenied()
+
+
+def _finalize(viewset, response) -> HttpResponse:
+    response = viewset.finalize_response(viewset.request, response, *viewset.args, **viewset.kwargs)
+    if not hasattr(response, "render"):
+        return response
+    # A plain copy, since the async handler would render a template-like response in a thread.
+    response.render()
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    return plain
@@ -0,0 +1,151 @@
+"""Response cache for content reads, invalidated through content hooks."""
+from __future__ import annotations
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from contro.apps.content.services.hooks import register_hook
+from contro.apps.iam.authentication import ApiTokenCredentials
+
+
+KEY_PREFIX = "contro:api"
+HITS_KEY = f"{KEY_PREFIX}:stats:hits"
+MISSES_KEY = f"{KEY_PREFIX}:stats:misses"
+
+# Every write event that can change what a read returns.
+INVALIDATING_EVENTS = (
+    "post_create",
+    "post_update",
+    "post_delete",
+    "post_publish",
+    "post_unpublish",
+    "post_bulk_create",
+    "post_bulk_update",
+    "post_bulk_delete",
+)
+
+
+def cache_enabled() -> bool:
+    return settings.CONTRO_API_CACHE_TIMEOUT > 0
+
+
+def get_cache():
+    return caches[settings.CONTRO_API_CACHE_ALIAS]
+
+
+def content_type_version(slug: str) -> int:
+    """Current key version of ``slug``; bumping it orphans every cached response."""
+    cache = get_cache()
+    key = _version_key(slug)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, 0)
+    return version
+
+
+async def acontent_type_version(slug: str) -> int:
+    cache = get_cache()
+    key = _version_key(slug)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), None)
+        version = await cache.aget(key, 0)
+    return version
+
+
+def invalidate_content_type(slug: str) -> None:
+    cache = get_cache()
+    key = _version_key(slug)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def permission_scope(request) -> str:
+    """Who the response was produced for: anonymous, an API token, or a user."""
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return "anonymous"
+    auth = getattr(request, "auth", None)
+    if isinstance(auth, ApiTokenCredentials):
+        return f"token:{auth.token.pk}"
+    return f"user:{user.pk}"
+
+
+def response_key(request, slug: str, schema_generation: int, variant: str) -> str:
+    return _response_key(request, slug, content_type_version(slug), schema_generation, variant)
+
+
+async def aresponse_key(request, slug: str, schema_generation: int, variant: str) -> str:
+    return _response_key(request, slug, await acontent_type_version(slug), schema_generation, variant)
+
+
+def get_cached_response(key: str) -> dict | None:
+    entry = get_cache().get(key)
+    _count(HITS_KEY if entry is not None else MISSES_KEY)
+    return entry
+
+
+async def aget_cached_response(key: str) -> dict | None:
+    entry = await get_cache().aget(key)
+    await _acount(HITS_KEY if entry is not None else MISSES_KEY)
+    return entry
+
+
+def store_response(key: str, entry: dict) -> None:
+    get_cache().set(key, entry, settings.CONTRO_API_CACHE_TIMEOUT)
+
+
+async def astore_response(key: str, entry: dict) -> None:
+    await get_cache().aset(key, entry, settings.CONTRO_API_CACHE_TIMEOUT)
+
+
+def cache_stats() -> dict[str, int]:
+    values = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    return {"hits": values.get(HITS_KEY, 0), "misses": values.get(MISSES_KEY, 0)}
+
+
+def register_cache_invalidation() -> None:
+    for event in INVALIDATING_EVENTS:
+        register_hook("*", event, _invalidate_on_write)
+
+
+def _invalidate_on_write(instance=None, instances=None, **kwargs) -> None:
+    if not cache_enabled():
+        return
+    entry = instance if instance is not None else (instances[0] if instances else None)
+    slug = getattr(entry, "__content_type_slug__", None)
+    if slug:
+        invalidate_content_type(slug)
+
+
+def _response_key(request, slug: str, version: int, schema_generation: int, variant: str) -> str:
+    # The absolute URL, since pagination links embed the host.
+    digest = hashlib.sha1(f"{request.build_absolute_uri()}|{variant}".encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{slug}:{version}:{schema_generation}:{permission_scope(request)}:{digest}"
+
+
+def _count(key: str) -> None:
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+async def _acount(key: str) -> None:
+    cache = get_cache()
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 1, None)
+
+
+def _version_key(slug: str) -> str:
+    return f"{KEY_PREFIX}:version:{slug}"
@@ -0,0 +1,99 @@
+"""ETag / Last-Modified validators for content reads."""
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+@dataclass
+class Validators:
+    etag: str
+    last_modified: datetime | None
+    # Row count of a list, when the validators were computed from one.
+    total: int | None = None
+
+    @property
+    def timestamp(self) -> int | None:
+        return int(self.last_modified.timestamp()) if self.last_modified else None
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag over ``parts``.
+
+    ``variant`` parts identify the representation (format, query string), so
+    different projections of the same rows never share a tag.
+    """
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f"W/{quote_etag(digest)}"
+
+
+def detail_validators(instance, schema_generation: int, variant: str = "") -> Validators:
+    updated_at = getattr(instance, "updated_at", None)
+    opts = instance._meta
+    etag = make_etag(opts.label, instance.pk, updated_at.isoformat() if updated_at else "", schema_generation, variant)
+    return Validators(etag=etag, last_modified=updated_at)
+
+
+def list_validators(queryset, schema_generation: int, variant: str = "") -> Validators:
+    """Validators from one aggregate query: latest ``updated_at`` and row count.
+
+    The count catches deletions that leave the latest timestamp unchanged.
+    """
+    aggregate = queryset.order_by().aggregate(last=Max("updated_at"), total=Count("pk"))
+    return _list_validators(queryset.model, aggregate, schema_generation, variant)
+
+
+async def alist_validators(queryset, schema_generation: int, variant: str = "") -> Validators:
+    aggregate = await queryset.order_by().aaggregate(last=Max("updated_at"), total=Count("pk"))
+    return _list_validators(queryset.model, aggregate, schema_generation, variant)
+
+
+def _list_validators(model_class: type, aggregate: dict, schema_generation: int, variant: str) -> Validators:
+    last = aggregate["last"]
+    etag = make_etag(
+        model_class._meta.label,
+        last.isoformat() if last else "",
+        aggregate["total"],
+        schema_generation,
+        variant,
+    )
+    return Validators(etag=etag, last_modified=last, total=aggregate["total"])
+
+
+def page_validators(model_class: type, rows, schema_generation: int, variant: str = "", *extra) -> Validators:
+    """Validators from the rows of one page: their ids and ``updated_at``.
+
+    For lists that skip the exact count; nothing beyond the page is read. The
+    cursor is part of ``variant``, and ``extra`` carries the rest of the page
+    body, such as whether a next page exists.
+    """
+    stamps = []
+    last = None
+    for row in rows:
+        # Rows are instances, or dicts when the view reads ``.values()``.
+        pk, updated_at = (row["id"], row["updated_at"]) if isinstance(row, dict) else (row.pk, row.updated_at)
+        stamps.append(f"{pk}:{updated_at.isoformat() if updated_at else ''}")
+        if updated_at is not None and (last is None or updated_at > last):
+            last = updated_at
+    etag = make_etag(model_class._meta.label, ",".join(stamps), *extra, schema_generation, variant)
+    return Validators(etag=etag, last_modified=last)
+
+
+def not_modified_response(request, validators: Validators):
+    """Return a 304 (or 412) response when the request's preconditions say so, else ``None``."""
+    django_request = getattr(request, "_request", request)
+    response = get_conditional_response(django_request, etag=validators.etag, last_modified=validators.timestamp)
+    if response is not None:
+        set_validator_headers(response, validators)
+    return response
+
+
+def set_validator_headers(response, validators: Validators) -> None:
+    response["ETag"] = validators.etag
+    if validators.last_modified is not None:
+        response["Last-Modified"] = http_date(validators.timestamp)
@@ -0,0 +1,77 @@
+"""JSON encoding for the REST and GraphQL APIs, through orjson when it is installed.
+
+``dumps`` produces what DRF's ``JSONRenderer`` does with its default settings
+(compact, UTF-8, U+2028/U+2029 escaped) and runs dates, times, datetimes and
+decimals through DRF's ``JSONEncoder``, so they encode identically. Floats
+outside 1e-4..1e16 are written without a ``+`` or leading zeros in the
+exponent (``1e16``, not ``1e+16``), which parses to the same value. Without
+orjson, or for values it rejects (integers wider than 64 bits, non-string
+keys), the stdlib encoder is used.
+"""
+from __future__ import annotations
+
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_DRF_ENCODER = JSONEncoder()
+_LINE_SEPARATORS = ((b"\xe2\x80\xa8", b"\\u2028"), (b"\xe2\x80\xa9", b"\\u2029"))
+
+
+def dumps(data) -> bytes:
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(data, default=_DRF_ENCODER.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            pass
+        else:
+            return _escape_line_separators(encoded)
+    encoded = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return _escape_line_separators(encoded.encode("utf-8"))
+
+
+def loads(data: bytes | str):
+    """Decode JSON; raises ``ValueError`` for invalid input, including NaN and Infinity."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data, parse_constant=_reject_constant)
+
+
+def iter_array(chunks: Iterable[list]) -> Iterator[bytes]:
+    """Encode one JSON array from ``chunks`` of items, a chunk at a time."""
+    yield b"["
+    separator = b""
+    for chunk in chunks:
+        if chunk:
+            yield separator + dumps(chunk)[1:-1]
+            separator = b","
+    yield b"]"
+
+
+async def aiter_array(chunks: AsyncIterable[list]) -> AsyncIterator[bytes]:
+    yield b"["
+    separator = b""
+    async for chunk in chunks:
+        if chunk:
+            yield separator + dumps(chunk)[1:-1]
+            separator = b","
+    yield b"]"
+
+
+def _escape_line_separators(encoded: bytes) -> bytes:
+    # Valid JSON but not valid JavaScript, so DRF escapes them.
+    for raw, escaped in _LINE_SEPARATORS:
+        if raw in encoded:
+            encoded = encoded.replace(raw, escaped)
+    return encoded
+
+
+def _reject_constant(value: str):
+    raise ValueError(f"Out of range float values are not permitted: {value}")
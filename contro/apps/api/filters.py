@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from contro.apps.content.services.filters import FILTER_PARAM, abuild_filter_plan, build_filter_plan, parse_filters
+
+
+class ContentFilterBackend(BaseFilterBackend):
+    """Apply ``filters[field][$op]=value`` query parameters to dynamic content querysets."""
+
+    def filter_queryset(self, request, queryset, view):
+        try:
+            conditions = parse_filters(request.query_params)
+            if not conditions:
+                return queryset
+            plan = build_filter_plan(queryset.model, conditions, settings.CONTRO_API_FILTER_MAX_DEPTH)
+        except ValueError as exc:
+            raise ValidationError({FILTER_PARAM: str(exc)})
+        return plan.apply(queryset)
+
+    async def afilter_queryset(self, request, queryset, view):
+        """Async ``filter_queryset``, for the async read views."""
+        try:
+            conditions = parse_filters(request.query_params)
+            if not conditions:
+                return queryset
+            plan = await abuild_filter_plan(queryset.model, conditions, settings.CONTRO_API_FILTER_MAX_DEPTH)
+        except ValueError as exc:
+            raise ValidationError({FILTER_PARAM: str(exc)})
+        return plan.apply(queryset)
@@ -0,0 +1,257 @@
+"""Keyset pagination for dynamic content lists."""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from contro.apps.content.services.stats import (
+    COUNT_STRATEGIES,
+    acount_rows,
+    acounts_exactly,
+    count_rows,
+    counts_exactly,
+)
+
+# Always available as a key; other fields must lead an index. Dynamic tables
+# index created_at, updated_at and published_at together with id.
+BUILTIN_ORDERING_FIELDS = ("id",)
+
+
+def pagination_options(content_type) -> dict | None:
+    """Return ``metadata["pagination"]`` of ``content_type`` or ``None`` when not configured."""
+    options = (content_type.metadata or {}).get("pagination") if content_type is not None else None
+    return options if isinstance(options, dict) else None
+
+
+def orderable_fields(model_class: type) -> set[str]:
+    """Field names that can key a cursor: ``id`` plus fields leading a full index."""
+    names = set(BUILTIN_ORDERING_FIELDS)
+    for field in model_class._meta.concrete_fields:
+        if field.db_index or field.unique:
+            names.add(field.name)
+    for index in model_class._meta.indexes:
+        if index.condition is None:
+            names.add(index.fields[0].lstrip("-"))
+    return names
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination ordered by ``(<field>, id)``.
+
+    Each page is one ``WHERE (field, id) > cursor ... LIMIT n`` query, so its
+    cost does not depend on how deep the client has paged. NULL values sort
+    last in both directions. Only forward cursors are issued.
+
+    Lists are paginated when the content type sets ``metadata["pagination"]``
+    or the request passes ``page_size`` or ``cursor``.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    ordering_query_param = "ordering"
+    default_ordering = "-id"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._prepare(queryset, request, view)
+        if queryset is None:
+            return None
+        self.count = count_rows(
+            queryset,
+            self._count_strategy,
+            settings.CONTRO_API_COUNT_ESTIMATE_THRESHOLD,
+            known=getattr(view, "known_count", None),
+        )
+        return self._finish_page(list(self._page_query(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async ``paginate_queryset``, for the async read views."""
+        queryset = self._prepare(queryset, request, view)
+        if queryset is None:
+            return None
+        self.count = await acount_rows(
+            queryset,
+            self._count_strategy,
+            settings.CONTRO_API_COUNT_ESTIMATE_THRESHOLD,
+            known=getattr(view, "known_count", None),
+        )
+        return self._finish_page([row async for row in self._page_query(queryset, request)])
+
+    def counts_exactly(self, queryset, request, view=None) -> bool:
+        """Whether the list of ``queryset`` will be counted with ``COUNT(*)``.
+
+        Unpaginated lists read every row, so they count as exact.
+        """
+        options = self._options(request, view)
+        if options is None:
+            return True
+        strategy = self._get_count_strategy(options)
+        return counts_exactly(queryset, strategy, settings.CONTRO_API_COUNT_ESTIMATE_THRESHOLD)
+
+    async def acounts_exactly(self, queryset, request, view=None) -> bool:
+        options = self._options(request, view)
+        if options is None:
+            return True
+        strategy = self._get_count_strategy(options)
+        return await acounts_exactly(queryset, strategy, settings.CONTRO_API_COUNT_ESTIMATE_THRESHOLD)
+
+    def _options(self, request, view) -> dict | None:
+        """The page options of the list, or ``None`` when it is not paginated."""
+        options = pagination_options(getattr(view, "content_type", None))
+        params = request.query_params
+        if options is None and self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return options or {}
+
+    def _prepare(self, queryset, request, view):
+        """Read the page options and order ``queryset``; ``None`` when the list is not paginated."""
+        options = self._options(request, view)
+        if options is None:
+            return None
+
+        self.request = request
+        self.model = queryset.model
+        self.page_size = self._get_page_size(request, options)
+        self.ordering = self._get_ordering(request, options)
+        self.field_name = self.ordering.lstrip("-")
+        self.descending = self.ordering.startswith("-")
+        self.nullable = self.model._meta.get_field(self.field_name).null
+        self._count_strategy = self._get_count_strategy(options)
+
+        # The cursor is built from the last row, so a sparse fieldset must still load the key.
+        if queryset._fields is not None:
+            if self.field_name not in queryset._fields:
+                queryset = queryset.values(*queryset._fields, self.field_name)
+        else:
+            loaded, deferred = queryset.query.deferred_loading
+            if loaded and not deferred and self.field_name not in loaded:
+                queryset = queryset.only(*loaded, self.field_name)
+        return queryset.order_by(*self._order_by())
+
+    def _page_query(self, queryset, request):
+        cursor = self._decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self._after(*cursor))
+        return queryset[: self.page_size + 1]
+
+    def _finish_page(self, rows: list) -> list:
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        body = {}
+        if self.count is not None:
+            body.update(count=self.count.value, count_exact=self.count.exact)
+        body.update(next=self.get_next_link(), previous=None, results=data)
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer", "nullable": True},
+                "count_exact": {"type": "boolean"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        # Rows are instances, or dicts when the view reads ``.values()``.
+        if isinstance(last, dict):
+            value, pk = last[self.field_name], last["id"]
+        else:
+            value, pk = getattr(last, self.model._meta.get_field(self.field_name).attname), last.pk
+        if value is not None:
+            value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+        token = _encode_cursor({"o": self.ordering, "v": value, "id": pk})
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def _get_page_size(self, request, options: dict) -> int:
+        maximum = settings.CONTRO_API_MAX_PAGE_SIZE
+        size = options.get("page_size") or settings.CONTRO_API_PAGE_SIZE
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw is not None:
+            try:
+                size = int(raw)
+            except ValueError:
+                raise ValidationError({self.page_size_query_param: "A positive integer is required."})
+            if size < 1:
+                raise ValidationError({self.page_size_query_param: "A positive integer is required."})
+        return min(int(size), maximum)
+
+    def _get_count_strategy(self, options: dict) -> str:
+        strategy = options.get("count") or settings.CONTRO_API_COUNT_STRATEGY
+        if strategy not in COUNT_STRATEGIES:
+            raise ImproperlyConfigured(f"Unknown count strategy '{strategy}'; use one of: {', '.join(COUNT_STRATEGIES)}.")
+        return strategy
+
+    def _get_ordering(self, request, options: dict) -> str:
+        ordering = request.query_params.get(self.ordering_query_param) or options.get("ordering") or self.default_ordering
+        if ordering.lstrip("-") not in orderable_fields(self.model):
+            raise ValidationError(
+                {self.ordering_query_param: f"Cannot paginate by '{ordering}'; use an indexed field."}
+            )
+        return ordering
+
+    def _order_by(self) -> list:
+        if self.field_name == "id":
+            return ["-id" if self.descending else "id"]
+        if not self.nullable:
+            # A plain direction, so one (field, id) index serves both.
+            return [f"-{self.field_name}" if self.descending else self.field_name, "-id" if self.descending else "id"]
+        key = F(self.field_name)
+        key = key.desc(nulls_last=True) if self.descending else key.asc(nulls_last=True)
+        return [key, "-id" if self.descending else "id"]
+
+    def _after(self, value, pk) -> Q:
+        past_id = Q(id__lt=pk) if self.descending else Q(id__gt=pk)
+        if self.field_name == "id":
+            return past_id
+        if value is None:
+            return Q(**{f"{self.field_name}__isnull": True}) & past_id
+        lookup = "lt" if self.descending else "gt"
+        # The redundant bound lets the index seek to the cursor instead of scanning from the start.
+        after = Q(**{f"{self.field_name}__{lookup}e": value}) & (
+            Q(**{f"{self.field_name}__{lookup}": value}) | Q(**{self.field_name: value}) & past_id
+        )
+        if self.nullable:
+            after |= Q(**{f"{self.field_name}__isnull": True})
+        return after
+
+    def _decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(token.encode("ascii") + b"=" * (-len(token) % 4)))
+            if data["o"] != self.ordering:
+                raise NotFound("Cursor does not match the requested ordering.")
+            pk = int(data["id"])
+            value = data["v"]
+            if value is not None:
+                value = self.model._meta.get_field(self.field_name).to_python(value)
+        except NotFound:
+            raise
+        except (TypeError, ValueError, KeyError, UnicodeEncodeError, binascii.Error, DjangoValidationError):
+            raise NotFound("Invalid cursor.")
+        return value, pk
+
+
+def _encode_cursor(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
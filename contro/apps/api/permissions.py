@@ -3,7 +3,7 @@ from __future__ import annotations
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
 from contro.apps.iam.authentication import ApiTokenCredentials
-from contro.apps.iam.services.tokens import token_has_permission
+from contro.apps.iam.services.tokens import atoken_has_permission, token_has_permission
 
 
 class DynamicContentPermission(BasePermission):
@@ -43,6 +43,22 @@ class DynamicContentPermission(BasePermission):
         return _token_allows(request, perm)
 
 
+async def ahas_content_permission(request, model, obj=None) -> bool:
+    """Async ``DynamicContentPermission`` check, for the async read views."""
+    perm = _perm_from_method(request.method, model)
+    if not perm:
+        return False
+
+    user = request.user
+    if not user or not user.is_authenticated:
+        return False
+
+    if not await user.ahas_perm(perm, obj=obj):
+        return False
+
+    return await _atoken_allows(request, perm)
+
+
 class ModelPermissionWithToken(BasePermission):
     def has_permission(self, request, view):
         model = getattr(view, "model", None)
@@ -114,3 +130,9 @@ def _token_allows(request, perm: str) -> bool:
     if isinstance(request.auth, ApiTokenCredentials):
         return token_has_permission(request.auth.token, perm)
     return True
+
+
+async def _atoken_allows(request, perm: str) -> bool:
+    if isinstance(request.auth, ApiTokenCredentials):
+        return await atoken_has_permission(request.auth.token, perm)
+    return True
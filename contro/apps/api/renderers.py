@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from rest_framework.renderers import JSONRenderer
+
+from contro.apps.api.encoding import dumps
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` encoding through orjson when it is installed; same output.
+
+    Indented responses (``Accept: application/json; indent=4``) and non-default
+    ``UNICODE_JSON``, ``COMPACT_JSON`` or ``STRICT_JSON`` settings keep DRF's
+    encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not self.fast_path(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+    def fast_path(self, accepted_media_type=None, renderer_context=None) -> bool:
+        """Whether output comes from ``encoding.dumps`` (and can be streamed with ``encoding.iter_array``)."""
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return False
+        return not self.ensure_ascii and self.compact and self.strict
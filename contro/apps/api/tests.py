@@ -1,3 +1,293 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import path
+from django.utils import timezone
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from contro.apps.api.async_views import async_content_view
+from contro.apps.api.pagination import KeysetPagination, _encode_cursor, orderable_fields
+from contro.apps.api.permissions import DynamicContentPermission
+from contro.apps.api.views import DynamicContentViewSet
+from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition
+from contro.apps.content.services.schema import sync_schema
+from contro.apps.iam.models import User
+
+
+def _request(**params):
+    return Request(APIRequestFactory().get("/api/content/items/", params))
+
+
+_content_list = DynamicContentViewSet.as_view({"get": "list"})
+_content_detail = DynamicContentViewSet.as_view({"get": "retrieve"})
+
+# Sync and async content reads side by side, whatever CONTRO_ASYNC_VIEWS says; used by AsyncReadTests.
+urlpatterns = [
+    path("sync/<slug:content_type>/", _content_list),
+    path("sync/<slug:content_type>/<int:pk>/", _content_detail),
+    path("async/<slug:content_type>/", async_content_view(_content_list)),
+    path("async/<slug:content_type>/<int:pk>/", async_content_view(_content_detail)),
+]
+
+
+class CursorDecodingTests(TransactionTestCase):
+    """Malformed and mismatched cursors are rejected with a 404."""
+
+    def setUp(self):
+        content_type = ContentTypeDefinition.objects.create(name="Cursor Item", slug="cursor-item")
+        self.model = sync_schema(content_type).model
+
+    def _decode(self, ordering, token):
+        paginator = KeysetPagination()
+        paginator.model = self.model
+        paginator.ordering = ordering
+        paginator.field_name = ordering.lstrip("-")
+        return paginator._decode_cursor(_request(cursor=token))
+
+    def test_round_trip(self):
+        moment = timezone.now().replace(microsecond=0)
+        token = _encode_cursor({"o": "-published_at", "v": moment.isoformat(), "id": 7})
+        self.assertEqual(self._decode("-published_at", token), (moment, 7))
+
+    def test_null_value_round_trip(self):
+        token = _encode_cursor({"o": "published_at", "v": None, "id": 3})
+        self.assertEqual(self._decode("published_at", token), (None, 3))
+
+    def test_rejects_malformed_tokens(self):
+        for token in ("zzz", "!!!", _encode_cursor({"o": "-id"}), _encode_cursor({"o": "-id", "v": "1", "id": "x"})):
+            with self.subTest(token=token), self.assertRaises(NotFound):
+                self._decode("-id", token)
+
+    def test_rejects_other_ordering(self):
+        token = _encode_cursor({"o": "id", "v": "1", "id": 1})
+        with self.assertRaisesMessage(NotFound, "Cursor does not match the requested ordering."):
+            self._decode("-id", token)
+
+    def test_rejects_unparseable_value(self):
+        token = _encode_cursor({"o": "created_at", "v": "not a date", "id": 1})
+        with self.assertRaises(NotFound):
+            self._decode("created_at", token)
+
+
+@override_settings(CONTRO_API_COUNT_STRATEGY="none")
+class KeysetPaginationTests(TransactionTestCase):
+    def setUp(self):
+        content_type = ContentTypeDefinition.objects.create(name="Keyset Item", slug="keyset-item")
+        ContentFieldDefinition.objects.create(content_type=content_type, name="Label", slug="label", field_type="text")
+        self.model = sync_schema(content_type).model
+        now = timezone.now()
+        # Every third row is unpublished, and published rows share timestamps, so ties break on id.
+        for index in range(10):
+            published_at = None if index % 3 == 0 else now - timedelta(minutes=index % 2)
+            self.model.objects.create(label=f"item {index}", published_at=published_at)
+
+    def _walk(self, ordering, page_size=3):
+        seen, params = [], {"page_size": page_size, "ordering": ordering}
+        while True:
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(self.model.objects.all(), _request(**params))
+            seen.extend(row.pk for row in page)
+            link = paginator.get_next_link()
+            if link is None:
+                return seen
+            params["cursor"] = parse_qs(urlparse(link).query)["cursor"][0]
+
+    def test_timestamps_are_indexed_for_keyset_ordering(self):
+        self.assertTrue({"id", "created_at", "updated_at", "published_at"} <= orderable_fields(self.model))
+        leading = {tuple(index.fields) for index in self.model._meta.indexes if index.condition is None}
+        self.assertTrue({("created_at", "id"), ("updated_at", "id"), ("published_at", "id")} <= leading)
+
+    def test_pages_through_null_published_at(self):
+        rows = list(self.model.objects.all())
+        for ordering in ("published_at", "-published_at"):
+            with self.subTest(ordering=ordering):
+                descending = ordering.startswith("-")
+                published = sorted(
+                    (row for row in rows if row.published_at is not None),
+                    key=lambda row: (row.published_at, row.pk),
+                    reverse=descending,
+                )
+                unpublished = sorted((row for row in rows if row.published_at is None), key=lambda row: row.pk, reverse=descending)
+                self.assertEqual(self._walk(ordering), [row.pk for row in published + unpublished])
+
+    def test_pages_by_id_and_created_at(self):
+        ids = sorted(self.model.objects.values_list("pk", flat=True))
+        self.assertEqual(self._walk("id", page_size=4), ids)
+        self.assertEqual(self._walk("-id", page_size=4), ids[::-1])
+        self.assertEqual(self._walk("created_at", page_size=4), ids)
+
+    def test_rejects_unindexed_ordering(self):
+        with self.assertRaises(ValidationError):
+            KeysetPagination().paginate_queryset(self.model.objects.all(), _request(page_size=2, ordering="label"))
+
+
+@override_settings(CONTRO_API_CACHE_TIMEOUT=0)
+class ListCountTests(TransactionTestCase):
+    """Lists are counted only as their strategy asks, and keep their ETag either way."""
+
+    def setUp(self):
+        self.content_type = ContentTypeDefinition.objects.create(name="Count Item", slug="count-item")
+        self.model = sync_schema(self.content_type).model
+        for _ in range(5):
+            self.model.objects.create()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin@example.com", "password"))
+
+    def _get(self, count):
+        self.content_type.metadata = {"pagination": {"count": count, "page_size": 2}}
+        self.content_type.save()
+        # The first request loads the model for the new schema generation.
+        self.client.get("/api/content/count-item/")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/content/count-item/")
+        self.assertEqual(response.status_code, 200)
+        counts = [query["sql"] for query in queries.captured_queries if "COUNT(" in query["sql"].upper()]
+        return response, counts
+
+    def test_none_strategy_skips_count(self):
+        response, counts = self._get("none")
+        self.assertEqual(counts, [])
+        self.assertNotIn("count", response.json())
+        with CaptureQueriesContext(connection) as queries:
+            not_modified = self.client.get("/api/content/count-item/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertFalse([query for query in queries.captured_queries if "COUNT(" in query["sql"].upper()])
+
+    def test_page_etag_follows_page_rows(self):
+        response, _ = self._get("none")
+        etag, next_link = response["ETag"], response.json()["next"]
+        self.assertNotEqual(self.client.get(next_link)["ETag"], etag)
+        # Rows beyond the page leave it alone; rows on it change the tag.
+        self.model.objects.filter(pk=min(self.model.objects.values_list("pk", flat=True))).update(updated_at=timezone.now())
+        self.assertEqual(self.client.get("/api/content/count-item/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        page_ids = [item["id"] for item in response.json()["results"]]
+        self.model.objects.filter(pk=page_ids[0]).update(updated_at=timezone.now())
+        self.assertEqual(self.client.get("/api/content/count-item/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.model.objects.filter(pk=page_ids[1]).delete()
+        self.assertNotEqual(self.client.get("/api/content/count-item/")["ETag"], etag)
+
+    def test_exact_strategy_counts_once(self):
+        response, counts = self._get("exact")
+        self.assertEqual(len(counts), 1)
+        self.assertEqual(response.json()["count"], 5)
+        not_modified = self.client.get("/api/content/count-item/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    @override_settings(CONTRO_API_COUNT_ESTIMATE_THRESHOLD=2)
+    def test_estimated_strategy_over_threshold_skips_count(self):
+        estimate = "contro.apps.content.services.stats.estimate_table_rows"
+        with mock.patch(estimate, return_value=5):
+            response, counts = self._get("estimated")
+        self.assertEqual(counts, [])
+        self.assertIn("ETag", response)
+        self.assertEqual(response.json()["count"], 5)
+        self.assertFalse(response.json()["count_exact"])
+
+
+@override_settings(CONTRO_API_CACHE_TIMEOUT=60)
+class DetailCacheTests(TransactionTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        content_type = ContentTypeDefinition.objects.create(name="Cached Item", slug="cached-item")
+        ContentFieldDefinition.objects.create(content_type=content_type, name="Label", slug="label", field_type="text")
+        self.model = sync_schema(content_type).model
+        self.published = self.model.objects.create(label="live", status="published")
+        self.draft = self.model.objects.create(label="draft")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser("admin@example.com", "password"))
+
+    def _get(self, entry):
+        return self.client.get(f"/api/content/cached-item/{entry.pk}/")
+
+    def test_published_entry_misses_then_hits(self):
+        self.assertEqual(self._get(self.published)["X-Cache"], "MISS")
+        response = self._get(self.published)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.json()["label"], "live")
+
+    def test_drafts_are_not_cached(self):
+        for _ in range(2):
+            response = self._get(self.draft)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("X-Cache", response)
+
+    def test_hits_check_object_permissions(self):
+        self._get(self.published)
+        with mock.patch.object(DynamicContentPermission, "has_object_permission", return_value=False):
+            self.assertEqual(self._get(self.published).status_code, 403)
+
+    def test_writes_invalidate(self):
+        self._get(self.published)
+        self.client.patch(f"/api/content/cached-item/{self.published.pk}/", {"label": "edited"}, format="json")
+        response = self._get(self.published)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["label"], "edited")
+
+
+@override_settings(ROOT_URLCONF=__name__, CONTRO_API_CACHE_TIMEOUT=0)
+class AsyncReadTests(TransactionTestCase):
+    """The async list and detail views answer exactly as the synchronous ones."""
+
+    def setUp(self):
+        tag_type = ContentTypeDefinition.objects.create(name="Async Tag", slug="async-tag")
+        ContentFieldDefinition.objects.create(content_type=tag_type, name="Name", slug="name", field_type="text")
+        post_type = ContentTypeDefinition.objects.create(name="Async Post", slug="async-post")
+        ContentFieldDefinition.objects.create(content_type=post_type, name="Title", slug="title", field_type="text")
+        ContentFieldDefinition.objects.create(
+            content_type=post_type, name="Tag", slug="tag", field_type="fk", relation_target=tag_type
+        )
+        model = sync_schema(post_type).model
+        tag = model._meta.get_field("tag").related_model.objects.create(name="news")
+        self.entries = [model.objects.create(title=f"post {index}", tag=tag, status="published") for index in range(3)]
+        self.entries.append(model.objects.create(title="draft", tag=tag))
+        self.token = str(AccessToken.for_user(User.objects.create_superuser("admin@example.com", "password")))
+
+    async def _get(self, mode, url, **headers):
+        return await self.async_client.get(f"/{mode}/async-post/{url}", headers={"authorization": f"Bearer {self.token}", **headers})
+
+    async def _assert_same(self, url):
+        expected = await self._get("sync", url)
+        # The async views must answer natively rather than through the synchronous viewset.
+        with (
+            mock.patch.object(DynamicContentViewSet, "list", side_effect=AssertionError),
+            mock.patch.object(DynamicContentViewSet, "retrieve", side_effect=AssertionError),
+        ):
+            response = await self._get("async", url)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content.replace(b"/sync/", b"/async/"))
+        self.assertEqual(response.get("ETag"), expected.get("ETag"))
+        return response
+
+    async def test_list_matches_sync(self):
+        response = await self._assert_same("?page_size=2")
+        self.assertEqual(len(response.json()["results"]), 2)
+        cursor = parse_qs(urlparse(response.json()["next"]).query)["cursor"][0]
+        await self._assert_same(f"?page_size=2&cursor={cursor}")
+        await self._assert_same("?page_size=2&ordering=created_at")
+        not_modified = await self._get("async", "?page_size=2", if_none_match=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_detail_matches_sync(self):
+        for entry in (self.entries[0], self.entries[-1]):
+            with self.subTest(entry=entry.pk):
+                response = await self._assert_same(f"{entry.pk}/")
+                self.assertEqual(response.json()["title"], entry.title)
+        await self._assert_same("0/")
+        response = await self._get("async", f"{self.entries[0].pk}/")
+        not_modified = await self._get("async", f"{self.entries[0].pk}/", if_none_match=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+
+class CursorEncodingTests(SimpleTestCase):
+    def test_tokens_are_unpadded_urlsafe(self):
+        token = _encode_cursor({"o": "-id", "v": "??>>", "id": 1})
+        self.assertNotIn("=", token)
+        self.assertFalse(set(token) & {"+", "/"})
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenVerifyView
 
+from contro.apps.api.async_views import async_content_view
 from contro.apps.api.views import DynamicContentViewSet
 from contro.apps.media.api import MediaFileViewSet
 
@@ -8,6 +10,11 @@ content_list = DynamicContentViewSet.as_view({"get": "list", "post": "create"})
 content_detail = DynamicContentViewSet.as_view(
     {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}
 )
+if settings.CONTRO_ASYNC_VIEWS:
+    content_list = async_content_view(content_list)
+    content_detail = async_content_view(content_detail)
+content_bulk = DynamicContentViewSet.as_view({"post": "bulk_create", "patch": "bulk_update", "delete": "bulk_destroy"})
+content_export = DynamicContentViewSet.as_view({"get": "export"})
 media_list = MediaFileViewSet.as_view({"get": "list", "post": "create"})
 media_detail = MediaFileViewSet.as_view(
     {"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}
@@ -18,6 +25,8 @@ urlpatterns = [
     path("auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("auth/token/verify/", TokenVerifyView.as_view(), name="token_verify"),
     path("content/<slug:content_type>/", content_list, name="dynamic_content_list"),
+    path("content/<slug:content_type>/bulk/", content_bulk, name="dynamic_content_bulk"),
+    path("content/<slug:content_type>/export/", content_export, name="dynamic_content_export"),
     path("content/<slug:content_type>/<int:pk>/", content_detail, name="dynamic_content_detail"),
     path("media/", media_list, name="media_list"),
     path("media/<int:pk>/", media_detail, name="media_detail"),
@@ -1,37 +1,260 @@
 from __future__ import annotations
 
-from django.shortcuts import get_object_or_404
-from rest_framework import viewsets
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import status, viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
+from contro.apps.api.cache import cache_enabled, get_cached_response, response_key, store_response
+from contro.apps.api.conditional import (
+    Validators,
+    detail_validators,
+    list_validators,
+    not_modified_response,
+    page_validators,
+    set_validator_headers,
+)
+from contro.apps.api.encoding import iter_array
+from contro.apps.api.filters import ContentFilterBackend
+from contro.apps.api.pagination import KeysetPagination
+from contro.apps.api.parsers import NDJSONParser
 from contro.apps.api.permissions import DynamicContentPermission
-from contro.apps.content.models import ContentTypeDefinition
-from contro.apps.content.services.schema import get_dynamic_model
-from contro.apps.content.services.serializers import get_serializer_for_model
+from contro.apps.api.renderers import FastJSONRenderer
+from contro.apps.content.services import export
+from contro.apps.content.services.bulk import bulk_create_entries, bulk_delete_entries, bulk_update_entries
+from contro.apps.content.services.populate import PopulatePlan, build_populate_plan, parse_populate
+from contro.apps.content.services.registry import ContentTypeSnapshot, get_content_type
+from contro.apps.content.services.schema import get_dynamic_model_by_slug
+from contro.apps.content.services.serializers import (
+    get_read_serializer,
+    get_serializer_for_model,
+    serializable_field_names,
+)
 from contro.apps.content.services.hooks import run_hooks
 
 
+# Rows read, serialized and encoded per piece of a streamed list.
+STREAM_CHUNK_SIZE = 500
+
+
 class DynamicContentViewSet(viewsets.ModelViewSet):
     permission_classes = [DynamicContentPermission]
+    pagination_class = KeysetPagination
+    filter_backends = [*api_settings.DEFAULT_FILTER_BACKENDS, ContentFilterBackend]
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONParser]
+    content_type = None
+    known_count = None
 
-    def _get_content_type(self) -> ContentTypeDefinition:
-        return get_object_or_404(ContentTypeDefinition, slug=self.kwargs["content_type"], is_active=True)
+    def _get_content_type(self) -> ContentTypeSnapshot:
+        content_type = get_content_type(self.kwargs["content_type"], active_only=True)
+        if content_type is None:
+            raise Http404("No content type matches the given query.")
+        return content_type
 
     def get_model(self):
         if hasattr(self, "_model") and self._model is not None:
             return self._model
         content_type = self._get_content_type()
-        model = get_dynamic_model(content_type)
+        model = get_dynamic_model_by_slug(content_type.slug)
+        self.content_type = content_type
         self.model = model
         self._model = model
         return model
 
     def get_queryset(self):
         model = self.get_model()
-        return model.objects.all()
+        queryset = model.objects.all()
+        fields = self.get_requested_fields()
+        if fields is not None:
+            columns = [name for name in fields if not model._meta.get_field(name).many_to_many]
+            # Feed the ETag and Last-Modified, and whether an entry is cached.
+            columns.extend(["updated_at", "status"])
+            queryset = queryset.only(*columns)
+        return self.get_populate_plan().apply(queryset)
 
     def get_serializer_class(self):
         model = self.get_model()
-        return get_serializer_for_model(model)
+        return get_serializer_for_model(model, self.get_requested_fields(), self.get_populate_plan().tree)
+
+    def get_populate_plan(self) -> PopulatePlan:
+        """Parse ``?populate=author,tags.cover`` on reads into an eager-loading plan."""
+        if getattr(self, "_populate_plan", None) is not None:
+            return self._populate_plan
+        plan = PopulatePlan()
+        if self.request.method in SAFE_METHODS:
+            paths = parse_populate(self.request.query_params.get("populate"))
+            try:
+                plan = build_populate_plan(self.get_model(), paths, settings.CONTRO_API_POPULATE_MAX_DEPTH)
+            except ValueError as exc:
+                raise ValidationError({"populate": str(exc)})
+        self._populate_plan = plan
+        return plan
+
+    def get_requested_fields(self) -> tuple[str, ...] | None:
+        """Parse ``?fields=a,b`` on reads into field names in model order.
+
+        ``id`` and populated relations are always kept.
+        """
+        if self.request.method not in SAFE_METHODS:
+            return None
+        raw = self.request.query_params.get("fields")
+        if not raw:
+            return None
+        requested = {name.strip() for name in raw.split(",") if name.strip()}
+        available = serializable_field_names(self.get_model())
+        unknown = sorted(requested - set(available))
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(unknown)}."})
+        requested.add("id")
+        requested.update(self.get_populate_plan().tree)
+        return tuple(name for name in available if name in requested)
+
+    def list(self, request, *args, **kwargs):
+        cache_key = self._response_cache_key()
+        if cache_key is not None:
+            cached = get_cached_response(cache_key)
+            if cached is not None:
+                return self._cached_response(cached)
+        validators = None
+        queryset = self.filter_queryset(self.get_queryset())
+        if self._conditional_enabled() and self._counts_list(queryset):
+            validators = list_validators(queryset, self.content_type.schema_generation, self._variant())
+            not_modified = not_modified_response(request, validators)
+            if not_modified is not None:
+                return not_modified
+            # Spares the paginator a second COUNT over the same rows.
+            self.known_count = validators.total
+        if self._compiled_reads():
+            response = self._compiled_list()
+        else:
+            response = super().list(request, *args, **kwargs)
+        if validators is not None or not self._conditional_enabled():
+            return self._finalize_read(response, validators, cache_key)
+        validators = self._page_validators()
+        response = self._finalize_read(response, validators, cache_key)
+        not_modified = not_modified_response(request, validators) if validators is not None else None
+        return not_modified if not_modified is not None else response
+
+    def retrieve(self, request, *args, **kwargs):
+        # Fetched before the cache is read, so object permissions are checked on hits too.
+        instance = self.get_object()
+        cache_key = self._response_cache_key() if instance.is_published else None
+        if cache_key is not None:
+            cached = get_cached_response(cache_key)
+            if cached is not None:
+                return self._cached_response(cached)
+        validators = None
+        if self._conditional_enabled():
+            validators = detail_validators(instance, self.content_type.schema_generation, self._variant())
+            not_modified = not_modified_response(request, validators)
+            if not_modified is not None:
+                return not_modified
+        if self._compiled_reads():
+            data = get_read_serializer(self.get_model(), self.get_requested_fields()).serialize_instance(instance)
+        else:
+            data = self.get_serializer(instance).data
+        return self._finalize_read(Response(data), validators, cache_key)
+
+    def _counts_list(self, queryset) -> bool:
+        """Whether listing ``queryset`` counts it exactly.
+
+        List validators include the row count, so lists whose count strategy
+        skips or estimates the total are validated from their page instead of
+        a COUNT per page; see ``_page_validators``.
+        """
+        paginator = self.paginator
+        return paginator is None or paginator.counts_exactly(queryset, self.request, view=self)
+
+    def _page_validators(self) -> Validators | None:
+        """Validators of the page just read, or ``None`` when the list was not paginated."""
+        paginator = self.paginator
+        page = getattr(paginator, "page", None)
+        if page is None:
+            return None
+        count = paginator.count.value if paginator.count is not None else None
+        return page_validators(self.model, page, self.content_type.schema_generation, self._variant(), paginator.has_next, count)
+
+    def _list_columns(self, compiled) -> list[str]:
+        """Columns a compiled list reads; ``updated_at`` feeds page validators even when not rendered."""
+        return compiled.columns if "updated_at" in compiled.columns else [*compiled.columns, "updated_at"]
+
+    def _compiled_reads(self) -> bool:
+        # Populated responses nest other serializers, so they keep the DRF path.
+        return settings.CONTRO_API_COMPILED_SERIALIZERS and not self.get_populate_plan()
+
+    def _compiled_list(self) -> Response:
+        """List from ``.values()`` rows through the compiled serializer; same output as ``super().list``."""
+        compiled = get_read_serializer(self.get_model(), self.get_requested_fields())
+        queryset = self.filter_queryset(self.get_queryset()).values(*self._list_columns(compiled))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize_rows(page))
+        if self._streams_list():
+            return self._streaming_response(iter_array(compiled.iter_chunks(queryset, STREAM_CHUNK_SIZE)))
+        return Response(compiled.serialize_rows(queryset))
+
+    def _streams_list(self) -> bool:
+        """Whether an unpaginated list is long enough to encode and send in chunks."""
+        minimum = settings.CONTRO_API_STREAM_MIN_ROWS
+        renderer = self.request.accepted_renderer
+        return (
+            bool(minimum)
+            and self.known_count is not None
+            and self.known_count > minimum
+            # The response cache stores whole bodies.
+            and not cache_enabled()
+            and isinstance(renderer, FastJSONRenderer)
+            and renderer.fast_path(self.request.accepted_media_type, self.get_renderer_context())
+        )
+
+    def _streaming_response(self, content) -> StreamingHttpResponse:
+        return StreamingHttpResponse(content, content_type=self.request.accepted_renderer.media_type)
+
+    def _conditional_enabled(self) -> bool:
+        # Populated entries can change without touching this entry's updated_at.
+        self.get_model()
+        return not self.get_populate_plan()
+
+    def _variant(self) -> str:
+        return f"{self.request.accepted_renderer.format}?{self.request.META.get('QUERY_STRING', '')}"
+
+    def _response_cache_key(self) -> str | None:
+        if not self._caches_response():
+            return None
+        return response_key(self.request, self.content_type.slug, self.content_type.schema_generation, self._variant())
+
+    def _caches_response(self) -> bool:
+        # Populated entries belong to other content types, whose writes would not invalidate this key.
+        return cache_enabled() and self._conditional_enabled()
+
+    def _cached_response(self, entry: dict):
+        # Entries stored without validators are served without them.
+        validators = Validators(etag=entry["etag"], last_modified=entry["last_modified"]) if entry["etag"] else None
+        response = not_modified_response(self.request, validators) if validators is not None else None
+        if response is None:
+            response = Response(entry["data"])
+            if validators is not None:
+                set_validator_headers(response, validators)
+        response["X-Cache"] = "HIT"
+        return response
+
+    def _finalize_read(self, response, validators: Validators | None, cache_key: str | None):
+        if validators is not None:
+            set_validator_headers(response, validators)
+        if cache_key is not None and response.status_code == status.HTTP_200_OK:
+            store_response(cache_key, self._cache_entry(response, validators))
+            response["X-Cache"] = "MISS"
+        return response
+
+    def _cache_entry(self, response, validators: Validators | None) -> dict:
+        return {
+            "data": response.data,
+            "etag": validators.etag if validators is not None else None,
+            "last_modified": validators.last_modified if validators is not None else None,
+        }
 
     def perform_create(self, serializer):
         run_hooks("pre_create", data=serializer.validated_data, request=self.request)
@@ -48,3 +271,73 @@ class DynamicContentViewSet(viewsets.ModelViewSet):
         run_hooks("pre_delete", instance=instance, request=self.request)
         instance.delete()
         run_hooks("post_delete", instance=instance, request=self.request)
+
+    def bulk_create(self, request, *args, **kwargs):
+        items = self._bulk_items(request.data)
+        result = bulk_create_entries(
+            self.get_model(),
+            items,
+            get_serializer_for_model(self.get_model()),
+            context=self.get_serializer_context(),
+            chunk_size=settings.CONTRO_API_BULK_CHUNK_SIZE,
+            request=request,
+        )
+        return self._bulk_response(result, status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, *args, **kwargs):
+        items = self._bulk_items(request.data)
+        result = bulk_update_entries(
+            self.get_model(),
+            items,
+            get_serializer_for_model(self.get_model()),
+            context=self.get_serializer_context(),
+            chunk_size=settings.CONTRO_API_BULK_CHUNK_SIZE,
+            request=request,
+            can_change=self._can_modify,
+        )
+        return self._bulk_response(result, status.HTTP_200_OK)
+
+    def bulk_destroy(self, request, *args, **kwargs):
+        data = request.data
+        ids = self._bulk_items(data.get("ids") if isinstance(data, dict) else data)
+        result = bulk_delete_entries(
+            self.get_model(),
+            ids,
+            chunk_size=settings.CONTRO_API_BULK_CHUNK_SIZE,
+            request=request,
+            can_delete=self._can_modify,
+        )
+        return self._bulk_response(result, status.HTTP_200_OK)
+
+    def _bulk_items(self, data) -> list:
+        if not isinstance(data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of items."]})
+        if len(data) > settings.CONTRO_API_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {"non_field_errors": [f"At most {settings.CONTRO_API_BULK_MAX_ITEMS} items per request."]}
+            )
+        return data
+
+    def _bulk_response(self, result, success_status: int) -> Response:
+        return Response(result.as_dict(), status=status.HTTP_207_MULTI_STATUS if result.errors else success_status)
+
+    def _can_modify(self, instance) -> bool:
+        return all(
+            permission.has_object_permission(self.request, self, instance) for permission in self.get_permissions()
+        )
+
+    def export(self, request, *args, **kwargs):
+        """Stream every entry matching the request's filters as NDJSON or CSV (``?output=``)."""
+        output = request.query_params.get("output", export.FORMAT_NDJSON)
+        if output not in export.CONTENT_TYPES:
+            raise ValidationError({"output": f"Choose one of: {', '.join(export.CONTENT_TYPES)}."})
+        model = self.get_model()
+        fields = export.export_field_names(model, self.get_requested_fields())
+        rows = export.iter_rows(self.filter_queryset(self.get_queryset()), fields, settings.CONTRO_EXPORT_CHUNK_SIZE)
+        response = StreamingHttpResponse(export.render(rows, fields, output), content_type=export.CONTENT_TYPES[output])
+        response["Content-Disposition"] = f'attachment; filename="{self.content_type.slug}.{output}"'
+        return response
+
+    def perform_content_negotiation(self, request, force=False):
+        # Exports bypass renderers, so a CSV or NDJSON Accept header must not fail negotiation.
+        return super().perform_content_negotiation(request, force=force or self.action == "export")
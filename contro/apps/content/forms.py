@@ -4,7 +4,8 @@ from django import forms
 from django.forms import modelform_factory
 
 from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition
-from contro.apps.content.services.schema import get_dynamic_model
+from contro.apps.content.services.registry import ContentTypeSnapshot
+from contro.apps.content.services.schema import get_dynamic_model_by_slug
 
 
 class ContentTypeForm(forms.ModelForm):
@@ -37,8 +38,8 @@ class ContentFieldForm(forms.ModelForm):
         }
 
 
-def content_entry_form(content_type: ContentTypeDefinition):
-    model = get_dynamic_model(content_type)
+def content_entry_form(content_type: ContentTypeDefinition | ContentTypeSnapshot):
+    model = get_dynamic_model_by_slug(content_type.slug)
     excluded = {"created_at", "updated_at"}
     fields = [field.name for field in model._meta.fields if field.name not in excluded]
     fields.extend([field.name for field in model._meta.many_to_many])
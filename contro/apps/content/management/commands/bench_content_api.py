@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+HANDLERS = ("wsgi", "asgi")
+VIEWS = ("handler", "sync", "async")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure read throughput of an API path through Django's WSGI and ASGI handlers, in process. "
+        "By default WSGI is measured with the sync views and ASGI with the async views; a handler whose views "
+        "differ from CONTRO_ASYNC_VIEWS runs in a child process with the setting flipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path and query string to GET, e.g. /api/content/article/?page_size=50.")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per handler.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once.")
+        parser.add_argument("--user", help="Email of the user to authenticate as, with a freshly minted JWT.")
+        parser.add_argument("--host", default="localhost", help="Host header; must be in ALLOWED_HOSTS.")
+        parser.add_argument(
+            "--handler",
+            choices=HANDLERS,
+            action="append",
+            help="Handler to measure; repeat for both. Defaults to both.",
+        )
+        parser.add_argument(
+            "--views",
+            choices=VIEWS,
+            default="handler",
+            help="Views to serve: sync, async, or the ones matching each handler (default).",
+        )
+        # Set on the child process, which must already have the requested views.
+        parser.add_argument("--no-respawn", action="store_true", help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--requests and --concurrency must be positive.")
+        url = urlsplit(options["path"])
+        headers = {"host": options["host"]}
+        if options["user"]:
+            user = get_user_model().objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}.")
+            headers["authorization"] = f"Bearer {AccessToken.for_user(user)}"
+
+        for name in options["handler"] or HANDLERS:
+            views = options["views"]
+            if views == "handler":
+                views = "async" if name == "asgi" else "sync"
+            if (views == "async") != settings.CONTRO_ASYNC_VIEWS:
+                if options["no_respawn"]:
+                    raise CommandError(f"CONTRO_ASYNC_VIEWS did not reach the settings of the {views} views run.")
+                self._respawn(name, views, options)
+                continue
+            runner = _run_wsgi if name == "wsgi" else _run_asgi
+            started = time.perf_counter()
+            results = runner(url.path, url.query, headers, options["requests"], options["concurrency"])
+            elapsed = time.perf_counter() - started
+            self._report(f"{name} ({views} views)", results, elapsed)
+
+    def _respawn(self, name: str, views: str, options: dict) -> None:
+        """Measure one handler in a child process whose URLconf was built with the other views."""
+        command = [sys.executable, "-m", "django", "bench_content_api", options["path"], "--no-respawn"]
+        command += ["--requests", str(options["requests"]), "--concurrency", str(options["concurrency"])]
+        command += ["--host", options["host"], "--handler", name, "--views", views]
+        if options["user"]:
+            command += ["--user", options["user"]]
+        env = {**os.environ, "CONTRO_ASYNC_VIEWS": "true" if views == "async" else "false"}
+        child = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        self.stdout.write(child.stdout, ending="")
+        if child.returncode:
+            self.stderr.write(child.stderr, ending="")
+            raise CommandError(f"The {name} run exited with status {child.returncode}.")
+
+    def _report(self, name: str, results: list[tuple[int, float]], elapsed: float) -> None:
+        latencies = sorted(seconds for _, seconds in results)
+        failed = sum(1 for status, _ in results if status >= 400)
+        percentiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else latencies * 19
+        line = (
+            f"{name}: {len(results) / elapsed:.1f} req/s, p50 {percentiles[9] * 1000:.1f}ms, "
+            f"p95 {percentiles[18] * 1000:.1f}ms over {len(results)} requests"
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{line}; {failed} failed"))
+        else:
+            self.stdout.write(self.style.SUCCESS(line))
+
+
+def _run_wsgi(path: str, query: str, headers: dict, requests: int, concurrency: int) -> list[tuple[int, float]]:
+    handler = WSGIHandler()
+
+    def request(_):
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": headers["host"],
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+            **{f"HTTP_{key.upper().replace('-', '_')}": value for key, value in headers.items()},
+        }
+        status = []
+        started = time.perf_counter()
+        body = handler(environ, lambda line, response_headers, exc_info=None: status.append(int(line[:3])))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return status[0], time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(request, range(requests)))
+
+
+def _run_asgi(path: str, query: str, headers: dict, requests: int, concurrency: int) -> list[tuple[int, float]]:
+    handler = ASGIHandler()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(key.encode(), value.encode()) for key, value in headers.items()],
+        "client": ("127.0.0.1", 0),
+        "server": (headers["host"], 80),
+    }
+
+    async def request(limit: asyncio.Semaphore):
+        sent = False
+        status = []
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            # The client never disconnects; the handler cancels this wait once it has responded.
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        async with limit:
+            started = time.perf_counter()
+            await handler(dict(scope), receive, send)
+            return status[0], time.perf_counter() - started
+
+    async def run():
+        limit = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(request(limit) for _ in range(requests)))
+
+    return asyncio.run(run())
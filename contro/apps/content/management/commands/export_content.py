@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from contro.apps.content.models import ContentTypeDefinition
+from contro.apps.content.services import export
+from contro.apps.content.services.schema import get_dynamic_model
+
+
+class Command(BaseCommand):
+    help = "Stream the entries of a content type as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Content type slug to export.")
+        parser.add_argument(
+            "--format",
+            dest="output",
+            choices=sorted(export.CONTENT_TYPES),
+            default=export.FORMAT_NDJSON,
+            help="Output format (default: ndjson).",
+        )
+        parser.add_argument("--fields", help="Comma-separated field slugs to export. Defaults to all fields.")
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="LOOKUP=VALUE",
+            help="Queryset filter such as status=published or created_at__gte=2024-01-01. Repeatable.",
+        )
+        parser.add_argument("--output", dest="path", help="File to write to. Defaults to stdout.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.CONTRO_EXPORT_CHUNK_SIZE,
+            help="Rows fetched per database round trip.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            content_type = ContentTypeDefinition.objects.get(slug=options["slug"])
+        except ContentTypeDefinition.DoesNotExist:
+            raise CommandError(f"Unknown content type: {options['slug']}")
+        model = get_dynamic_model(content_type)
+
+        filters = {}
+        for item in options["filter"]:
+            lookup, sep, value = item.partition("=")
+            if not sep or not lookup:
+                raise CommandError(f"Filters must look like LOOKUP=VALUE, got: {item}")
+            filters[lookup] = value
+        fields = [name.strip() for name in options["fields"].split(",")] if options.get("fields") else None
+
+        try:
+            field_names = export.export_field_names(model, fields)
+            queryset = export.filter_queryset(model.objects.all(), filters)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        rows = export.iter_rows(queryset, field_names, options["chunk_size"])
+        lines = export.render(rows, field_names, options["output"])
+        if options.get("path"):
+            with open(options["path"], "w", encoding="utf-8", newline="") as handle:
+                handle.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
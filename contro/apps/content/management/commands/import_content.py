@@ -0,0 +1,181 @@
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from contro.apps.content.models import ContentTypeDefinition
+from contro.apps.content.services import importer
+from contro.apps.content.services.schema import get_dynamic_model
+
+
+class Command(BaseCommand):
+    help = "Stream NDJSON or CSV records into a content type in bulk, with resumable checkpoints."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Content type slug to import into.")
+        parser.add_argument("file", help="NDJSON or CSV file to read.")
+        parser.add_argument(
+            "--format",
+            choices=[importer.FORMAT_NDJSON, importer.FORMAT_CSV],
+            help="Input format. Detected from the file extension by default.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Records written per transaction.")
+        parser.add_argument("--workers", type=int, default=1, help="Worker processes writing chunks in parallel.")
+        parser.add_argument(
+            "--map",
+            action="append",
+            default=[],
+            metavar="COLUMN=FIELD",
+            help="Rename an input column to a field slug. Repeatable.",
+        )
+        parser.add_argument(
+            "--lookup",
+            action="append",
+            default=[],
+            metavar="FIELD=KEY",
+            help="Resolve a relation field by a natural key on its target, e.g. author=email. Repeatable.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file recording progress. Defaults to <file>.checkpoint.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and start from the first record.",
+        )
+        parser.add_argument("--errors", dest="errors_path", help="Append rejected records and their errors as NDJSON to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            content_type = ContentTypeDefinition.objects.get(slug=options["slug"])
+        except ContentTypeDefinition.DoesNotExist:
+            raise CommandError(f"Unknown content type: {options['slug']}")
+        model = get_dynamic_model(content_type)
+
+        column_map = self._pairs(options["map"], "--map")
+        lookups = self._pairs(options["lookup"], "--lookup")
+        for field_name in lookups:
+            field = next((f for f in model._meta.get_fields() if f.name == field_name), None)
+            if field is None or not (field.many_to_one or field.many_to_many):
+                raise CommandError(f"--lookup field {field_name} is not a relation of {content_type.slug}.")
+
+        file_format = options.get("format") or importer.detect_format(options["file"])
+        checkpoint_path = options.get("checkpoint") or f"{options['file']}.checkpoint"
+        try:
+            checkpoint = importer.Checkpoint.load(checkpoint_path, options["file"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if options["restart"]:
+            checkpoint = importer.Checkpoint(path=checkpoint_path, source=options["file"])
+        if checkpoint.position:
+            self.stdout.write(f"Resuming after record {checkpoint.position}.")
+
+        list_fields = [field.name for field in model._meta.local_many_to_many]
+        records = islice(
+            importer.read_records(options["file"], file_format, column_map, list_fields), checkpoint.position, None
+        )
+        chunks = self._chunks(records, checkpoint.position, options["chunk_size"])
+        self._errors_file = None
+        if options.get("errors_path"):
+            self._written = set()
+            if not options["restart"]:
+                self._written = self._written_errors(options["errors_path"], options["file"], checkpoint.position)
+            self._errors_file = open(options["errors_path"], "a", encoding="utf-8")
+        self._started = time.monotonic()
+        self._processed = 0
+        try:
+            if options["workers"] > 1:
+                self._run_pool(content_type.slug, chunks, lookups, checkpoint, options["workers"])
+            else:
+                for start, chunk in chunks:
+                    self._record(importer.import_chunk(content_type.slug, start, chunk, lookups), checkpoint, {})
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if self._errors_file:
+                self._errors_file.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {checkpoint.created} created, {checkpoint.errors} errors, "
+                f"{checkpoint.position} records read."
+            )
+        )
+
+    def _run_pool(self, slug, chunks, lookups, checkpoint, workers):
+        # Forked workers must not share the parent's database connections.
+        connections.close_all()
+        finished = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=importer.init_worker) as pool:
+            pending = set()
+            for start, chunk in chunks:
+                pending.add(pool.submit(importer.import_chunk, slug, start, chunk, lookups))
+                # Keep a bounded number of chunks in flight so memory stays flat.
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._record(future.result(), checkpoint, finished)
+            for future in pending:
+                self._record(future.result(), checkpoint, finished)
+
+    def _record(self, result, checkpoint, finished):
+        """Count a finished chunk and advance the checkpoint over contiguous finished chunks."""
+        finished[result.start] = result
+        while checkpoint.position in finished:
+            done = finished.pop(checkpoint.position)
+            checkpoint.position += done.count
+            checkpoint.created += done.created
+            checkpoint.errors += len(done.errors)
+            if self._errors_file:
+                for index, errors, record in done.errors:
+                    if index in self._written:
+                        continue
+                    line = {"source": checkpoint.source, "index": index, "record": record, "errors": errors}
+                    self._errors_file.write(json.dumps(line) + "\n")
+                # Written before the checkpoint moves past them, so no rejected record goes unreported.
+                self._errors_file.flush()
+            checkpoint.save()
+
+        self._processed += result.count
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        self.stdout.write(
+            f"{checkpoint.position} records committed, {checkpoint.created} created, "
+            f"{checkpoint.errors} errors, {self._processed / elapsed:.0f} records/s"
+        )
+
+    def _written_errors(self, path, source, position):
+        """Indexes of records past the checkpoint whose errors an interrupted run already wrote."""
+        written = set()
+        if not os.path.exists(path):
+            return written
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    continue
+                if data.get("source") == source and data.get("index", -1) >= position:
+                    written.add(data["index"])
+        return written
+
+    def _chunks(self, records, start, size):
+        while True:
+            chunk = list(islice(records, size))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+    def _pairs(self, values, option):
+        pairs = {}
+        for value in values:
+            key, sep, target = value.partition("=")
+            if not sep or not key or not target:
+                raise CommandError(f"{option} expects NAME=VALUE, got: {value}")
+            pairs[key] = target
+        return pairs
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from contro.apps.content.models import ContentTypeDefinition
+from contro.apps.content.services.schema import plan_all_schemas, sync_all_schemas
+
+
+class Command(BaseCommand):
+    help = "Show the schema changes pending for content types, and optionally apply them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("slugs", nargs="*", help="Content type slugs to plan. Defaults to all active types.")
+        parser.add_argument(
+            "--include-inactive",
+            action="store_true",
+            help="Include inactive content types.",
+        )
+        parser.add_argument(
+            "--apply",
+            action="store_true",
+            help="Apply the plan in one batched transaction after showing it.",
+        )
+
+    def handle(self, *args, **options):
+        qs = ContentTypeDefinition.objects.all()
+        if options["slugs"]:
+            qs = qs.filter(slug__in=options["slugs"])
+            missing = set(options["slugs"]) - set(qs.values_list("slug", flat=True))
+            if missing:
+                raise CommandError(f"Unknown content types: {', '.join(sorted(missing))}")
+        elif not options.get("include_inactive"):
+            qs = qs.filter(is_active=True)
+
+        planned = plan_all_schemas(qs)
+        pending = False
+        for content_type, plan in planned:
+            for error in plan.errors:
+                self.stdout.write(self.style.ERROR(f"{content_type.slug}: {error}"))
+            for warning in plan.warnings:
+                self.stdout.write(self.style.WARNING(f"{content_type.slug}: {warning}"))
+            for step in plan.steps:
+                pending = True
+                style = self.style.WARNING if step.dangerous else self.style.SUCCESS
+                self.stdout.write(style(f"{content_type.slug}: {step.describe()}"))
+
+        if not pending:
+            self.stdout.write("No schema changes pending.")
+            return
+        if not options.get("apply"):
+            self.stdout.write("Dry run only; pass --apply to run these steps.")
+            return
+
+        result = sync_all_schemas(qs)
+        for phase, seconds in result.timings.items():
+            self.stdout.write(f"{phase}: {seconds * 1000:.1f}ms")
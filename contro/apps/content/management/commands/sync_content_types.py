@@ -1,7 +1,7 @@
 from django.core.management.base import BaseCommand
 
 from contro.apps.content.models import ContentTypeDefinition
-from contro.apps.content.services.schema import sync_schema
+from contro.apps.content.services.schema import sync_all_schemas, sync_schema
 
 
 class Command(BaseCommand):
@@ -13,17 +13,33 @@ class Command(BaseCommand):
             action="store_true",
             help="Include inactive content types.",
         )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Sync all content types in one pass with a single introspection and DDL transaction.",
+        )
 
     def handle(self, *args, **options):
         qs = ContentTypeDefinition.objects.all()
         if not options.get("include_inactive"):
             qs = qs.filter(is_active=True)
 
+        if options.get("bulk"):
+            bulk_result = sync_all_schemas(qs)
+            for slug, result in bulk_result.results.items():
+                self._write_result(slug, result)
+            for phase, seconds in bulk_result.timings.items():
+                self.stdout.write(f"{phase}: {seconds * 1000:.1f}ms")
+            return
+
         for content_type in qs:
             result = sync_schema(content_type)
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"{content_type.slug}: table={'created' if result.created_table else 'existing'}, "
-                    f"added={len(result.added_columns)}, m2m={len(result.created_m2m_tables)}"
-                )
+            self._write_result(content_type.slug, result)
+
+    def _write_result(self, slug, result):
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{slug}: table={'created' if result.created_table else 'existing'}, "
+                f"added={len(result.added_columns)}, m2m={len(result.created_m2m_tables)}"
             )
+        )
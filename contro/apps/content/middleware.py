@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import DatabaseError
+
+from contro.apps.content.services.schema import aensure_schema_current, ensure_schema_current
+
+
+class SchemaGenerationMiddleware:
+    """Refreshes stale dynamic models before the request is handled."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        try:
+            ensure_schema_current()
+        except DatabaseError:
+            pass
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        try:
+            await aensure_schema_current()
+        except DatabaseError:
+            pass
+        return await self.get_response(request)
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("content", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SchemaGeneration",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("generation", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Schema Generation",
+                "verbose_name_plural": "Schema Generation",
+            },
+        ),
+        migrations.AddField(
+            model_name="contenttypedefinition",
+            name="schema_generation",
+            field=models.PositiveBigIntegerField(db_index=True, default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("content", "0002_schema_generation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentTypeDescriptor",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("generation", models.PositiveBigIntegerField()),
+                ("version", models.PositiveIntegerField()),
+                ("payload", models.JSONField()),
+                (
+                    "content_type",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="descriptor",
+                        to="content.contenttypedefinition",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Content Type Descriptor",
+                "verbose_name_plural": "Content Type Descriptors",
+            },
+        ),
+    ]
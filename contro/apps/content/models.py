@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 from django.utils.text import slugify
 
+from contro.apps.content.services.stats import COUNT_STRATEGIES
+
 
 class DynamicContentBase(models.Model):
     STATUS_DRAFT = "draft"
@@ -20,6 +23,9 @@ class DynamicContentBase(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_DRAFT, db_index=True)
     published_at = models.DateTimeField(null=True, blank=True)
 
+    # (target field, source field, allow_unicode) triples, set by build_dynamic_model.
+    __slug_sources__: tuple[tuple[str, str, bool], ...] = ()
+
     class Meta:
         abstract = True
 
@@ -41,25 +47,55 @@ class DynamicContentBase(models.Model):
         return super().save(*args, **kwargs)
 
     def _apply_slug_sources(self):
-        content_type_id = getattr(self, "__content_type_id__", None)
-        if not content_type_id:
-            return
-        from django.apps import apps
-
-        ContentFieldDefinition = apps.get_model("content", "ContentFieldDefinition")
-        field_defs = ContentFieldDefinition.objects.filter(
-            content_type_id=content_type_id, field_type=ContentFieldDefinition.FIELD_SLUG
-        )
-        for field_def in field_defs:
-            if getattr(self, field_def.slug):
-                continue
-            source = field_def.metadata.get("source")
-            if not source:
+        for target, source, allow_unicode in self.__slug_sources__:
+            if getattr(self, target):
                 continue
             source_value = getattr(self, source, None)
             if source_value:
-                allow_unicode = bool(field_def.metadata.get("allow_unicode", False))
-                setattr(self, field_def.slug, slugify(str(source_value), allow_unicode=allow_unicode))
+                setattr(self, target, slugify(str(source_value), allow_unicode=allow_unicode))
+
+
+class SchemaGeneration(models.Model):
+    """Single-row counter bumped whenever a content schema changes.
+
+    Every process compares the stored value against the generation it last
+    loaded to find out whether its dynamic models are stale.
+    """
+
+    SINGLETON_PK = 1
+
+    generation = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Schema Generation"
+        verbose_name_plural = "Schema Generation"
+
+    def __str__(self) -> str:
+        return f"Schema generation {self.generation}"
+
+    @classmethod
+    def current(cls) -> int:
+        generation = cls.objects.filter(pk=cls.SINGLETON_PK).values_list("generation", flat=True).first()
+        return generation or 0
+
+    @classmethod
+    async def acurrent(cls) -> int:
+        generation = await cls.objects.filter(pk=cls.SINGLETON_PK).values_list("generation", flat=True).afirst()
+        return generation or 0
+
+    @classmethod
+    def bump(cls, content_type_ids=()) -> int:
+        """Increment the counter and stamp the given content types with the new value."""
+        with transaction.atomic():
+            updated = cls.objects.filter(pk=cls.SINGLETON_PK).update(generation=F("generation") + 1)
+            if not updated:
+                cls.objects.get_or_create(pk=cls.SINGLETON_PK)
+                cls.objects.filter(pk=cls.SINGLETON_PK).update(generation=F("generation") + 1)
+            generation = cls.objects.filter(pk=cls.SINGLETON_PK).values_list("generation", flat=True).get()
+            content_type_ids = [pk for pk in content_type_ids if pk]
+            if content_type_ids:
+                ContentTypeDefinition.objects.filter(pk__in=content_type_ids).update(schema_generation=generation)
+        return generation
 
 
 class ContentTypeDefinition(models.Model):
@@ -69,6 +105,7 @@ class ContentTypeDefinition(models.Model):
     description = models.TextField(blank=True)
     metadata = models.JSONField(default=dict, blank=True)
     is_active = models.BooleanField(default=True)
+    schema_generation = models.PositiveBigIntegerField(default=0, editable=False, db_index=True)
 
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
@@ -90,10 +127,75 @@ class ContentTypeDefinition(models.Model):
             original = ContentTypeDefinition.objects.filter(pk=self.pk).values("slug").first()
             if original and original["slug"] != self.slug:
                 raise ValidationError("Slug cannot be changed once created.")
+        self._clean_index_specs()
+        self._clean_pagination()
+        self._clean_filtering()
+
+    def _clean_index_specs(self):
+        indexes = (self.metadata or {}).get("indexes", [])
+        if not isinstance(indexes, list):
+            raise ValidationError("metadata.indexes must be a list.")
+        statuses = {value for value, _ in DynamicContentBase.STATUS_CHOICES}
+        known = self.indexable_field_names()
+        for spec in indexes:
+            fields = spec.get("fields") if isinstance(spec, dict) else None
+            if not fields or not isinstance(fields, list) or not all(isinstance(name, str) and name for name in fields):
+                raise ValidationError("Each index needs a non-empty 'fields' list of field slugs.")
+            unknown = [name for name in fields if name.lstrip("-") not in known]
+            if unknown:
+                raise ValidationError(f"Index references unknown fields: {', '.join(unknown)}.")
+            if spec.get("status") not in statuses | {None}:
+                raise ValidationError(f"Index status must be one of: {', '.join(sorted(statuses))}.")
+
+    def indexable_field_names(self, field_defs=None) -> set[str]:
+        """Columns an index spec may name: the built-in ones and every non many-to-many field."""
+        names = {"id", "created_at", "updated_at", "status", "published_at"}
+        if field_defs is None:
+            field_defs = self.fields.all() if self.pk else ()
+        many = {ContentFieldDefinition.FIELD_M2M, ContentFieldDefinition.FIELD_MEDIA_M2M}
+        names.update(field_def.slug for field_def in field_defs if field_def.field_type not in many)
+        return names
+
+    def _clean_pagination(self):
+        pagination = (self.metadata or {}).get("pagination")
+        if pagination is None:
+            return
+        if not isinstance(pagination, dict):
+            raise ValidationError("metadata.pagination must be an object.")
+        page_size = pagination.get("page_size")
+        if page_size is not None and (not isinstance(page_size, int) or isinstance(page_size, bool) or page_size < 1):
+            raise ValidationError("metadata.pagination.page_size must be a positive integer.")
+        ordering = pagination.get("ordering")
+        if ordering is not None and (not isinstance(ordering, str) or not ordering.lstrip("-")):
+            raise ValidationError("metadata.pagination.ordering must be a field slug, optionally prefixed with '-'.")
+        count = pagination.get("count")
+        if count is not None and count not in COUNT_STRATEGIES:
+            raise ValidationError(f"metadata.pagination.count must be one of: {', '.join(COUNT_STRATEGIES)}.")
+
+    def _clean_filtering(self):
+        filtering = (self.metadata or {}).get("filtering")
+        if filtering is None:
+            return
+        if not isinstance(filtering, dict):
+            raise ValidationError("metadata.filtering must be an object.")
+        max_rows = filtering.get("max_unindexed_rows")
+        if max_rows is not None and (not isinstance(max_rows, int) or isinstance(max_rows, bool) or max_rows < 0):
+            raise ValidationError("metadata.filtering.max_unindexed_rows must be a non-negative integer.")
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        return super().save(*args, **kwargs)
+        result = super().save(*args, **kwargs)
+        self.schema_generation = SchemaGeneration.bump([self.pk])
+        return result
+
+    def delete(self, *args, **kwargs):
+        from contro.apps.content.services.schema import ensure_schema_current
+
+        result = super().delete(*args, **kwargs)
+        # Other processes drop the model when they see the new generation; this one does so right away.
+        SchemaGeneration.bump()
+        ensure_schema_current()
+        return result
 
     @property
     def db_table(self) -> str:
@@ -187,4 +289,36 @@ class ContentFieldDefinition(models.Model):
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        return super().save(*args, **kwargs)
+        result = super().save(*args, **kwargs)
+        self._bump_schema_generation()
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._bump_schema_generation()
+        return result
+
+    def _bump_schema_generation(self) -> None:
+        generation = SchemaGeneration.bump([self.content_type_id])
+        if ContentFieldDefinition.content_type.is_cached(self):
+            self.content_type.schema_generation = generation
+
+
+class ContentTypeDescriptor(models.Model):
+    """Compiled build input of a dynamic model, valid for one schema generation."""
+
+    content_type = models.OneToOneField(
+        ContentTypeDefinition,
+        on_delete=models.CASCADE,
+        related_name="descriptor",
+    )
+    generation = models.PositiveBigIntegerField()
+    version = models.PositiveIntegerField()
+    payload = models.JSONField()
+
+    class Meta:
+        verbose_name = "Content Type Descriptor"
+        verbose_name_plural = "Content Type Descriptors"
+
+    def __str__(self) -> str:
+        return f"{self.content_type_id}@{self.generation}"
@@ -0,0 +1,316 @@
+"""Create, update and delete dynamic entries in chunks."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field as dataclass_field
+from typing import Callable, Iterable, Sequence
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.validators import UniqueValidator
+
+from contro.apps.content.services.hooks import run_hooks
+
+
+DEFAULT_CHUNK_SIZE = 500
+UNIQUE_MESSAGE = "This field must be unique."
+
+
+@dataclass
+class BulkResult:
+    """Outcome per submitted item, keyed by its position in the payload."""
+
+    succeeded: list[tuple[int, object]] = dataclass_field(default_factory=list)
+    errors: list[tuple[int, object]] = dataclass_field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "results": [{"index": index, "id": pk} for index, pk in sorted(self.succeeded, key=_first)],
+            "errors": [{"index": index, "errors": errors} for index, errors in sorted(self.errors, key=_first)],
+        }
+
+
+@dataclass
+class _Row:
+    index: int
+    instance: object
+    m2m: dict
+    update_fields: set[str] = dataclass_field(default_factory=set)
+
+
+def bulk_create_entries(
+    model_class: type,
+    items: Sequence,
+    serializer_class: type,
+    context: dict | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    request=None,
+) -> BulkResult:
+    """Validate and insert ``items``, one transaction and one ``bulk_create`` per chunk.
+
+    Uniqueness is checked with one query per unique field and chunk. Invalid
+    items are reported and skipped; the rest of their chunk is still written.
+    """
+    result = BulkResult()
+    serializer = _batch_serializer(serializer_class, context)
+    for start in range(0, len(items), chunk_size):
+        rows = []
+        _prime_relations(serializer, items[start : start + chunk_size])
+        for index, item in enumerate(items[start : start + chunk_size], start):
+            data = _validate(serializer, index, item, result)
+            if data is None:
+                continue
+            m2m = _pop_m2m(model_class, data)
+            instance = model_class(**data)
+            instance._apply_slug_sources()
+            rows.append(_Row(index, instance, m2m))
+        rows = _check_unique(model_class, rows, result)
+        if not rows:
+            continue
+
+        run_hooks("pre_bulk_create", instances=[row.instance for row in rows], request=request)
+        with transaction.atomic():
+            rows = _insert(model_class, rows, result)
+            _write_m2m(model_class, rows, replace=False)
+        run_hooks("post_bulk_create", instances=[row.instance for row in rows], request=request)
+        result.succeeded.extend((row.index, row.instance.pk) for row in rows)
+    return result
+
+
+def bulk_update_entries(
+    model_class: type,
+    items: Sequence,
+    serializer_class: type,
+    context: dict | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    request=None,
+    can_change: Callable[[object], bool] | None = None,
+) -> BulkResult:
+    """Apply partial updates; every item needs the ``id`` of an existing entry.
+
+    Each chunk loads its entries in one query and writes them with one
+    ``bulk_update``. Many-to-many values replace the current ones.
+    """
+    result = BulkResult()
+    serializer = _batch_serializer(serializer_class, context, partial=True)
+    for start in range(0, len(items), chunk_size):
+        chunk = list(enumerate(items[start : start + chunk_size], start))
+        existing = model_class.objects.in_bulk(
+            [item["id"] for _, item in chunk if isinstance(item, dict) and _is_pk(item.get("id"))]
+        )
+        _prime_relations(serializer, [item for _, item in chunk])
+        rows = []
+        for index, item in chunk:
+            instance = existing.get(item.get("id")) if isinstance(item, dict) and _is_pk(item.get("id")) else None
+            if instance is None:
+                result.errors.append((index, {"id": ["Not found."]}))
+                continue
+            if can_change is not None and not can_change(instance):
+                result.errors.append((index, {"id": ["You do not have permission to change this entry."]}))
+                continue
+            data = _validate(serializer, index, {key: value for key, value in item.items() if key != "id"}, result)
+            if data is None:
+                continue
+            m2m = _pop_m2m(model_class, data)
+            for name, value in data.items():
+                setattr(instance, name, value)
+            instance._apply_slug_sources()
+            instance.updated_at = timezone.now()
+            update_fields = {model_class._meta.get_field(name).name for name in data}
+            update_fields.update(target for target, _, _ in model_class.__slug_sources__)
+            update_fields.add("updated_at")
+            rows.append(_Row(index, instance, m2m, update_fields))
+        rows = _check_unique(model_class, rows, result)
+        if not rows:
+            continue
+
+        run_hooks("pre_bulk_update", instances=[row.instance for row in rows], request=request)
+        with transaction.atomic():
+            rows = _update(model_class, rows, result)
+            _write_m2m(model_class, rows, replace=True)
+        run_hooks("post_bulk_update", instances=[row.instance for row in rows], request=request)
+        result.succeeded.extend((row.index, row.instance.pk) for row in rows)
+    return result
+
+
+def bulk_delete_entries(
+    model_class: type,
+    ids: Sequence,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    request=None,
+    can_delete: Callable[[object], bool] | None = None,
+) -> BulkResult:
+    """Delete the entries with the given primary keys, one query set per chunk."""
+    result = BulkResult()
+    for start in range(0, len(ids), chunk_size):
+        chunk = list(enumerate(ids[start : start + chunk_size], start))
+        existing = model_class.objects.in_bulk([pk for _, pk in chunk if _is_pk(pk)])
+        instances = []
+        for index, pk in chunk:
+            instance = existing.get(pk) if _is_pk(pk) else None
+            if instance is None:
+                result.errors.append((index, {"id": ["Not found."]}))
+            elif can_delete is not None and not can_delete(instance):
+                result.errors.append((index, {"id": ["You do not have permission to delete this entry."]}))
+            else:
+                instances.append((index, instance))
+        if not instances:
+            continue
+
+        entries = [instance for _, instance in instances]
+        run_hooks("pre_bulk_delete", instances=entries, request=request)
+        with transaction.atomic():
+            model_class.objects.filter(pk__in=[instance.pk for instance in entries]).delete()
+        run_hooks("post_bulk_delete", instances=entries, request=request)
+        result.succeeded.extend((index, instance.pk) for index, instance in instances)
+    return result
+
+
+def _batch_serializer(serializer_class: type, context: dict | None, partial: bool = False):
+    """Instantiate ``serializer_class`` once per batch, without per-row unique lookups."""
+    serializer = serializer_class(context=context or {}, partial=partial)
+    for field in serializer.fields.values():
+        field.validators = [validator for validator in field.validators if not isinstance(validator, UniqueValidator)]
+    return serializer
+
+
+def _prime_relations(serializer, items: Sequence) -> None:
+    """Load every related entry referenced by ``items`` with one query per relation field.
+
+    The serializer's primary key fields then resolve from that map instead of
+    fetching one row per value; unknown values still get the usual error.
+    """
+    for name, field in serializer.fields.items():
+        many = isinstance(field, ManyRelatedField)
+        relation = field.child_relation if many else field
+        if not isinstance(relation, PrimaryKeyRelatedField) or relation.read_only:
+            continue
+        pk_field = relation.get_queryset().model._meta.pk
+        pks = set()
+        for item in items:
+            value = item.get(name) if isinstance(item, dict) else None
+            for raw in (value if many and isinstance(value, list) else [value]):
+                try:
+                    pks.add(pk_field.to_python(raw))
+                except (TypeError, DjangoValidationError):
+                    continue
+        pks.discard(None)
+        loaded = relation.get_queryset().in_bulk(pks) if pks else {}
+        relation.to_internal_value = _cached_lookup(type(relation).to_internal_value.__get__(relation), pk_field, loaded)
+
+
+def _cached_lookup(lookup: Callable, pk_field, loaded: dict) -> Callable:
+    def to_internal_value(data):
+        try:
+            return loaded[pk_field.to_python(data)]
+        except (KeyError, TypeError, DjangoValidationError):
+            return lookup(data)
+
+    return to_internal_value
+
+
+def _validate(serializer, index: int, item, result: BulkResult) -> dict | None:
+    if not isinstance(item, dict):
+        result.errors.append((index, {"non_field_errors": ["Expected an object."]}))
+        return None
+    try:
+        return dict(serializer.run_validation(item))
+    except ValidationError as exc:
+        result.errors.append((index, exc.detail))
+        return None
+
+
+def _pop_m2m(model_class: type, data: dict) -> dict:
+    return {field.name: data.pop(field.name) for field in model_class._meta.many_to_many if field.name in data}
+
+
+def _check_unique(model_class: type, rows: list[_Row], result: BulkResult) -> list[_Row]:
+    """Drop rows that clash with stored entries or with earlier rows of the chunk."""
+    unique_fields = [field for field in model_class._meta.concrete_fields if field.unique and not field.primary_key]
+    own_pks = [row.instance.pk for row in rows if row.instance.pk is not None]
+    failed: dict[int, dict] = {}
+    for field in unique_fields:
+        values = {getattr(row.instance, field.attname) for row in rows}
+        values.discard(None)
+        if not values:
+            continue
+        taken = set(
+            model_class.objects.filter(**{f"{field.attname}__in": values})
+            .exclude(pk__in=own_pks)
+            .values_list(field.attname, flat=True)
+        )
+        for row in rows:
+            value = getattr(row.instance, field.attname)
+            if value is None:
+                continue
+            if value in taken:
+                failed.setdefault(row.index, {})[field.name] = [UNIQUE_MESSAGE]
+            taken.add(value)
+    result.errors.extend(failed.items())
+    return [row for row in rows if row.index not in failed]
+
+
+def _insert(model_class: type, rows: list[_Row], result: BulkResult) -> list[_Row]:
+    # Without RETURNING the new primary keys are unknown, so insert one by one.
+    if connection.features.can_return_rows_from_bulk_insert:
+        try:
+            with transaction.atomic():
+                model_class.objects.bulk_create([row.instance for row in rows])
+            return rows
+        except IntegrityError:
+            pass
+    return _save_each(rows, result, lambda row: row.instance.save(force_insert=True))
+
+
+def _update(model_class: type, rows: list[_Row], result: BulkResult) -> list[_Row]:
+    fields = sorted(set().union(*(row.update_fields for row in rows)))
+    try:
+        with transaction.atomic():
+            model_class.objects.bulk_update([row.instance for row in rows], fields)
+        return rows
+    except IntegrityError:
+        return _save_each(rows, result, lambda row: row.instance.save(update_fields=row.update_fields))
+
+
+def _save_each(rows: list[_Row], result: BulkResult, save: Callable[[_Row], None]) -> list[_Row]:
+    """Write rows individually, each in its own savepoint, to isolate the failing ones."""
+    saved = []
+    for row in rows:
+        try:
+            with transaction.atomic():
+                save(row)
+        except IntegrityError as exc:
+            result.errors.append((row.index, {"non_field_errors": [str(exc)]}))
+        else:
+            saved.append(row)
+    return saved
+
+
+def _write_m2m(model_class: type, rows: Iterable[_Row], replace: bool) -> None:
+    """Write many-to-many links straight into the through tables."""
+    rows = list(rows)
+    for field in model_class._meta.many_to_many:
+        through = field.remote_field.through
+        source = through._meta.get_field(field.m2m_field_name()).attname
+        target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+        provided = [row for row in rows if field.name in row.m2m]
+        if not provided:
+            continue
+        if replace:
+            through.objects.filter(**{f"{source}__in": [row.instance.pk for row in provided]}).delete()
+        links = [
+            through(**{source: row.instance.pk, target: related.pk})
+            for row in provided
+            for related in row.m2m[field.name]
+        ]
+        through.objects.bulk_create(links, ignore_conflicts=True)
+
+
+def _is_pk(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _first(pair: tuple) -> int:
+    return pair[0]
@@ -0,0 +1,133 @@
+"""Compact, versioned descriptors that rebuild dynamic models without per-type queries."""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db.models import QuerySet
+
+from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition, ContentTypeDescriptor
+
+
+# Bump whenever the payload layout changes; older rows are recompiled on load.
+DESCRIPTOR_VERSION = 1
+
+_CONTENT_TYPE_KEYS = ("id", "name", "slug", "plural_name", "description", "metadata", "is_active")
+_FIELD_KEYS = (
+    "id",
+    "name",
+    "slug",
+    "field_type",
+    "required",
+    "unique",
+    "default_value",
+    "metadata",
+    "related_name",
+    "order",
+)
+
+
+def compile_descriptor(content_type: ContentTypeDefinition, field_defs: Iterable[ContentFieldDefinition]) -> dict:
+    """Serialize everything ``build_dynamic_model`` reads.
+
+    Validators and indexes are derived from the field and type metadata kept
+    in the payload, so they are rebuilt exactly as from the database rows.
+    """
+    fields = []
+    for field_def in field_defs:
+        data = {key: getattr(field_def, key) for key in _FIELD_KEYS}
+        target = field_def.relation_target
+        data["relation_target"] = {"id": target.id, "slug": target.slug} if target is not None else None
+        fields.append(data)
+    return {
+        "version": DESCRIPTOR_VERSION,
+        "content_type": {key: getattr(content_type, key) for key in _CONTENT_TYPE_KEYS},
+        "fields": fields,
+        "relation_targets": sorted({field["relation_target"]["slug"] for field in fields if field["relation_target"]}),
+    }
+
+
+def content_type_from_descriptor(payload: dict, schema_generation: int) -> ContentTypeDefinition:
+    """Rebuild an unsaved content type whose ``fields`` relation is already populated."""
+    content_type = ContentTypeDefinition(schema_generation=schema_generation, **payload["content_type"])
+    field_defs = []
+    for data in payload["fields"]:
+        data = dict(data)
+        target = data.pop("relation_target")
+        field_def = ContentFieldDefinition(content_type=content_type, **data)
+        if target is not None:
+            field_def.relation_target = ContentTypeDefinition(id=target["id"], slug=target["slug"])
+        field_defs.append(field_def)
+    _set_prefetched_fields(content_type, field_defs)
+    return content_type
+
+
+def save_descriptors(items: Iterable[tuple[ContentTypeDefinition, dict]]) -> None:
+    """Upsert the descriptors of saved content types in one statement."""
+    rows = [
+        ContentTypeDescriptor(
+            content_type_id=content_type.pk,
+            generation=content_type.schema_generation,
+            version=payload["version"],
+            payload=payload,
+        )
+        for content_type, payload in items
+        if content_type.pk
+    ]
+    if rows:
+        ContentTypeDescriptor.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["content_type"],
+            update_fields=["generation", "version", "payload"],
+        )
+
+
+def load_content_types(queryset: QuerySet) -> list[ContentTypeDefinition]:
+    """Return content types ready for ``build_dynamic_model``, plus their relation targets.
+
+    Types with a current descriptor are rebuilt from it. Stale or missing ones
+    are read with their fields and get a fresh descriptor. Each round costs one
+    joined query, plus one prefetch when something is stale.
+    """
+    loaded: dict[str, ContentTypeDefinition] = {}
+    pending = queryset
+    while pending is not None:
+        stale = []
+        for content_type in pending.select_related("descriptor"):
+            if content_type.slug in loaded:
+                continue
+            descriptor = getattr(content_type, "descriptor", None)
+            if (
+                descriptor is not None
+                and descriptor.version == DESCRIPTOR_VERSION
+                and descriptor.generation == content_type.schema_generation
+            ):
+                loaded[content_type.slug] = content_type_from_descriptor(
+                    descriptor.payload, content_type.schema_generation
+                )
+            else:
+                stale.append(content_type.pk)
+        if stale:
+            fresh = ContentTypeDefinition.objects.filter(pk__in=stale).prefetch_related("fields__relation_target")
+            compiled = []
+            for content_type in fresh:
+                field_defs = sorted(content_type.fields.all(), key=lambda field_def: (field_def.order, field_def.id))
+                compiled.append((content_type, compile_descriptor(content_type, field_defs)))
+                loaded[content_type.slug] = content_type
+            save_descriptors(compiled)
+
+        missing = {
+            field_def.relation_target.slug
+            for content_type in loaded.values()
+            for field_def in content_type.fields.all()
+            if field_def.relation_target is not None and field_def.relation_target.slug not in loaded
+        }
+        pending = ContentTypeDefinition.objects.filter(slug__in=missing) if missing else None
+    return list(loaded.values())
+
+
+def _set_prefetched_fields(content_type: ContentTypeDefinition, field_defs: list[ContentFieldDefinition]) -> None:
+    queryset = content_type.fields.all()
+    queryset._result_cache = field_defs
+    queryset._prefetch_done = True
+    content_type._prefetched_objects_cache = {"fields": queryset}
@@ -0,0 +1,123 @@
+"""Stream content entries as NDJSON or CSV with constant memory."""
+from __future__ import annotations
+
+import csv
+import json
+from typing import Iterable, Iterator
+
+from django.core.exceptions import FieldDoesNotExist
+
+from contro.apps.content.services.serializers import load_m2m_ids
+
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+CONTENT_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv",
+}
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_field_names(model_class: type, fields: Iterable[str] | None = None) -> list[str]:
+    """Validate ``fields`` against the model; defaults to every concrete and many-to-many field."""
+    opts = model_class._meta
+    available = [field.name for field in opts.concrete_fields] + [field.name for field in opts.many_to_many]
+    if fields is None:
+        return available
+    fields = list(dict.fromkeys(fields))
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def filter_queryset(queryset, filters: dict[str, str] | None):
+    """Apply ``field`` or ``field__lookup`` filters after checking the field exists."""
+    if not filters:
+        return queryset
+    for lookup in filters:
+        try:
+            queryset.model._meta.get_field(lookup.split("__", 1)[0])
+        except FieldDoesNotExist:
+            raise ValueError(f"Unknown filter field: {lookup}")
+    return queryset.filter(**filters)
+
+
+def iter_rows(queryset, fields: list[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[dict]:
+    """Yield one dict per entry in primary key order.
+
+    Columns come from ``values().iterator()``, which uses a server-side cursor
+    on PostgreSQL. Many-to-many ids are read with one query per field and
+    chunk of rows.
+    """
+    opts = queryset.model._meta
+    m2m_fields = [opts.get_field(name) for name in fields if opts.get_field(name).many_to_many]
+    columns = [name for name in fields if not opts.get_field(name).many_to_many]
+    if opts.pk.name not in columns:
+        columns.append(opts.pk.name)
+
+    rows = queryset.order_by(opts.pk.name).values(*columns).iterator(chunk_size=chunk_size)
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _with_m2m(chunk, m2m_fields, fields, opts.pk.name)
+            chunk = []
+    if chunk:
+        yield from _with_m2m(chunk, m2m_fields, fields, opts.pk.name)
+
+
+def render_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, default=_json_default) + "\n"
+
+
+def render_csv(rows: Iterable[dict], fields: list[str]) -> Iterator[str]:
+    """Yield CSV lines; many-to-many cells hold JSON lists of ids."""
+    buffer = _Echo()
+    writer = csv.writer(buffer)
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_csv_value(row[name]) for name in fields])
+
+
+def render(rows: Iterable[dict], fields: list[str], output: str) -> Iterator[str]:
+    if output == FORMAT_NDJSON:
+        return render_ndjson(rows)
+    if output == FORMAT_CSV:
+        return render_csv(rows, fields)
+    raise ValueError(f"Unsupported export format: {output}")
+
+
+def _with_m2m(chunk: list[dict], m2m_fields: list, fields: list[str], pk_name: str) -> Iterator[dict]:
+    pks = [row[pk_name] for row in chunk]
+    related = {field.name: load_m2m_ids(field, pks) for field in m2m_fields}
+    for row in chunk:
+        for name, links in related.items():
+            row[name] = links.get(row[pk_name], [])
+        yield {name: row[name] for name in fields}
+
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _json_default(value):
+    # Full precision, unlike DjangoJSONEncoder which truncates datetimes to milliseconds.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to ``csv.writer``."""
+
+    def write(self, value):
+        return value
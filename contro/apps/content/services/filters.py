@@ -0,0 +1,288 @@
+"""Parse ``filters[field][$op]=value`` queries into lookups, with an index policy."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field as dataclass_field
+from typing import Iterable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+from contro.apps.content.models import ContentFieldDefinition
+from contro.apps.content.services.stats import estimate_table_rows
+
+
+FILTER_PARAM = "filters"
+_PARAM_RE = re.compile(r"^filters((?:\[[^\[\]]*\])+)$")
+_SEGMENT_RE = re.compile(r"\[([^\[\]]*)\]")
+
+# Operator -> (Django lookup, negated).
+OPERATORS = {
+    "$eq": ("exact", False),
+    "$ne": ("exact", True),
+    "$in": ("in", False),
+    "$notIn": ("in", True),
+    "$lt": ("lt", False),
+    "$lte": ("lte", False),
+    "$gt": ("gt", False),
+    "$gte": ("gte", False),
+    "$contains": ("contains", False),
+    "$containsi": ("icontains", False),
+    "$startsWith": ("startswith", False),
+    "$endsWith": ("endswith", False),
+    "$null": ("isnull", False),
+}
+LIST_OPERATORS = {"$in", "$notIn"}
+# Operators a B-tree index can answer without reading the whole table.
+INDEXABLE_OPERATORS = {"$eq", "$in", "$lt", "$lte", "$gt", "$gte", "$null"}
+
+_TEXT_OPERATORS = {"$eq", "$ne", "$in", "$notIn", "$contains", "$containsi", "$startsWith", "$endsWith", "$null"}
+_RANGE_OPERATORS = {"$eq", "$ne", "$in", "$notIn", "$lt", "$lte", "$gt", "$gte", "$null"}
+_RELATION_OPERATORS = {"$eq", "$ne", "$in", "$notIn", "$null"}
+
+FIELD_TYPE_OPERATORS = {
+    ContentFieldDefinition.FIELD_TEXT: _TEXT_OPERATORS,
+    ContentFieldDefinition.FIELD_SLUG: _TEXT_OPERATORS,
+    ContentFieldDefinition.FIELD_NUMBER: _RANGE_OPERATORS,
+    ContentFieldDefinition.FIELD_DATE: _RANGE_OPERATORS,
+    ContentFieldDefinition.FIELD_BOOLEAN: {"$eq", "$ne", "$null"},
+    ContentFieldDefinition.FIELD_FK: _RELATION_OPERATORS,
+    ContentFieldDefinition.FIELD_MEDIA: _RELATION_OPERATORS,
+    ContentFieldDefinition.FIELD_M2M: _RELATION_OPERATORS,
+    ContentFieldDefinition.FIELD_MEDIA_M2M: _RELATION_OPERATORS,
+}
+# Columns every dynamic model has, outside the descriptor.
+BUILTIN_OPERATORS = {
+    "id": _RANGE_OPERATORS,
+    "created_at": _RANGE_OPERATORS,
+    "updated_at": _RANGE_OPERATORS,
+    "published_at": _RANGE_OPERATORS,
+    "status": {"$eq", "$ne", "$in", "$notIn"},
+}
+RELATION_TYPES = {
+    ContentFieldDefinition.FIELD_FK,
+    ContentFieldDefinition.FIELD_MEDIA,
+    ContentFieldDefinition.FIELD_M2M,
+    ContentFieldDefinition.FIELD_MEDIA_M2M,
+}
+_TRUE = {"true", "t", "1"}
+_FALSE = {"false", "f", "0"}
+
+
+@dataclass
+class FilterCondition:
+    """One ``filters[...]`` parameter: a field path, an operator and its raw value(s)."""
+
+    path: list[str]
+    operator: str
+    value: object
+
+
+@dataclass
+class FilterPlan:
+    q: Q = dataclass_field(default_factory=Q)
+    # Set when a condition crosses a many-to-many relation and could repeat rows.
+    multi_valued: bool = False
+    # (model, field, operator) of unindexed conditions still to check against table sizes.
+    scans: list[tuple[type, str, str]] = dataclass_field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.q)
+
+    def apply(self, queryset):
+        if not self:
+            return queryset
+        if self.multi_valued:
+            # A subquery keeps one row per entry without DISTINCT on the outer query.
+            return queryset.filter(pk__in=queryset.model._default_manager.filter(self.q).values("pk"))
+        return queryset.filter(self.q)
+
+
+def parse_filters(params) -> list[FilterCondition]:
+    """Read ``filters[...]`` keys from a ``QueryDict``.
+
+    ``filters[title]=x`` is shorthand for ``filters[title][$eq]=x``. List
+    operators take repeated or indexed parameters:
+    ``filters[id][$in][0]=1&filters[id][$in][1]=2``.
+    """
+    conditions: dict[tuple, FilterCondition] = {}
+    for key in params:
+        match = _PARAM_RE.match(key)
+        if match is None:
+            if key.startswith(f"{FILTER_PARAM}["):
+                raise ValueError(f"Malformed filter parameter '{key}'.")
+            continue
+        segments = _SEGMENT_RE.findall(match.group(1))
+        operator = "$eq"
+        if segments and segments[-1].isdigit() and len(segments) > 1 and segments[-2] in LIST_OPERATORS:
+            segments = segments[:-1]
+        if segments and segments[-1].startswith("$"):
+            operator = segments.pop()
+        if not segments or not all(segments):
+            raise ValueError(f"Malformed filter parameter '{key}'.")
+        if operator not in OPERATORS:
+            raise ValueError(f"Unknown filter operator '{operator}'.")
+        values = params.getlist(key)
+        condition = conditions.setdefault(
+            (tuple(segments), operator), FilterCondition(segments, operator, [] if operator in LIST_OPERATORS else None)
+        )
+        if operator in LIST_OPERATORS:
+            condition.value.extend(values)
+        else:
+            condition.value = values[-1]
+    return list(conditions.values())
+
+
+def build_filter_plan(model_class: type, conditions: Iterable[FilterCondition], max_depth: int) -> FilterPlan:
+    """Resolve ``conditions`` against the field types in the models' descriptors.
+
+    Raises ``ValueError`` for unknown fields, operators a field type does not
+    support, invalid values, paths through more than ``max_depth`` relations,
+    and conditions the index policy rejects (see ``check_index_policy``).
+    """
+    plan = _plan_filters(model_class, conditions, max_depth)
+    _check_scans(plan)
+    return plan
+
+
+async def abuild_filter_plan(model_class: type, conditions: Iterable[FilterCondition], max_depth: int) -> FilterPlan:
+    """Async ``build_filter_plan``; only table size estimates for the index policy run in a thread."""
+    plan = _plan_filters(model_class, conditions, max_depth)
+    if plan.scans:
+        await sync_to_async(_check_scans)(plan)
+    return plan
+
+
+def _plan_filters(model_class: type, conditions: Iterable[FilterCondition], max_depth: int) -> FilterPlan:
+    plan = FilterPlan()
+    for condition in conditions:
+        current_model = model_class
+        lookup = []
+        for position, part in enumerate(condition.path):
+            field_type = _field_types(current_model).get(part)
+            if field_type is None:
+                raise ValueError(f"'{part}' is not a filterable field of {current_model._meta.model_name}.")
+            lookup.append(part)
+            last = position == len(condition.path) - 1
+            if field_type not in RELATION_TYPES:
+                if not last:
+                    raise ValueError(f"'{part}' of {current_model._meta.model_name} is not a relation.")
+                break
+            model_field = current_model._meta.get_field(part)
+            plan.multi_valued = plan.multi_valued or model_field.many_to_many
+            if last:
+                break
+            if len(lookup) > max_depth:
+                raise ValueError(f"'{'.'.join(condition.path)}' crosses more than {max_depth} relations.")
+            current_model = model_field.related_model
+            if getattr(current_model, "__descriptor__", None) is None:
+                raise ValueError(f"Fields of {current_model._meta.model_name} cannot be filtered.")
+
+        allowed = BUILTIN_OPERATORS.get(part) or FIELD_TYPE_OPERATORS[field_type]
+        if condition.operator not in allowed:
+            raise ValueError(f"Operator {condition.operator} is not supported for '{'.'.join(condition.path)}'.")
+        if _needs_scan_check(current_model, part, condition.operator):
+            plan.scans.append((current_model, part, condition.operator))
+
+        django_lookup, negated = OPERATORS[condition.operator]
+        value = _clean_value(current_model._meta.get_field(part), condition.operator, condition.value)
+        q = Q(**{f"{'__'.join(lookup)}__{django_lookup}": value})
+        plan.q &= ~q if negated else q
+    return plan
+
+
+def check_index_policy(model_class: type, field_name: str, operator: str) -> None:
+    """Reject scans of large tables.
+
+    A condition that no index can answer is refused when the table's
+    estimated row count exceeds ``metadata.filtering.max_unindexed_rows`` of
+    its content type (default ``CONTRO_API_FILTER_MAX_UNINDEXED_ROWS``; 0
+    disables the check). Unknown estimates are allowed.
+    """
+    if not _needs_scan_check(model_class, field_name, operator):
+        return
+    rows = estimate_table_rows(model_class._meta.db_table)
+    if rows is not None and rows > _scan_limit(model_class):
+        raise ValueError(
+            f"Filtering {model_class._meta.model_name}.{field_name} with {operator} needs a full scan of ~{rows} rows; "
+            f"use an indexed field with $eq, $in, $lt, $lte, $gt, $gte or $null."
+        )
+
+
+def _needs_scan_check(model_class: type, field_name: str, operator: str) -> bool:
+    if not _scan_limit(model_class):
+        return False
+    return operator not in INDEXABLE_OPERATORS or field_name not in indexed_fields(model_class)
+
+
+def _scan_limit(model_class: type) -> int:
+    return filter_policy(model_class).get("max_unindexed_rows", settings.CONTRO_API_FILTER_MAX_UNINDEXED_ROWS)
+
+
+def _check_scans(plan: FilterPlan) -> None:
+    for model_class, field_name, operator in plan.scans:
+        check_index_policy(model_class, field_name, operator)
+
+
+def filter_policy(model_class: type) -> dict:
+    descriptor = getattr(model_class, "__descriptor__", None) or {}
+    policy = (descriptor.get("content_type", {}).get("metadata") or {}).get("filtering")
+    return policy if isinstance(policy, dict) else {}
+
+
+def indexed_fields(model_class: type) -> set[str]:
+    """Field names an index can look up: keys, indexed or unique columns, leading index fields, relations."""
+    opts = model_class._meta
+    names = {field.name for field in opts.concrete_fields if field.primary_key or field.db_index or field.unique}
+    # Through tables index both sides of every link.
+    names.update(field.name for field in opts.many_to_many)
+    for index in opts.indexes:
+        if index.condition is None:
+            names.add(index.fields[0].lstrip("-"))
+    return names
+
+
+def _field_types(model_class: type) -> dict[str, str]:
+    descriptor = getattr(model_class, "__descriptor__", None)
+    types = {name: name for name in BUILTIN_OPERATORS}
+    if descriptor is not None:
+        types.update({field["slug"]: field["field_type"] for field in descriptor["fields"]})
+    return types
+
+
+def _clean_value(model_field, operator: str, raw):
+    if operator == "$null":
+        return _parse_bool(raw)
+    if operator in LIST_OPERATORS:
+        if not raw:
+            raise ValueError(f"{operator} needs at least one value.")
+        return [_to_python(model_field, item) for item in raw]
+    if operator in {"$contains", "$containsi", "$startsWith", "$endsWith"}:
+        return raw
+    return _to_python(model_field, raw)
+
+
+def _to_python(model_field, raw):
+    if model_field.is_relation:
+        model_field = model_field.target_field
+    if model_field.get_internal_type() == "BooleanField":
+        return _parse_bool(raw)
+    try:
+        value = model_field.to_python(raw)
+    except DjangoValidationError as exc:
+        raise ValueError(f"Invalid value {raw!r} for '{model_field.name}': {' '.join(exc.messages)}")
+    if model_field.get_internal_type() == "DateTimeField" and settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _parse_bool(raw) -> bool:
+    text = str(raw).lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError(f"Expected true or false, got {raw!r}.")
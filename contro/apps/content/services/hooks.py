@@ -15,6 +15,13 @@ HOOK_EVENTS = {
     "post_publish",
     "pre_unpublish",
     "post_unpublish",
+    # Bulk endpoints fire one event per chunk with ``instances`` instead of ``instance``.
+    "pre_bulk_create",
+    "post_bulk_create",
+    "pre_bulk_update",
+    "post_bulk_update",
+    "pre_bulk_delete",
+    "post_bulk_delete",
 }
 
 _HOOKS: Dict[str, Dict[str, List[Callable]]] = defaultdict(lambda: defaultdict(list))
@@ -33,6 +40,8 @@ def run_hooks(event: str, instance=None, **kwargs) -> None:
     slug = None
     if instance is not None:
         slug = getattr(instance, "__content_type_slug__", None)
+    elif kwargs.get("instances"):
+        slug = getattr(kwargs["instances"][0], "__content_type_slug__", None)
 
     for func in _HOOKS[event].get("*", []):
         func(instance=instance, **kwargs)
@@ -0,0 +1,191 @@
+"""Stream NDJSON or CSV records into a content type through the bulk service."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from dataclasses import asdict, dataclass, field as dataclass_field
+from typing import Iterable, Iterator
+
+from django.core.exceptions import ValidationError
+
+from contro.apps.content.services.bulk import bulk_create_entries
+from contro.apps.content.services.schema import load_all_models, loaded_models
+from contro.apps.content.services.serializers import get_serializer_for_model
+
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+
+
+@dataclass
+class ChunkResult:
+    start: int
+    count: int
+    created: int
+    # (index in the file, validation errors, the record as read)
+    errors: list[tuple[int, object, object]] = dataclass_field(default_factory=list)
+
+
+@dataclass
+class Checkpoint:
+    """Number of leading records already imported from ``source``."""
+
+    path: str
+    source: str
+    position: int = 0
+    created: int = 0
+    errors: int = 0
+
+    @classmethod
+    def load(cls, path: str, source: str) -> "Checkpoint":
+        if not os.path.exists(path):
+            return cls(path=path, source=source)
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        if data.get("source") != source:
+            raise ValueError(f"Checkpoint {path} belongs to {data.get('source')}, not {source}.")
+        return cls(path=path, **{key: data[key] for key in ("source", "position", "created", "errors")})
+
+    def save(self) -> None:
+        data = {key: value for key, value in asdict(self).items() if key != "path"}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+        os.replace(temp_path, self.path)
+
+
+def detect_format(path: str) -> str:
+    return FORMAT_CSV if path.lower().endswith(".csv") else FORMAT_NDJSON
+
+
+def read_records(
+    path: str,
+    file_format: str,
+    column_map: dict[str, str] | None = None,
+    list_fields: Iterable[str] = (),
+) -> Iterator[dict]:
+    """Yield records one by one, renaming columns with ``column_map``.
+
+    CSV cells are strings: empty cells become ``None``, and cells of the
+    ``list_fields`` columns (many-to-many ids, which ``export_content`` writes
+    as JSON lists) are decoded.
+    """
+    column_map = column_map or {}
+    list_fields = set(list_fields)
+    with open(path, encoding="utf-8", newline="") as handle:
+        if file_format == FORMAT_CSV:
+            for row in csv.DictReader(handle):
+                record = {}
+                for key, value in row.items():
+                    name = column_map.get(key, key)
+                    record[name] = _csv_cell(value, name in list_fields)
+                yield record
+        else:
+            for number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as exc:
+                    raise ValueError(f"Invalid JSON on line {number}: {exc}")
+                if isinstance(record, dict):
+                    record = {column_map.get(key, key): value for key, value in record.items()}
+                yield record
+
+
+def resolve_natural_keys(model_class: type, records: list, lookups: dict[str, str]) -> dict[int, dict]:
+    """Replace relation values with primary keys, looked up by ``lookups[field]`` on the target.
+
+    Values are converted with the key field's ``to_python`` first, so CSV
+    strings match numeric or date keys. Costs one query per relation field for
+    the whole batch. Records are updated in place; the returned errors are
+    keyed by position in ``records``.
+    """
+    errors: dict[int, dict] = {}
+    for field_name, key in lookups.items():
+        field = model_class._meta.get_field(field_name)
+        key_field = field.related_model._meta.get_field(key)
+        many = field.many_to_many
+        wanted: dict[int, list] = {}
+        for position, record in enumerate(records):
+            value = record.get(field_name) if isinstance(record, dict) else None
+            if value is None:
+                continue
+            items = value if many and isinstance(value, list) else [value]
+            try:
+                wanted[position] = [key_field.to_python(item) for item in items]
+            except ValidationError:
+                errors.setdefault(position, {})[field_name] = [f"Invalid {key}: {value!r}."]
+        values = {item for items in wanted.values() for item in items}
+        if not values:
+            continue
+        found = dict(field.related_model._default_manager.filter(**{f"{key}__in": values}).values_list(key, "pk"))
+        for position, items in wanted.items():
+            missing = [item for item in items if item not in found]
+            if missing:
+                errors.setdefault(position, {})[field_name] = [
+                    f"No {field.related_model._meta.verbose_name} with {key}={item!r}." for item in missing
+                ]
+                continue
+            records[position][field_name] = [found[item] for item in items] if many else found[items[0]]
+    return errors
+
+
+def import_chunk(slug: str, start: int, records: list, lookups: dict[str, str]) -> ChunkResult:
+    """Import one chunk; safe to run in a worker process.
+
+    The model must already be loaded, by the command or by ``init_worker``,
+    so that workers never sync schemas.
+    """
+    model_class = loaded_models().get(slug)
+    if model_class is None:
+        raise ValueError(f"Content type {slug} is not loaded.")
+    originals = records
+    # Keys are resolved on copies so rejected records are reported as they were read.
+    records = [dict(record) if isinstance(record, dict) else record for record in records]
+    errors = resolve_natural_keys(model_class, records, lookups)
+    pending = [(position, record) for position, record in enumerate(records) if position not in errors]
+    result = bulk_create_entries(
+        model_class,
+        [record for _, record in pending],
+        get_serializer_for_model(model_class),
+        chunk_size=max(len(pending), 1),
+    )
+    failed = list(errors.items())
+    # Plain data, so results pickle cleanly back from worker processes.
+    failed.extend((pending[index][0], json.loads(json.dumps(detail))) for index, detail in result.errors)
+    chunk_errors = [(start + position, detail, originals[position]) for position, detail in failed]
+    return ChunkResult(
+        start=start,
+        count=len(records),
+        created=len(result.succeeded),
+        errors=sorted(chunk_errors, key=lambda error: error[0]),
+    )
+
+
+def _csv_cell(value: str | None, is_list: bool = False):
+    if value is None or value == "":
+        return None
+    if is_list and value.startswith("["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def init_worker() -> None:
+    """Process pool initializer: set Django up, drop inherited connections and load the models.
+
+    Models are built from their stored definitions without creating tables;
+    the command has synced the imported type before starting the pool.
+    """
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+    load_all_models(create_missing=False)
@@ -0,0 +1,366 @@
+"""Diff dynamic models against the live database and apply the changes in one batch."""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field as dataclass_field
+from typing import Iterable
+
+from django.db import connection, models
+
+from contro.apps.content.services.stats import estimate_table_rows
+
+
+ACTION_CREATE_TABLE = "create_table"
+ACTION_ADD_COLUMN = "add_column"
+ACTION_ALTER_COLUMN = "alter_column"
+ACTION_CREATE_M2M_TABLE = "create_m2m_table"
+ACTION_CREATE_INDEX = "create_index"
+ACTION_ADD_INDEX = "add_index"
+ACTION_REMOVE_INDEX = "remove_index"
+
+# Steps run in this order regardless of the model they belong to.
+ACTION_ORDER = (
+    ACTION_CREATE_TABLE,
+    ACTION_ADD_COLUMN,
+    ACTION_ALTER_COLUMN,
+    ACTION_CREATE_M2M_TABLE,
+    ACTION_REMOVE_INDEX,
+    ACTION_CREATE_INDEX,
+    ACTION_ADD_INDEX,
+)
+INDEX_ACTIONS = {ACTION_CREATE_INDEX, ACTION_ADD_INDEX, ACTION_REMOVE_INDEX}
+
+
+@dataclass
+class ColumnInfo:
+    # Declared type, normalized as ``_column_type`` normalizes a field's; None where it is not compared.
+    db_type: str | None
+    null: bool
+
+
+@dataclass
+class DatabaseState:
+    tables: set[str]
+    columns: dict[str, set[str]]
+    # Usable indexes only; see invalid_indexes.
+    indexes: dict[str, set[str]]
+    # PostgreSQL indexes left INVALID by a failed CREATE INDEX CONCURRENTLY.
+    invalid_indexes: dict[str, set[str]] = dataclass_field(default_factory=dict)
+    # Type and nullability of each column of ``columns``.
+    column_info: dict[str, dict[str, ColumnInfo]] = dataclass_field(default_factory=dict)
+
+
+@dataclass
+class PlanStep:
+    action: str
+    model: type
+    table: str
+    target: str
+    field: models.Field | None = None
+    index: models.Index | None = None
+    estimated_rows: int | None = None
+    dangerous: bool = False
+    reason: str = ""
+    concurrent: bool = False
+
+    def describe(self) -> str:
+        rows = "unknown" if self.estimated_rows is None else f"~{self.estimated_rows}"
+        text = f"{self.action} {self.table}.{self.target} (rows: {rows})"
+        if self.concurrent:
+            text += " [concurrently]"
+        if self.dangerous:
+            text += f" [DANGEROUS: {self.reason}]"
+        return text
+
+
+@dataclass
+class SchemaPlan:
+    model: type
+    steps: list[PlanStep] = dataclass_field(default_factory=list)
+    errors: list[str] = dataclass_field(default_factory=list)
+    # Differences the plan reports but leaves alone, such as columns no field uses any more.
+    warnings: list[str] = dataclass_field(default_factory=list)
+
+    @property
+    def dangerous_steps(self) -> list[PlanStep]:
+        return [step for step in self.steps if step.dangerous]
+
+    def targets(self, action: str) -> list[str]:
+        return [step.target for step in self.steps if step.action == action]
+
+
+def introspect_database(tables: Iterable[str]) -> DatabaseState:
+    """Read table names, plus columns and index names of the existing ``tables``.
+
+    PostgreSQL reads every column and index in two catalog queries and sets
+    aside invalid indexes, so the planner rebuilds them; other backends
+    describe each existing table individually. Column types are read on
+    PostgreSQL and SQLite only.
+    """
+    with connection.cursor() as cursor:
+        existing_tables = {table.name for table in connection.introspection.get_table_list(cursor)}
+        wanted = sorted(set(tables) & existing_tables)
+        state = DatabaseState(
+            tables=existing_tables,
+            columns={table: set() for table in wanted},
+            indexes={table: set() for table in wanted},
+        )
+        if not wanted:
+            return state
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT t.relname, a.attname, format_type(a.atttypid, a.atttypmod), NOT a.attnotnull "
+                "FROM pg_attribute a "
+                "JOIN pg_class t ON t.oid = a.attrelid "
+                "JOIN pg_namespace n ON n.oid = t.relnamespace "
+                "WHERE n.nspname = current_schema() AND t.relname = ANY(%s) AND a.attnum > 0 AND NOT a.attisdropped",
+                [wanted],
+            )
+            for table, column, db_type, null in cursor.fetchall():
+                state.columns[table].add(column)
+                state.column_info.setdefault(table, {})[column] = ColumnInfo(_normalize_type(db_type), null)
+            cursor.execute(
+                "SELECT t.relname, i.relname, x.indisvalid FROM pg_index x "
+                "JOIN pg_class i ON i.oid = x.indexrelid "
+                "JOIN pg_class t ON t.oid = x.indrelid "
+                "JOIN pg_namespace n ON n.oid = t.relnamespace "
+                "WHERE n.nspname = current_schema() AND t.relname = ANY(%s)",
+                [wanted],
+            )
+            for table, index, valid in cursor.fetchall():
+                if valid:
+                    state.indexes[table].add(index)
+                else:
+                    state.invalid_indexes.setdefault(table, set()).add(index)
+        else:
+            for table in wanted:
+                description = connection.introspection.get_table_description(cursor, table)
+                state.columns[table] = {col.name for col in description}
+                state.column_info[table] = {
+                    # SQLite reports the declared type; other backends report driver type codes.
+                    col.name: ColumnInfo(
+                        _normalize_type(col.type_code) if connection.vendor == "sqlite" else None, bool(col.null_ok)
+                    )
+                    for col in description
+                }
+                state.indexes[table] = set(connection.introspection.get_constraints(cursor, table))
+    return state
+
+
+def plan_model(model_class: type, state: DatabaseState, managed_index_prefix: str | None = None) -> SchemaPlan:
+    """Return the steps needed to bring the tables of ``model_class`` in line with it.
+
+    Existing indexes whose name starts with ``managed_index_prefix`` but that
+    the model no longer declares are planned for removal. Invalid indexes are
+    dropped and, if the model still declares them, built again. Columns whose
+    nullability changed are altered; columns whose type changed are errors,
+    since converting existing values needs a hand-written migration; columns
+    no field declares any more are reported and kept.
+    """
+    plan = SchemaPlan(model=model_class)
+    table = model_class._meta.db_table
+
+    if table not in state.tables:
+        plan.steps.append(PlanStep(ACTION_CREATE_TABLE, model_class, table, table, estimated_rows=0))
+        return plan
+
+    for field in model_class._meta.local_fields:
+        # Unique columns get their index from the constraint.
+        indexed = field.db_index and not field.unique
+        if field.column in state.columns[table]:
+            _plan_existing_column(plan, field, state.column_info.get(table, {}).get(field.column))
+            if indexed and _field_indexes(model_class, field)[0].name not in state.indexes[table]:
+                plan.steps.append(PlanStep(ACTION_CREATE_INDEX, model_class, table, field.column, field=field))
+            continue
+        if not field.null and field.default is models.NOT_PROVIDED:
+            plan.errors.append(
+                f"Cannot add required field '{field.name}' without a default. "
+                "Provide a default or make the field optional."
+            )
+            continue
+        plan.steps.append(PlanStep(ACTION_ADD_COLUMN, model_class, table, field.column, field=field))
+        if indexed:
+            plan.steps.append(PlanStep(ACTION_CREATE_INDEX, model_class, table, field.column, field=field))
+
+    declared_columns = {field.column for field in model_class._meta.local_fields}
+    for column in sorted(state.columns[table] - declared_columns):
+        plan.warnings.append(f"Column '{column}' is no longer used by any field; it is kept with its data.")
+
+    for name in sorted(state.invalid_indexes.get(table, ())):
+        plan.steps.append(PlanStep(ACTION_REMOVE_INDEX, model_class, table, name))
+
+    declared = {index.name: index for index in model_class._meta.indexes}
+    for name, index in declared.items():
+        if name not in state.indexes[table]:
+            plan.steps.append(PlanStep(ACTION_ADD_INDEX, model_class, table, name, index=index))
+    if managed_index_prefix:
+        for name in sorted(state.indexes[table]):
+            if name.startswith(managed_index_prefix) and name not in declared:
+                plan.steps.append(PlanStep(ACTION_REMOVE_INDEX, model_class, table, name))
+
+    if plan.steps:
+        _assess_steps(plan.steps, estimate_table_rows(table))
+
+    for m2m_field in model_class._meta.local_many_to_many:
+        through = m2m_field.remote_field.through
+        through_table = through._meta.db_table
+        if through_table not in state.tables:
+            plan.steps.append(PlanStep(ACTION_CREATE_M2M_TABLE, through, through_table, through_table, estimated_rows=0))
+
+    plan.steps.sort(key=_step_order)
+    return plan
+
+
+def _plan_existing_column(plan: SchemaPlan, field: models.Field, info: ColumnInfo | None) -> None:
+    """Compare an existing column with ``field``: type changes are errors, nullability changes are altered."""
+    if info is None or field.primary_key:
+        return
+    db_type = _column_type(field)
+    if info.db_type is not None and db_type is not None and info.db_type != db_type:
+        plan.errors.append(
+            f"Field '{field.name}' needs a {db_type} column but the column is {info.db_type}; "
+            "convert the column by hand or add a new field."
+        )
+        return
+    if info.null != field.null:
+        table = plan.model._meta.db_table
+        plan.steps.append(PlanStep(ACTION_ALTER_COLUMN, plan.model, table, field.column, field=field))
+
+
+def _column_type(field: models.Field) -> str | None:
+    return _normalize_type(field.db_type(connection))
+
+
+def _normalize_type(db_type: str | None) -> str | None:
+    if db_type is None:
+        return None
+    return db_type.lower().replace("character varying", "varchar").replace(" ", "")
+
+
+def _step_order(step: PlanStep) -> tuple[int, bool]:
+    # SQLite rebuilds the table from the final model for unique, non-null or
+    # defaulted columns, so plain nullable columns must be added first.
+    rebuilds = step.action == ACTION_ADD_COLUMN and (
+        step.field.unique or not step.field.null or step.field.has_default()
+    )
+    return ACTION_ORDER.index(step.action), rebuilds
+
+
+def _assess_steps(steps: list[PlanStep], rows: int | None) -> None:
+    """Attach the row estimate and flag steps that lock a populated table."""
+    populated = rows != 0
+    concurrent = connection.vendor == "postgresql"
+    for step in steps:
+        step.estimated_rows = rows
+        if step.action == ACTION_ADD_COLUMN and step.field.unique and populated:
+            step.dangerous = True
+            step.reason = "builds a unique index while holding the table lock"
+        elif step.action == ACTION_ALTER_COLUMN and not step.field.null and populated:
+            step.dangerous = True
+            step.reason = "scans the table under lock and fails if any row is empty"
+        elif step.action in INDEX_ACTIONS:
+            step.concurrent = concurrent
+            if step.action != ACTION_REMOVE_INDEX and populated and not concurrent:
+                step.dangerous = True
+                step.reason = "blocks writes while the index is built"
+
+
+def apply_plans(plans: Iterable[SchemaPlan]) -> None:
+    """Apply every plan in one schema transaction.
+
+    Index steps marked concurrent run afterwards with ``CREATE INDEX
+    CONCURRENTLY`` outside the transaction, unless the caller is already
+    inside an atomic block, in which case they are built inline.
+    """
+    plans = list(plans)
+    for plan in plans:
+        if plan.errors:
+            raise ValueError(plan.errors[0])
+
+    steps = sorted((step for plan in plans for step in plan.steps), key=_step_order)
+    run_concurrently = not connection.in_atomic_block
+    inline = [step for step in steps if not (step.concurrent and run_concurrently)]
+    deferred = [step for step in steps if step.concurrent and run_concurrently]
+
+    if inline:
+        with connection.schema_editor() as schema_editor:
+            for step in inline:
+                _apply_step(schema_editor, step, concurrently=False)
+    if deferred:
+        with connection.schema_editor(atomic=False) as schema_editor:
+            for step in deferred:
+                _apply_step(schema_editor, step, concurrently=True)
+
+
+def _apply_step(schema_editor, step: PlanStep, concurrently: bool) -> None:
+    if step.action in {ACTION_CREATE_TABLE, ACTION_CREATE_M2M_TABLE}:
+        schema_editor.create_model(step.model)
+    elif step.action == ACTION_ADD_COLUMN:
+        with _without_index(step.field):
+            schema_editor.add_field(step.model, step.field)
+    elif step.action == ACTION_ALTER_COLUMN:
+        # The column only differs from the field in nullability.
+        old_field = step.field.clone()
+        old_field.null = not step.field.null
+        old_field.set_attributes_from_name(step.field.name)
+        old_field.model = step.model
+        schema_editor.alter_field(step.model, old_field, step.field)
+    elif step.action == ACTION_CREATE_INDEX:
+        for index in _field_indexes(step.model, step.field):
+            _create_index(schema_editor, step.model, index, concurrently)
+    elif step.action == ACTION_ADD_INDEX:
+        _create_index(schema_editor, step.model, step.index, concurrently)
+    elif step.action == ACTION_REMOVE_INDEX:
+        kwargs = {"concurrently": True} if concurrently else {}
+        sql = str(schema_editor._delete_index_sql(step.model, step.target, **kwargs))
+        if connection.vendor == "sqlite":
+            # A table rebuild earlier in the batch only recreates declared indexes.
+            sql = sql.replace("DROP INDEX ", "DROP INDEX IF EXISTS ", 1)
+        schema_editor.execute(sql, params=None)
+
+
+def _create_index(schema_editor, model_class: type, index: models.Index, concurrently: bool) -> None:
+    # PostgreSQL's schema editor builds CREATE INDEX CONCURRENTLY itself.
+    kwargs = {"concurrently": True} if concurrently else {}
+    statement = index.create_sql(model_class, schema_editor, **kwargs)
+    if statement is None:
+        return
+    sql = str(statement)
+    if connection.vendor == "sqlite":
+        # An earlier column in the batch may have rebuilt the table with its indexes.
+        sql = sql.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1)
+    schema_editor.execute(sql, params=None)
+
+
+def _field_indexes(model_class: type, field: models.Field) -> list[models.Index]:
+    """The indexes Django creates for a ``db_index`` field, named as it names them.
+
+    On PostgreSQL, varchar and text columns also get a ``_like`` index with a
+    pattern opclass, for ``LIKE 'prefix%'`` lookups.
+    """
+    table = model_class._meta.db_table
+    schema_editor = connection.schema_editor()
+    indexes = [models.Index(fields=[field.name], name=schema_editor._create_index_name(table, [field.column]))]
+    db_type = field.db_type(connection) or ""
+    if connection.vendor == "postgresql" and "[" not in db_type and not getattr(field, "db_collation", None):
+        opclass = {"varchar": "varchar_pattern_ops", "text": "text_pattern_ops"}.get(db_type.split("(")[0])
+        if opclass:
+            indexes.append(
+                models.Index(
+                    fields=[field.name],
+                    name=schema_editor._create_index_name(table, [field.column], suffix="_like"),
+                    opclasses=[opclass],
+                )
+            )
+    return indexes
+
+
+@contextmanager
+def _without_index(field):
+    """Add the column without its index; the index has its own plan step."""
+    db_index = field.db_index
+    field.db_index = False
+    try:
+        yield
+    finally:
+        field.db_index = db_index
@@ -0,0 +1,92 @@
+"""Plan eager loading of relations requested with ``populate=``."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field as dataclass_field
+from typing import Iterable
+
+from contro.apps.content.models import ContentFieldDefinition
+
+
+SINGLE_RELATION_TYPES = {ContentFieldDefinition.FIELD_FK, ContentFieldDefinition.FIELD_MEDIA}
+MULTI_RELATION_TYPES = {ContentFieldDefinition.FIELD_M2M, ContentFieldDefinition.FIELD_MEDIA_M2M}
+
+
+@dataclass
+class PopulatePlan:
+    """Relations to embed, as a tree of field slugs, and the lookups that load them.
+
+    Single relations reached only through single relations are joined with
+    ``select_related``; anything at or below a many-to-many is prefetched with
+    one query per level.
+    """
+
+    tree: dict[str, dict] = dataclass_field(default_factory=dict)
+    select_related: list[str] = dataclass_field(default_factory=list)
+    prefetch_related: list[str] = dataclass_field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.tree)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+
+def parse_populate(raw: str | None) -> list[str]:
+    """Split ``"author,tags.cover"`` into dotted paths."""
+    if not raw:
+        return []
+    return [path.strip() for path in raw.split(",") if path.strip()]
+
+
+def build_populate_plan(model_class: type, paths: Iterable[str], max_depth: int) -> PopulatePlan:
+    """Resolve dotted relation ``paths`` against the field types in the model's descriptor.
+
+    Raises ``ValueError`` for unknown or non-relation fields and for paths
+    deeper than ``max_depth``.
+    """
+    plan = PopulatePlan()
+    for path in paths:
+        parts = path.split(".")
+        if len(parts) > max_depth:
+            raise ValueError(f"'{path}' is nested deeper than {max_depth} levels.")
+        current_model = model_class
+        node = plan.tree
+        lookup = []
+        prefetched = False
+        for part in parts:
+            field_type = _relation_types(current_model).get(part)
+            if field_type is None:
+                raise ValueError(f"'{part}' is not a relation field of {current_model._meta.model_name}.")
+            lookup.append(part)
+            prefetched = prefetched or field_type in MULTI_RELATION_TYPES
+            target = plan.prefetch_related if prefetched else plan.select_related
+            name = "__".join(lookup)
+            if name not in target:
+                target.append(name)
+            node = node.setdefault(part, {})
+            current_model = current_model._meta.get_field(part).related_model
+    # A nested prefetch lookup also loads its prefixes, so drop the redundant ones.
+    plan.prefetch_related = [
+        name for name in plan.prefetch_related
+        if not any(other.startswith(f"{name}__") for other in plan.prefetch_related)
+    ]
+    plan.select_related = [
+        name for name in plan.select_related
+        if not any(other.startswith(f"{name}__") for other in plan.select_related)
+    ]
+    return plan
+
+
+def _relation_types(model_class: type) -> dict[str, str]:
+    descriptor = getattr(model_class, "__descriptor__", None)
+    if descriptor is None:
+        return {}
+    return {
+        field["slug"]: field["field_type"]
+        for field in descriptor["fields"]
+        if field["field_type"] in SINGLE_RELATION_TYPES | MULTI_RELATION_TYPES
+    }
@@ -0,0 +1,176 @@
+"""Process-wide, read-only snapshots of content type definitions.
+
+Request paths read content types and their fields from here instead of the
+database. The snapshot is rebuilt lazily, from the stored descriptors in one
+query, after ``invalidate_registry()``; the schema service calls it whenever
+the schema generation moves on or a sync runs in this process.
+"""
+from __future__ import annotations
+
+import copy
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from asgiref.sync import sync_to_async
+
+from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition
+from contro.apps.content.services.descriptors import load_content_types
+
+
+_FIELD_TYPE_LABELS = dict(ContentFieldDefinition.FIELD_TYPES)
+
+
+@dataclass(frozen=True)
+class FieldSnapshot:
+    id: int
+    name: str
+    slug: str
+    field_type: str
+    required: bool
+    unique: bool
+    default_value: object
+    metadata: Mapping
+    related_name: str
+    order: int
+    relation_target_slug: str | None
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    def get_field_type_display(self) -> str:
+        return _FIELD_TYPE_LABELS.get(self.field_type, self.field_type)
+
+
+@dataclass(frozen=True)
+class ContentTypeSnapshot:
+    id: int
+    name: str
+    slug: str
+    plural_name: str
+    description: str
+    metadata: Mapping
+    is_active: bool
+    schema_generation: int
+    # Ordered by (order, id), as models are built.
+    fields: tuple[FieldSnapshot, ...]
+
+    @property
+    def pk(self) -> int:
+        return self.id
+
+    @property
+    def db_table(self) -> str:
+        return f"content_{self.slug.replace('-', '_')}"
+
+
+@dataclass(frozen=True)
+class _RegistryState:
+    by_slug: Mapping[str, ContentTypeSnapshot]
+    by_pk: Mapping[int, ContentTypeSnapshot]
+    # Sorted by name, like ContentTypeDefinition.Meta.ordering.
+    ordered: tuple[ContentTypeSnapshot, ...]
+
+
+_STATE: _RegistryState | None = None
+# Bumped by every invalidation so a load that raced one is not kept.
+_EPOCH = 0
+_LOCK = threading.Lock()
+
+
+def get_content_type(slug: str, active_only: bool = False) -> ContentTypeSnapshot | None:
+    snapshot = _current().by_slug.get(slug)
+    if snapshot is None or (active_only and not snapshot.is_active):
+        return None
+    return snapshot
+
+
+async def aget_content_type(slug: str, active_only: bool = False) -> ContentTypeSnapshot | None:
+    """Async ``get_content_type``; only a cold registry leaves the event loop to load."""
+    if _STATE is None:
+        return await sync_to_async(get_content_type)(slug, active_only)
+    return get_content_type(slug, active_only)
+
+
+def get_content_type_by_pk(pk: int, active_only: bool = False) -> ContentTypeSnapshot | None:
+    snapshot = _current().by_pk.get(pk)
+    if snapshot is None or (active_only and not snapshot.is_active):
+        return None
+    return snapshot
+
+
+def all_content_types(active_only: bool = False) -> tuple[ContentTypeSnapshot, ...]:
+    ordered = _current().ordered
+    return tuple(snapshot for snapshot in ordered if snapshot.is_active) if active_only else ordered
+
+
+def invalidate_registry() -> None:
+    global _STATE, _EPOCH
+
+    with _LOCK:
+        _EPOCH += 1
+        _STATE = None
+
+
+def _current() -> _RegistryState:
+    global _STATE
+
+    state = _STATE
+    if state is not None:
+        return state
+    with _LOCK:
+        if _STATE is not None:
+            return _STATE
+        epoch = _EPOCH
+    state = _load()
+    with _LOCK:
+        if epoch == _EPOCH:
+            _STATE = state
+    return state
+
+
+def _load() -> _RegistryState:
+    snapshots = [_snapshot(content_type) for content_type in load_content_types(ContentTypeDefinition.objects.all())]
+    snapshots.sort(key=lambda snapshot: (snapshot.name, snapshot.id))
+    return _RegistryState(
+        by_slug=MappingProxyType({snapshot.slug: snapshot for snapshot in snapshots}),
+        by_pk=MappingProxyType({snapshot.id: snapshot for snapshot in snapshots}),
+        ordered=tuple(snapshots),
+    )
+
+
+def _snapshot(content_type: ContentTypeDefinition) -> ContentTypeSnapshot:
+    field_defs = sorted(content_type.fields.all(), key=lambda field_def: (field_def.order, field_def.id))
+    return ContentTypeSnapshot(
+        id=content_type.id,
+        name=content_type.name,
+        slug=content_type.slug,
+        plural_name=content_type.plural_name,
+        description=content_type.description,
+        metadata=_freeze(content_type.metadata),
+        is_active=content_type.is_active,
+        schema_generation=content_type.schema_generation,
+        fields=tuple(
+            FieldSnapshot(
+                id=field_def.id,
+                name=field_def.name,
+                slug=field_def.slug,
+                field_type=field_def.field_type,
+                required=field_def.required,
+                unique=field_def.unique,
+                default_value=copy.deepcopy(field_def.default_value),
+                metadata=_freeze(field_def.metadata),
+                related_name=field_def.related_name,
+                order=field_def.order,
+                relation_target_slug=field_def.relation_target.slug if field_def.relation_target_id else None,
+            )
+            for field_def in field_defs
+        ),
+    )
+
+
+def _freeze(metadata) -> Mapping:
+    # A private copy behind a read-only view; shared by every request in the process.
+    return MappingProxyType(copy.deepcopy(metadata or {}))
@@ -1,20 +1,55 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Dict, Iterable
+from typing import Callable, Dict, Iterable
 
+from asgiref.sync import sync_to_async
 from django.apps import apps
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MaxLengthValidator, MaxValueValidator, MinLengthValidator, MinValueValidator, RegexValidator
-from django.db import connection, models
-from django.db.utils import OperationalError
+from django.db import connection, models, transaction
+from django.db.utils import DatabaseError, OperationalError
 from django.utils.dateparse import parse_date
-
-from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition, DynamicContentBase
-
+from django.utils.functional import cached_property
+
+from contro.apps.content.models import (
+    ContentFieldDefinition,
+    ContentTypeDefinition,
+    DynamicContentBase,
+    SchemaGeneration,
+)
+from contro.apps.content.services.descriptors import compile_descriptor, load_content_types, save_descriptors
+from contro.apps.content.services.planner import (
+    ACTION_ADD_COLUMN,
+    ACTION_CREATE_M2M_TABLE,
+    ACTION_CREATE_TABLE,
+    SchemaPlan,
+    apply_plans,
+    introspect_database,
+    plan_model,
+)
+from contro.apps.content.services.registry import invalidate_registry
+
+
+logger = logging.getLogger(__name__)
+
+
+# Prefix of index names generated from ContentTypeDefinition.metadata["indexes"].
+MANAGED_INDEX_PREFIX = "cidx_"
+# Every dynamic table gets a (field, id) index on these, so lists can page by them.
+KEYSET_INDEX_FIELDS = ("created_at", "updated_at", "published_at")
 
 _DYNAMIC_MODELS: Dict[str, type] = {}
+_MODEL_GENERATIONS: Dict[str, int] = {}
+_LOADED_GENERATION = 0
+_SCHEMA_LOCK = threading.RLock()
+_BATCH_DEPTH = 0
 
 
 @dataclass
@@ -25,6 +60,12 @@ class SchemaSyncResult:
     created_m2m_tables: list[str]
 
 
+@dataclass
+class BulkSyncResult:
+    results: dict[str, SchemaSyncResult]
+    timings: dict[str, float]
+
+
 def model_name_from_slug(slug: str) -> str:
     parts = slug.replace("_", "-").split("-")
     return "".join(part.capitalize() for part in parts if part) or "DynamicContent"
@@ -158,6 +199,54 @@ def _resolve_related_name(field_def: ContentFieldDefinition) -> str:
     return f"{field_def.content_type.slug}_{field_def.slug}_set"
 
 
+def _slug_source_plan(field_defs: Iterable[ContentFieldDefinition]) -> tuple[tuple[str, str, bool], ...]:
+    plan = []
+    for field_def in field_defs:
+        if field_def.field_type != ContentFieldDefinition.FIELD_SLUG:
+            continue
+        source = field_def.metadata.get("source")
+        if source:
+            plan.append((field_def.slug, source, bool(field_def.metadata.get("allow_unicode", False))))
+    return tuple(plan)
+
+
+def _build_indexes(content_type: ContentTypeDefinition, field_defs: Iterable[ContentFieldDefinition]) -> list:
+    """Turn ``metadata["indexes"]`` specs into ``models.Index`` objects.
+
+    A spec looks like ``{"fields": ["category", "-published_at"], "status": "published"}``:
+    a leading ``-`` orders the column descending and ``status`` makes the index
+    partial. Names are derived from the spec so syncs can diff them by name.
+    The ``KEYSET_INDEX_FIELDS`` indexes are added to every type.
+    """
+    known = content_type.indexable_field_names(field_defs)
+
+    specs = list((content_type.metadata or {}).get("indexes", []))
+    specs.extend({"fields": [name, "id"]} for name in KEYSET_INDEX_FIELDS)
+    indexes = {}
+    for spec in specs:
+        fields = list(spec["fields"])
+        unknown = [name for name in fields if name.lstrip("-") not in known]
+        if unknown:
+            # Saved before validation covered field names, or its field was deleted since.
+            logger.error("Skipping index on %s with unknown fields: %s", content_type.slug, ", ".join(unknown))
+            continue
+        status = spec.get("status")
+        signature = f"{content_type.db_table}:{','.join(fields)}:{status or ''}"
+        name = MANAGED_INDEX_PREFIX + hashlib.sha1(signature.encode("utf-8")).hexdigest()[:12]
+        condition = models.Q(status=status) if status else None
+        # A type may already declare one of the keyset indexes.
+        indexes.setdefault(name, models.Index(fields=fields, name=name, condition=condition))
+    return list(indexes.values())
+
+
+def _ordered_field_defs(content_type: ContentTypeDefinition) -> list[ContentFieldDefinition]:
+    """Return field definitions in build order, reusing prefetched rows when present."""
+    prefetched = getattr(content_type, "_prefetched_objects_cache", {}).get("fields")
+    if prefetched is not None:
+        return sorted(prefetched, key=lambda field_def: (field_def.order, field_def.id))
+    return list(content_type.fields.order_by("order", "id"))
+
+
 def build_dynamic_model(content_type: ContentTypeDefinition) -> type:
     model_name = model_name_from_slug(content_type.slug)
     attrs: dict = {
@@ -167,41 +256,139 @@ def build_dynamic_model(content_type: ContentTypeDefinition) -> type:
         "__content_type_slug__": content_type.slug,
     }
 
-    for field_def in content_type.fields.order_by("order", "id"):
+    field_defs = _ordered_field_defs(content_type)
+    for field_def in field_defs:
         attrs[field_def.slug] = _build_field(field_def)
+    attrs["__slug_sources__"] = _slug_source_plan(field_defs)
+    attrs["__descriptor__"] = compile_descriptor(content_type, field_defs)
 
     class Meta:
         app_label = "content"
         db_table = content_type.db_table
         verbose_name = content_type.name
         verbose_name_plural = content_type.plural_name or f"{content_type.name}s"
+        indexes = _build_indexes(content_type, field_defs)
+        apps = _DYNAMIC_APPS
 
     attrs["Meta"] = Meta
 
-    model_class = type(model_name, (DynamicContentBase,), attrs)
+    with _SCHEMA_LOCK:
+        model_class = type(model_name, (DynamicContentBase,), attrs)
     return model_class
 
 
+class _DynamicApps:
+    """The app registry as dynamic models and their M2M through models see it.
+
+    Everything is ``apps`` itself except registration. ``Apps.register_model``
+    expires every model's caches and warns when a label is registered again,
+    whereas dynamic models replace their previous class on purpose and
+    ``register_dynamic_model`` expires only the caches that have to go.
+    """
+
+    def __getattr__(self, name):
+        return getattr(apps, name)
+
+    def register_model(self, app_label: str, model: type) -> None:
+        apps.all_models[app_label][model._meta.model_name] = model
+        apps.do_pending_operations(model)
+        apps.get_models.cache_clear()
+
+
+_DYNAMIC_APPS = _DynamicApps()
+
+
 def register_dynamic_model(model_class: type) -> None:
+    """Make ``model_class`` the registered model for its label.
+
+    Relations in other models that still point at a replaced class are moved
+    to the new one, and only the ``_meta`` caches of the affected models are
+    expired. Inside ``batch_registration`` expiry is deferred to one reset.
+    """
     app_label = model_class._meta.app_label
     model_key = model_class._meta.model_name
 
-    if model_key in apps.all_models[app_label]:
-        apps.all_models[app_label][model_key] = model_class
-    else:
-        apps.register_model(app_label, model_class)
+    with _SCHEMA_LOCK:
+        if apps.all_models[app_label].get(model_key) is not model_class:
+            _DYNAMIC_APPS.register_model(app_label, model_class)
 
-    apps.clear_cache()
+        affected = _repoint_relations(model_class)
+        affected.add(model_class)
+        for field in model_class._meta.get_fields(include_hidden=True):
+            if field.is_relation and field.related_model is not None and not isinstance(field.related_model, str):
+                affected.add(field.related_model)
+            through = getattr(getattr(field, "remote_field", None), "through", None)
+            if through is not None and not isinstance(through, str):
+                affected.add(through)
 
+        if _BATCH_DEPTH:
+            return
+        _expire_model_caches(affected)
 
-def sync_schema(content_type: ContentTypeDefinition, _visited: set[str] | None = None) -> SchemaSyncResult:
+
+@contextmanager
+def batch_registration():
+    """Defer app-registry cache invalidation until the outermost block exits.
+
+    Bulk syncs register many models back to back; expiring caches after each
+    one is wasted work, so a single ``apps.clear_cache()`` runs at the end.
+    """
+    global _BATCH_DEPTH
+
+    with _SCHEMA_LOCK:
+        _BATCH_DEPTH += 1
+        try:
+            yield
+        finally:
+            _BATCH_DEPTH -= 1
+            if not _BATCH_DEPTH:
+                apps.clear_cache()
+
+
+def _repoint_relations(model_class: type) -> set[type]:
+    """Point relations that target an older class with the same label at ``model_class``."""
+    label = model_class._meta.label_lower
+    affected: set[type] = set()
+    for other in list(apps.all_models[model_class._meta.app_label].values()):
+        for field in other._meta.local_fields + other._meta.local_many_to_many:
+            remote_field = getattr(field, "remote_field", None)
+            target = getattr(remote_field, "model", None)
+            if target is None or isinstance(target, str) or target is model_class:
+                continue
+            if target._meta.label_lower != label:
+                continue
+            _reset_cached_properties(field)
+            _reset_cached_properties(remote_field)
+            remote_field.model = model_class
+            field.do_related_class(model_class, other)
+            affected.add(other)
+    return affected
+
+
+def _reset_cached_properties(obj) -> None:
+    for klass in type(obj).__mro__:
+        for name, value in vars(klass).items():
+            if isinstance(value, cached_property):
+                obj.__dict__.pop(name, None)
+
+
+def _expire_model_caches(model_classes: Iterable[type]) -> None:
+    apps.get_models.cache_clear()
+    for model_class in model_classes:
+        model_class._meta._expire_cache()
+
+
+def sync_schema(content_type: ContentTypeDefinition, _visited: dict[str, type | None] | None = None) -> SchemaSyncResult:
+    # _visited maps slugs seen in this sync to their final model, or None while in progress.
     if _visited is None:
-        _visited = set()
+        _visited = {}
     if content_type.slug in _visited:
-        model_class = build_dynamic_model(content_type)
-        register_dynamic_model(model_class)
+        model_class = _visited[content_type.slug]
+        if model_class is None:
+            model_class = build_dynamic_model(content_type)
+            register_dynamic_model(model_class)
         return SchemaSyncResult(model=model_class, created_table=False, added_columns=[], created_m2m_tables=[])
-    _visited.add(content_type.slug)
+    _visited[content_type.slug] = None
 
     relation_targets = content_type.fields.filter(
         field_type__in=[ContentFieldDefinition.FIELD_FK, ContentFieldDefinition.FIELD_M2M]
@@ -213,65 +400,365 @@ def sync_schema(content_type: ContentTypeDefinition, _visited: set[str] | None =
     model_class = build_dynamic_model(content_type)
     register_dynamic_model(model_class)
 
-    created_table = False
-    added_columns: list[str] = []
-    created_m2m_tables: list[str] = []
-
-    with connection.cursor() as cursor:
-        existing_tables = {table.name for table in connection.introspection.get_table_list(cursor)}
-
-    if model_class._meta.db_table not in existing_tables:
-        with connection.schema_editor() as schema_editor:
-            schema_editor.create_model(model_class)
-        created_table = True
-    else:
-        with connection.cursor() as cursor:
-            existing_columns = {
-                col.name for col in connection.introspection.get_table_description(cursor, model_class._meta.db_table)
-            }
-        with connection.schema_editor() as schema_editor:
-            for field in model_class._meta.local_fields:
-                if field.column not in existing_columns:
-                    if not field.null and field.default is models.NOT_PROVIDED:
-                        raise ValueError(
-                            f"Cannot add required field '{field.name}' without a default. "
-                            "Provide a default or make the field optional."
-                        )
-                    schema_editor.add_field(model_class, field)
-                    added_columns.append(field.column)
-
-    with connection.cursor() as cursor:
-        existing_tables = {table.name for table in connection.introspection.get_table_list(cursor)}
-
-    with connection.schema_editor() as schema_editor:
-        for m2m_field in model_class._meta.local_many_to_many:
-            through_table = m2m_field.remote_field.through._meta.db_table
-            if through_table not in existing_tables:
-                schema_editor.create_model(m2m_field.remote_field.through)
-                created_m2m_tables.append(through_table)
+    plan = plan_model(model_class, introspect_database([model_class._meta.db_table]), MANAGED_INDEX_PREFIX)
+    apply_plans([plan])
+    result = _result_from_plan(plan)
 
     ensure_model_permissions(model_class)
 
+    if result.created_table or result.added_columns or result.created_m2m_tables:
+        content_type.schema_generation = SchemaGeneration.bump([content_type.pk])
+    save_descriptors([(content_type, model_class.__descriptor__)])
+
     _DYNAMIC_MODELS[content_type.slug] = model_class
+    _MODEL_GENERATIONS[content_type.slug] = content_type.schema_generation
+    _visited[content_type.slug] = model_class
+    invalidate_registry()
+
+    return result
+
+
+def plan_all_schemas(
+    content_types: Iterable[ContentTypeDefinition] | None = None,
+    timings: dict[str, float] | None = None,
+) -> list[tuple[ContentTypeDefinition, SchemaPlan]]:
+    """Build every model and diff it against the database without changing anything.
+
+    Relation targets outside ``content_types`` are pulled in so lazy model
+    references resolve. Types are returned in relation order.
+    """
+    timings = {} if timings is None else timings
+
+    started = time.perf_counter()
+    if content_types is None:
+        content_types = ContentTypeDefinition.objects.filter(is_active=True)
+    if isinstance(content_types, models.QuerySet):
+        content_types = content_types.prefetch_related("fields__relation_target")
+    ordered = _sort_by_relations(_with_relation_targets(list(content_types)))
+    timings["load"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model_classes = []
+    with batch_registration():
+        for content_type in ordered:
+            model_class = build_dynamic_model(content_type)
+            register_dynamic_model(model_class)
+            model_classes.append(model_class)
+    timings["build"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    state = introspect_database([model._meta.db_table for model in model_classes])
+    timings["introspect"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    planned = [
+        (content_type, plan_model(model_class, state, MANAGED_INDEX_PREFIX))
+        for content_type, model_class in zip(ordered, model_classes)
+    ]
+    timings["plan"] = time.perf_counter() - started
+    return planned
+
+
+def sync_all_schemas(content_types: Iterable[ContentTypeDefinition] | None = None) -> BulkSyncResult:
+    """Sync many content types with one introspection pass and one DDL transaction."""
+    timings: dict[str, float] = {}
+    planned = plan_all_schemas(content_types, timings)
+
+    started = time.perf_counter()
+    apply_plans(plan for _, plan in planned)
+    results = {content_type.slug: _result_from_plan(plan) for content_type, plan in planned}
+    timings["ddl"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ensure_models_permissions(plan.model for _, plan in planned)
+    timings["permissions"] = time.perf_counter() - started
+
+    changed_ids = [
+        content_type.pk
+        for content_type, _ in planned
+        if results[content_type.slug].created_table
+        or results[content_type.slug].added_columns
+        or results[content_type.slug].created_m2m_tables
+    ]
+    generation = SchemaGeneration.bump(changed_ids) if changed_ids else None
+    for content_type, plan in planned:
+        if content_type.pk in changed_ids:
+            content_type.schema_generation = generation
+        _DYNAMIC_MODELS[content_type.slug] = plan.model
+        _MODEL_GENERATIONS[content_type.slug] = content_type.schema_generation
+    save_descriptors((content_type, plan.model.__descriptor__) for content_type, plan in planned)
+    invalidate_registry()
+
+    return BulkSyncResult(results=results, timings=timings)
+
+
+def preview_schema_change(change: Callable[[], ContentTypeDefinition]) -> list[tuple[ContentTypeDefinition, SchemaPlan]]:
+    """Plan the schema ``change`` would lead to, without keeping the change.
+
+    ``change`` saves definitions and returns the content type to plan. It runs
+    in a transaction that is rolled back once the plan is built, and the
+    models registered while planning make way for the loaded ones again.
+    """
+    try:
+        with transaction.atomic():
+            planned = plan_all_schemas([change()])
+            transaction.set_rollback(True)
+    finally:
+        _restore_loaded_models()
+    return planned
+
+
+def apply_schema_change(change: Callable[[], ContentTypeDefinition]) -> BulkSyncResult:
+    """Save definitions with ``change`` and sync the tables of the returned type, or do neither.
+
+    Everything runs in one transaction, so indexes are built inline rather
+    than concurrently.
+    """
+    try:
+        with _schema_transaction():
+            return sync_all_schemas([change()])
+    except Exception:
+        _restore_loaded_models()
+        raise
+
+
+@contextmanager
+def _schema_transaction():
+    """A transaction that DDL can run in.
+
+    SQLite's schema editor needs foreign key checks turned off before the
+    transaction starts, so they are, and are checked before it commits.
+    """
+    if connection.vendor != "sqlite" or connection.in_atomic_block:
+        with transaction.atomic():
+            yield
+        return
+    disabled = connection.disable_constraint_checking()
+    try:
+        with transaction.atomic():
+            yield
+            connection.check_constraints()
+    finally:
+        if disabled:
+            connection.enable_constraint_checking()
+
+
+def _restore_loaded_models() -> None:
+    """Register the loaded models again, dropping models built for types that were never loaded."""
+    loaded = {model_class._meta.model_name for model_class in _DYNAMIC_MODELS.values()}
+    registered = apps.all_models["content"]
+    with batch_registration():
+        stale = {
+            name
+            for name, model_class in registered.items()
+            if getattr(model_class, "__content_type_slug__", None) is not None and name not in loaded
+        }
+        # Their many-to-many through models go with them.
+        stale.update(
+            name
+            for name, model_class in registered.items()
+            if model_class._meta.auto_created and model_class._meta.auto_created._meta.model_name in stale
+        )
+        for name in stale:
+            del registered[name]
+        for model_class in _DYNAMIC_MODELS.values():
+            register_dynamic_model(model_class)
 
+
+def _result_from_plan(plan: SchemaPlan) -> SchemaSyncResult:
     return SchemaSyncResult(
-        model=model_class,
-        created_table=created_table,
-        added_columns=added_columns,
-        created_m2m_tables=created_m2m_tables,
+        model=plan.model,
+        created_table=bool(plan.targets(ACTION_CREATE_TABLE)),
+        added_columns=plan.targets(ACTION_ADD_COLUMN),
+        created_m2m_tables=plan.targets(ACTION_CREATE_M2M_TABLE),
     )
 
 
+def _with_relation_targets(content_types: list[ContentTypeDefinition]) -> list[ContentTypeDefinition]:
+    by_slug = {content_type.slug: content_type for content_type in content_types}
+    pending = list(content_types)
+    while pending:
+        content_type = pending.pop()
+        for field_def in _ordered_field_defs(content_type):
+            target = field_def.relation_target
+            if target is not None and target.slug not in by_slug:
+                by_slug[target.slug] = target
+                pending.append(target)
+    return list(by_slug.values())
+
+
+def _sort_by_relations(content_types: list[ContentTypeDefinition]) -> list[ContentTypeDefinition]:
+    """Order content types so relation targets come before the types pointing at them.
+
+    Cycles cannot be ordered; their members keep their original order at the end.
+    """
+    by_slug = {content_type.slug: content_type for content_type in content_types}
+    dependencies = {
+        content_type.slug: {
+            field_def.relation_target.slug
+            for field_def in _ordered_field_defs(content_type)
+            if field_def.relation_target is not None
+            and field_def.relation_target.slug in by_slug
+            and field_def.relation_target.slug != content_type.slug
+        }
+        for content_type in content_types
+    }
+
+    ordered: list[ContentTypeDefinition] = []
+    ready = [slug for slug, deps in dependencies.items() if not deps]
+    while ready:
+        slug = ready.pop(0)
+        ordered.append(by_slug[slug])
+        del dependencies[slug]
+        for other, deps in dependencies.items():
+            if slug in deps:
+                deps.discard(slug)
+                if not deps:
+                    ready.append(other)
+
+    ordered.extend(by_slug[slug] for slug in dependencies)
+    return ordered
+
+
+PERMISSION_ACTIONS = ("add", "change", "delete", "view")
+
+
 def ensure_model_permissions(model_class: type) -> None:
-    content_type = ContentType.objects.get_for_model(model_class, for_concrete_model=False)
-    for action in ("add", "change", "delete", "view"):
-        codename = f"{action}_{model_class._meta.model_name}"
-        name = f"Can {action} {model_class._meta.verbose_name}"
-        Permission.objects.get_or_create(
-            codename=codename,
-            content_type=content_type,
-            defaults={"name": name},
+    ensure_models_permissions([model_class])
+
+
+def ensure_models_permissions(model_classes: Iterable[type]) -> None:
+    """Create missing content types and default permissions for ``model_classes``.
+
+    Issues the same handful of queries whatever the number of models: one
+    read per table, plus one insert and one re-read when rows are missing.
+    """
+    model_classes = list(model_classes)
+    if not model_classes:
+        return
+    content_types = _ensure_django_content_types(model_classes)
+
+    existing = set(
+        Permission.objects.filter(content_type__in=content_types.values()).values_list(
+            "content_type_id", "codename"
+        )
+    )
+    missing = []
+    for model_class in model_classes:
+        opts = model_class._meta
+        content_type = content_types[(opts.app_label, opts.model_name)]
+        for action in PERMISSION_ACTIONS:
+            codename = f"{action}_{opts.model_name}"
+            if (content_type.pk, codename) not in existing:
+                missing.append(
+                    Permission(
+                        codename=codename,
+                        content_type=content_type,
+                        name=f"Can {action} {opts.verbose_name}",
+                    )
+                )
+    if missing:
+        Permission.objects.bulk_create(missing, ignore_conflicts=True)
+
+
+def _ensure_django_content_types(model_classes: list[type]) -> dict[tuple[str, str], ContentType]:
+    keys = {(model._meta.app_label, model._meta.model_name) for model in model_classes}
+    app_labels = {app_label for app_label, _ in keys}
+    names = {model_name for _, model_name in keys}
+
+    def fetch() -> dict[tuple[str, str], ContentType]:
+        return {
+            (content_type.app_label, content_type.model): content_type
+            for content_type in ContentType.objects.filter(app_label__in=app_labels, model__in=names)
+            if (content_type.app_label, content_type.model) in keys
+        }
+
+    found = fetch()
+    if len(found) < len(keys):
+        ContentType.objects.bulk_create(
+            [ContentType(app_label=app_label, model=model_name) for app_label, model_name in keys - set(found)],
+            ignore_conflicts=True,
         )
+        found = fetch()
+    for content_type in found.values():
+        # Keep get_for_model() callers off the database for these models.
+        ContentType.objects._add_to_cache(ContentType.objects.db, content_type)
+    return found
+
+
+def ensure_schema_current() -> int:
+    """Rebuild loaded models whose definitions changed in another process.
+
+    Costs a single primary-key lookup when nothing changed. Only content types
+    already loaded in this process are rebuilt; the rest load lazily, as does
+    the content type registry, which is invalidated. Models of deleted or
+    deactivated content types are dropped.
+    """
+    global _LOADED_GENERATION
+
+    generation = SchemaGeneration.current()
+    if generation <= _LOADED_GENERATION:
+        return _LOADED_GENERATION
+
+    with _SCHEMA_LOCK:
+        if generation <= _LOADED_GENERATION:
+            return _LOADED_GENERATION
+        changed = ContentTypeDefinition.objects.filter(
+            schema_generation__gt=_LOADED_GENERATION,
+            slug__in=list(_DYNAMIC_MODELS),
+        ).prefetch_related("fields__relation_target")
+        for content_type in changed:
+            if _MODEL_GENERATIONS.get(content_type.slug) == content_type.schema_generation:
+                continue
+            if not content_type.is_active:
+                _DYNAMIC_MODELS.pop(content_type.slug, None)
+                _MODEL_GENERATIONS.pop(content_type.slug, None)
+                continue
+            _rebuild_loaded_model(content_type)
+        remaining = set(ContentTypeDefinition.objects.filter(slug__in=list(_DYNAMIC_MODELS)).values_list("slug", flat=True))
+        for slug in set(_DYNAMIC_MODELS) - remaining:
+            _DYNAMIC_MODELS.pop(slug, None)
+            _MODEL_GENERATIONS.pop(slug, None)
+        _LOADED_GENERATION = generation
+        invalidate_registry()
+    return _LOADED_GENERATION
+
+
+def _rebuild_loaded_model(content_type: ContentTypeDefinition) -> type | None:
+    """Build and register a model, keeping the previous class if the definition cannot be built.
+
+    One broken definition must not fail every request, nor stop the rest of the
+    generation from loading; it is retried when the type next changes.
+    """
+    try:
+        model_class = build_dynamic_model(content_type)
+        register_dynamic_model(model_class)
+    except DatabaseError:
+        raise
+    except Exception:
+        logger.exception("Could not build the model for %s; keeping the previous one", content_type.slug)
+        return None
+    _DYNAMIC_MODELS[content_type.slug] = model_class
+    _MODEL_GENERATIONS[content_type.slug] = content_type.schema_generation
+    return model_class
+
+
+def loaded_generation() -> int:
+    """Schema generation the loaded models reflect, as of the last ``ensure_schema_current``."""
+    return _LOADED_GENERATION
+
+
+def loaded_models() -> dict[str, type]:
+    """Snapshot of the models loaded in this process, by content type slug."""
+    return dict(_DYNAMIC_MODELS)
+
+
+async def aensure_schema_current() -> int:
+    """Async ``ensure_schema_current``; only a rebuild leaves the event loop."""
+    generation = await SchemaGeneration.acurrent()
+    if generation <= _LOADED_GENERATION:
+        return _LOADED_GENERATION
+    return await sync_to_async(ensure_schema_current)()
 
 
 def get_dynamic_model(content_type: ContentTypeDefinition) -> type:
@@ -287,11 +774,41 @@ def get_dynamic_model_by_slug(slug: str) -> type:
     return sync_schema(content_type).model
 
 
-def load_all_models() -> Iterable[type]:
+async def aget_dynamic_model_by_slug(slug: str) -> type:
+    """Async ``get_dynamic_model_by_slug``; loading a model that is not built yet leaves the event loop."""
+    if slug in _DYNAMIC_MODELS:
+        return _DYNAMIC_MODELS[slug]
+    return await sync_to_async(get_dynamic_model_by_slug)(slug)
+
+
+def load_all_models(create_missing: bool = True) -> Iterable[type]:
+    """Build and register every active content type from its stored descriptor.
+
+    Content types with a current descriptor cost no per-type queries; see
+    ``descriptors.load_content_types``.
+
+    Types whose table does not exist yet are synced when ``create_missing`` is
+    set and skipped otherwise, so callers that must not run DDL can opt out.
+    """
+    ordered = _sort_by_relations(load_content_types(ContentTypeDefinition.objects.filter(is_active=True)))
+    existing_tables = introspect_database([]).tables
+
     models_list = []
-    for content_type in ContentTypeDefinition.objects.filter(is_active=True):
-        try:
-            models_list.append(get_dynamic_model(content_type))
-        except OperationalError:
-            continue
+    with batch_registration():
+        for content_type in ordered:
+            if content_type.slug in _DYNAMIC_MODELS:
+                models_list.append(_DYNAMIC_MODELS[content_type.slug])
+                continue
+            if content_type.db_table in existing_tables:
+                model_class = _rebuild_loaded_model(content_type)
+                if model_class is None:
+                    continue
+            elif create_missing:
+                try:
+                    model_class = sync_schema(content_type).model
+                except OperationalError:
+                    continue
+            else:
+                continue
+            models_list.append(model_class)
     return models_list
@@ -1,24 +1,269 @@
 from __future__ import annotations
 
-from rest_framework import serializers
+import datetime
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import fields as drf_fields, relations, serializers
+from rest_framework.settings import api_settings
 
 
 _SERIALIZER_CACHE = {}
+# Serializers narrowed to a field set or populating relations, and compiled
+# read serializers, keyed by (model name, fields, populate tree) or
+# ("read", model name, fields); least recently used first.
+_SPARSE_SERIALIZER_CACHE: OrderedDict = OrderedDict()
+_SPARSE_LOCK = threading.Lock()
+
 
+def get_serializer_for_model(
+    model_class: type,
+    fields: Iterable[str] | None = None,
+    populate: dict[str, dict] | None = None,
+):
+    """Return a ``ModelSerializer`` for ``model_class``, optionally narrowed to ``fields``.
+
+    ``populate`` is a tree of relation slugs (see ``populate.PopulatePlan``)
+    whose targets are embedded as read-only nested serializers instead of
+    primary keys. Narrowed and populated classes live in a bounded LRU cache
+    sized by ``CONTRO_API_SERIALIZER_CACHE_SIZE`` since clients choose them.
+    """
+    if fields is not None or populate:
+        return _get_sparse_serializer(model_class, tuple(fields) if fields is not None else None, populate or {})
 
-def get_serializer_for_model(model_class: type):
     model_name = model_class._meta.model_name
-    if model_name in _SERIALIZER_CACHE:
-        return _SERIALIZER_CACHE[model_name]
+    cached = _SERIALIZER_CACHE.get(model_name)
+    if cached is not None and cached.Meta.model is model_class:
+        return cached
+
+    serializer_class = _build_serializer(model_class, "__all__")
+    _SERIALIZER_CACHE[model_name] = serializer_class
+    return serializer_class
+
+
+def serializable_field_names(model_class: type) -> list[str]:
+    """Names that ``fields = "__all__"`` would serialize, in model order."""
+    opts = model_class._meta
+    return [field.name for field in opts.concrete_fields] + [field.name for field in opts.many_to_many]
+
+
+def _get_sparse_serializer(model_class: type, fields: tuple[str, ...] | None, populate: dict[str, dict]):
+    key = (model_class._meta.model_name, fields, _freeze(populate))
+    cached = _cache_get(key, model_class)
+    if cached is not None:
+        return cached
+
+    nested = {}
+    for name, children in populate.items():
+        field = model_class._meta.get_field(name)
+        related_serializer = get_serializer_for_model(field.related_model, populate=children)
+        nested[name] = related_serializer(read_only=True, many=field.many_to_many)
+    # An explicit list keeps model field order; "__all__" would list nested fields first.
+    names = list(fields) if fields is not None else serializable_field_names(model_class)
+    serializer_class = _build_serializer(model_class, names, nested)
+    _cache_put(key, model_class, serializer_class)
+    return serializer_class
+
+
+def get_read_serializer(model_class: type, fields: Iterable[str] | None = None) -> "CompiledReadSerializer":
+    """Return the compiled read serializer matching ``get_serializer_for_model(model_class, fields)``."""
+    fields = tuple(fields) if fields is not None else None
+    key = ("read", model_class._meta.model_name, fields)
+    cached = _cache_get(key, model_class)
+    if cached is not None:
+        return cached
+    compiled = CompiledReadSerializer(model_class, get_serializer_for_model(model_class, fields))
+    _cache_put(key, model_class, compiled)
+    return compiled
+
+
+class CompiledReadSerializer:
+    """Read-only serializer working on ``.values()`` rows with one converter per field.
+
+    Converters are picked once from the DRF serializer it replaces, so the
+    output matches ``ModelSerializer`` key for key and value for value.
+    Fields without a fast converter fall back to the DRF field's own
+    ``to_representation``.
+    """
+
+    def __init__(self, model_class: type, serializer_class: type):
+        self.model = model_class
+        drf_serializer = serializer_class()
+        self.field_names = list(drf_serializer.fields)
+        self.m2m_fields = [
+            model_class._meta.get_field(name)
+            for name, field in drf_serializer.fields.items()
+            if isinstance(field, relations.ManyRelatedField)
+        ]
+        m2m_names = {field.name for field in self.m2m_fields}
+        # Columns to pass to ``.values()``; many-to-many ids are loaded separately.
+        self.columns = [name for name in self.field_names if name not in m2m_names]
+        self._converters = [
+            (name, _converter_for(field), name in m2m_names) for name, field in drf_serializer.fields.items()
+        ]
+
+    def serialize_rows(self, rows: Iterable[dict]) -> list[dict]:
+        rows = list(rows)
+        pks = [row[self.model._meta.pk.name] for row in rows]
+        related = {field.name: load_m2m_ids(field, pks) for field in self.m2m_fields} if rows else {}
+        return self._render(rows, related)
+
+    async def aserialize_rows(self, rows: list[dict]) -> list[dict]:
+        """Async ``serialize_rows``; ``rows`` must already be loaded."""
+        pks = [row[self.model._meta.pk.name] for row in rows]
+        related = {field.name: await aload_m2m_ids(field, pks) for field in self.m2m_fields} if rows else {}
+        return self._render(rows, related)
+
+    def iter_chunks(self, queryset, chunk_size: int) -> Iterator[list[dict]]:
+        """Serialize a ``.values()`` queryset read with ``.iterator()``, ``chunk_size`` rows at a time."""
+        chunk = []
+        for row in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield self.serialize_rows(chunk)
+                chunk = []
+        if chunk:
+            yield self.serialize_rows(chunk)
+
+    async def aiter_chunks(self, queryset, chunk_size: int) -> AsyncIterator[list[dict]]:
+        chunk = []
+        async for row in queryset.aiterator(chunk_size=chunk_size):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield await self.aserialize_rows(chunk)
+                chunk = []
+        if chunk:
+            yield await self.aserialize_rows(chunk)
+
+    def serialize_instance(self, instance) -> dict:
+        return self.serialize_rows([self._instance_row(instance)])[0]
+
+    async def aserialize_instance(self, instance) -> dict:
+        return (await self.aserialize_rows([self._instance_row(instance)]))[0]
+
+    def _instance_row(self, instance) -> dict:
+        opts = self.model._meta
+        return {name: getattr(instance, opts.get_field(name).attname) for name in self.columns}
+
+    def _render(self, rows: list[dict], related: dict) -> list[dict]:
+        pk_name = self.model._meta.pk.name
+        tz = _representation_timezone()
+        output = []
+        for row in rows:
+            data = {}
+            for name, convert, many in self._converters:
+                if many:
+                    data[name] = related[name].get(row[pk_name], [])
+                    continue
+                value = row[name]
+                data[name] = None if value is None else convert(value, tz)
+            output.append(data)
+        return output
 
+
+def load_m2m_ids(field, pks: list) -> dict:
+    """Map each primary key in ``pks`` to its related ids, in ascending id order, with one query."""
+    links: dict = {}
+    for source_id, target_id in _m2m_links(field, pks):
+        links.setdefault(source_id, []).append(target_id)
+    return links
+
+
+async def aload_m2m_ids(field, pks: list) -> dict:
+    links: dict = {}
+    async for source_id, target_id in _m2m_links(field, pks):
+        links.setdefault(source_id, []).append(target_id)
+    return links
+
+
+def _m2m_links(field, pks: list):
+    through = field.remote_field.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+    return through.objects.filter(**{f"{source}__in": pks}).order_by(target).values_list(source, target)
+
+
+def _converter_for(field) -> Callable:
+    """Pick a ``(value, tz) -> representation`` function equivalent to ``field.to_representation``."""
+    if isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+        return _identity
+    if isinstance(field, drf_fields.ChoiceField):
+        choices = field.choice_strings_to_values
+        return lambda value, tz: value if value == "" else choices.get(str(value), value)
+    if type(field) is drf_fields.BooleanField:
+        return lambda value, tz: field.to_representation(value)
+    if isinstance(field, drf_fields.IntegerField) and not isinstance(field, drf_fields.DecimalField):
+        return lambda value, tz: int(value)
+    if type(field) is drf_fields.FloatField:
+        return lambda value, tz: float(value)
+    if isinstance(field, drf_fields.CharField) and type(field).to_representation is drf_fields.CharField.to_representation:
+        return lambda value, tz: str(value)
+    if type(field) is drf_fields.DateTimeField and _iso(getattr(field, "format", api_settings.DATETIME_FORMAT)):
+        return _datetime_iso
+    if type(field) is drf_fields.DateField and _iso(getattr(field, "format", api_settings.DATE_FORMAT)):
+        return lambda value, tz: value.isoformat() if value else None
+    return lambda value, tz: field.to_representation(value)
+
+
+def _datetime_iso(value, tz):
+    # Mirrors DateTimeField.enforce_timezone() followed by its ISO 8601 output.
+    if not value:
+        return None
+    if isinstance(value, str):
+        return value
+    if tz is not None:
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+    elif timezone.is_aware(value):
+        value = timezone.make_naive(value, datetime.timezone.utc)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def _representation_timezone():
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def _iso(output_format) -> bool:
+    return output_format is not None and output_format.lower() == drf_fields.ISO_8601
+
+
+def _identity(value, tz):
+    return value
+
+
+def _cache_get(key, model_class: type):
+    with _SPARSE_LOCK:
+        entry = _SPARSE_SERIALIZER_CACHE.get(key)
+        if entry is None or entry[0] is not model_class:
+            return None
+        _SPARSE_SERIALIZER_CACHE.move_to_end(key)
+        return entry[1]
+
+
+def _cache_put(key, model_class: type, value) -> None:
+    with _SPARSE_LOCK:
+        _SPARSE_SERIALIZER_CACHE[key] = (model_class, value)
+        _SPARSE_SERIALIZER_CACHE.move_to_end(key)
+        while len(_SPARSE_SERIALIZER_CACHE) > settings.CONTRO_API_SERIALIZER_CACHE_SIZE:
+            _SPARSE_SERIALIZER_CACHE.popitem(last=False)
+
+
+def _build_serializer(model_class: type, fields, declared: dict | None = None):
     class Meta:
         model = model_class
-        fields = "__all__"
 
-    serializer_class = type(
+    Meta.fields = fields
+    return type(
         f"{model_class.__name__}Serializer",
         (serializers.ModelSerializer,),
-        {"Meta": Meta},
+        {"Meta": Meta, **(declared or {})},
     )
-    _SERIALIZER_CACHE[model_name] = serializer_class
-    return serializer_class
+
+
+def _freeze(tree: dict[str, dict]) -> tuple:
+    return tuple(sorted((name, _freeze(children)) for name, children in tree.items()))
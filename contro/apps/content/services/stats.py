@@ -0,0 +1,131 @@
+"""Cheap table statistics read from the database catalog."""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, connection
+
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+COUNT_NONE = "none"
+COUNT_STRATEGIES = (COUNT_EXACT, COUNT_ESTIMATED, COUNT_NONE)
+
+
+@dataclass
+class RowCount:
+    """A total that is either exact or a planner estimate; ``value`` is ``None`` when unknown."""
+
+    value: int | None
+    exact: bool
+
+
+def estimate_table_rows(table: str) -> int | None:
+    """Return the planner's row estimate for ``table`` or ``None`` when unknown.
+
+    Reads ``pg_class.reltuples`` on PostgreSQL, ``information_schema`` on
+    MySQL and ``sqlite_stat1`` on SQLite (only populated after ``ANALYZE``).
+    """
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            elif connection.vendor == "mysql":
+                cursor.execute(
+                    "SELECT table_rows FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name = %s",
+                    [table],
+                )
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+                if cursor.fetchone() is None:
+                    return None
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def estimate_query_rows(queryset) -> int | None:
+    """Return the planner's row estimate for ``queryset`` (PostgreSQL ``EXPLAIN``), else ``None``."""
+    if connection.vendor != "postgresql":
+        return None
+    try:
+        plan = json.loads(queryset.order_by().explain(format="json"))
+    except (DatabaseError, ValueError):
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    try:
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (LookupError, TypeError, ValueError):
+        return None
+
+
+def count_rows(queryset, strategy: str, threshold: int, known: int | None = None) -> RowCount | None:
+    """Count ``queryset`` with a content type's count strategy.
+
+    ``exact`` runs ``COUNT(*)``. ``estimated`` does too while the table's
+    estimated size is at most ``threshold`` (or unknown); above it, the total
+    comes from ``pg_class.reltuples`` for unfiltered querysets and from the
+    ``EXPLAIN`` estimate otherwise, with ``exact=False``. ``none`` returns
+    ``None``. ``known`` is an exact count already computed for ``queryset``;
+    pass it only where ``counts_exactly`` holds.
+    """
+    if strategy == COUNT_NONE:
+        return None
+    if known is not None:
+        return RowCount(value=known, exact=True)
+    if strategy == COUNT_ESTIMATED:
+        estimate = _estimated_count(queryset, threshold)
+        if estimate is not None:
+            return estimate
+    return RowCount(value=queryset.count(), exact=True)
+
+
+async def acount_rows(queryset, strategy: str, threshold: int, known: int | None = None) -> RowCount | None:
+    """Async ``count_rows``; catalog and ``EXPLAIN`` reads run in a thread."""
+    if strategy == COUNT_NONE:
+        return None
+    if known is not None:
+        return RowCount(value=known, exact=True)
+    if strategy == COUNT_ESTIMATED:
+        estimate = await sync_to_async(_estimated_count)(queryset, threshold)
+        if estimate is not None:
+            return estimate
+    return RowCount(value=await queryset.acount(), exact=True)
+
+
+def counts_exactly(queryset, strategy: str, threshold: int) -> bool:
+    """Whether ``count_rows`` runs ``COUNT(*)`` for ``queryset`` under ``strategy``."""
+    if strategy == COUNT_ESTIMATED:
+        return not _over_threshold(queryset, threshold)
+    return strategy == COUNT_EXACT
+
+
+async def acounts_exactly(queryset, strategy: str, threshold: int) -> bool:
+    if strategy == COUNT_ESTIMATED:
+        return not await sync_to_async(_over_threshold)(queryset, threshold)
+    return strategy == COUNT_EXACT
+
+
+def _over_threshold(queryset, threshold: int) -> bool:
+    table_rows = estimate_table_rows(queryset.model._meta.db_table)
+    return table_rows is not None and table_rows > threshold
+
+
+def _estimated_count(queryset, threshold: int) -> RowCount | None:
+    table_rows = estimate_table_rows(queryset.model._meta.db_table)
+    if table_rows is None or table_rows <= threshold:
+        return None
+    value = table_rows if not queryset.query.where else estimate_query_rows(queryset)
+    return RowCount(value=value, exact=False)
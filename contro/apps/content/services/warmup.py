@@ -0,0 +1,83 @@
+"""Worker warm-up: build dynamic models, serializers and the GraphQL schema up front."""
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db import DatabaseError, connections
+
+from contro.apps.content.services.registry import all_content_types
+from contro.apps.content.services.schema import ensure_schema_current, load_all_models
+from contro.apps.content.services.serializers import get_serializer_for_model
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupResult:
+    models: int = 0
+    serializers: int = 0
+    graphql_schema: bool = False
+    duration: float = 0.0
+    error: str | None = None
+
+
+def warm_up_content(result: WarmupResult | None = None) -> WarmupResult:
+    """Build every active dynamic model, its DRF serializer class and the content type registry without running DDL."""
+    result = result or WarmupResult()
+    started = time.perf_counter()
+    try:
+        # Loads the generation first, so the GraphQL schema built next is keyed to it.
+        ensure_schema_current()
+        model_classes = load_all_models(create_missing=False)
+    except DatabaseError as exc:
+        result.error = str(exc)
+        logger.warning("Content warm-up skipped, database unavailable: %s", exc)
+    else:
+        for model_class in model_classes:
+            get_serializer_for_model(model_class)
+        all_content_types()
+        result.models = len(model_classes)
+        result.serializers = len(model_classes)
+    elapsed = time.perf_counter() - started
+    logger.info("Content warm-up took %.1fms for %d models", elapsed * 1000, result.models)
+    result.duration += elapsed
+    return result
+
+
+def warm_up() -> WarmupResult:
+    """Run the full warm-up without running DDL; safe to call from a gunicorn ``post_fork`` hook."""
+    result = warm_up_content()
+    if result.error is None and apps.is_installed("contro.apps.graphql"):
+        from contro.apps.graphql.schema import warm_up_schema
+
+        warm_up_schema(result)
+    logger.info(
+        "Warm-up finished in %.1fms: %d models, %d serializers, graphql=%s",
+        result.duration * 1000,
+        result.models,
+        result.serializers,
+        result.graphql_schema,
+    )
+    return result
+
+
+def warm_up_in_thread() -> WarmupResult:
+    """``warm_up`` on a thread of its own, for ASGI servers that load the application inside their event loop."""
+
+    def run():
+        try:
+            return warm_up()
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run).result()
+
+
+def post_fork(server, worker) -> None:
+    warm_up()
@@ -1,3 +1,471 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.http import QueryDict
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TransactionTestCase
+from django.utils import timezone
+
+from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition, SchemaGeneration
+from contro.apps.content.services import importer, schema
+from contro.apps.content.services.filters import build_filter_plan, parse_filters
+from contro.apps.content.services.registry import get_content_type
+from contro.apps.content.services.planner import ACTION_ADD_COLUMN, ACTION_ALTER_COLUMN
+from contro.apps.content.services.schema import plan_all_schemas, sync_schema
+from contro.apps.content.services.serializers import get_read_serializer, get_serializer_for_model
+from contro.apps.content.services.warmup import warm_up
+from contro.apps.graphql import dynamic
+from contro.apps.iam.models import User
+
+
+def _content_type(name: str, slug: str, fields: list[dict], metadata: dict | None = None) -> type:
+    content_type = ContentTypeDefinition.objects.create(name=name, slug=slug, metadata=metadata or {})
+    for order, spec in enumerate(fields):
+        ContentFieldDefinition.objects.create(content_type=content_type, order=order, **spec)
+    return sync_schema(content_type).model
+
+
+class CompiledReadSerializerTests(TransactionTestCase):
+    """The compiled read serializer renders exactly what ``ModelSerializer`` does."""
+
+    def setUp(self):
+        _content_type("Parity Tag", "parity_tag", [{"name": "Label", "slug": "label", "field_type": "text"}])
+        tag_type = ContentTypeDefinition.objects.get(slug="parity_tag")
+        self.model = _content_type(
+            "Parity Entry",
+            "parity_entry",
+            [
+                {"name": "Title", "slug": "title", "field_type": "text", "metadata": {"max_length": 80}},
+                {"name": "Body", "slug": "body", "field_type": "text"},
+                {"name": "Rank", "slug": "rank", "field_type": "number", "metadata": {"integer": True}},
+                {"name": "Score", "slug": "score", "field_type": "number"},
+                {"name": "Featured", "slug": "featured", "field_type": "boolean", "required": True},
+                {"name": "Event Date", "slug": "event_date", "field_type": "date"},
+                {"name": "Handle", "slug": "handle", "field_type": "slug"},
+                {"name": "Cover", "slug": "cover", "field_type": "media"},
+                {"name": "Gallery", "slug": "gallery", "field_type": "media_m2m"},
+                {"name": "Main Tag", "slug": "main_tag", "field_type": "fk", "relation_target": tag_type},
+                {"name": "Tags", "slug": "tags", "field_type": "m2m", "relation_target": tag_type},
+            ],
+        )
+        # Syncing the entry rebuilds its relation targets, so take the tag model from the field.
+        tag_model = self.model._meta.get_field("tags").related_model
+        tags = [tag_model.objects.create(label=f"tag {index}") for index in range(3)]
+        full = self.model.objects.create(
+            title="Full",
+            body="Every field set",
+            rank=3,
+            score=2.5,
+            featured=True,
+            event_date=datetime.date(2024, 2, 29),
+            handle="full",
+            main_tag=tags[1],
+            status="published",
+            published_at=datetime.datetime(2024, 6, 30, 22, 15, 30, 123456, tzinfo=datetime.timezone.utc),
+        )
+        # Linked out of id order.
+        full.tags.add(tags[2])
+        full.tags.add(tags[0])
+        # Nullable fields left empty, no links and the default (draft) status.
+        self.model.objects.create(featured=False)
+
+    def _assert_parity(self, fields=None):
+        queryset = self.model.objects.order_by("id")
+        expected = [dict(item) for item in get_serializer_for_model(self.model, fields)(queryset, many=True).data]
+        compiled = get_read_serializer(self.model, fields)
+        rows = compiled.serialize_rows(queryset.values(*compiled.columns))
+        self.assertEqual([list(row) for row in rows], [list(item) for item in expected])
+        self.assertEqual(rows, expected)
+        self.assertEqual([compiled.serialize_instance(instance) for instance in queryset], expected)
+        return rows
+
+    def test_every_field_type(self):
+        rows = self._assert_parity()
+        self.assertEqual(rows[0]["status"], "published")
+        self.assertIsNone(rows[1]["published_at"])
+        self.assertEqual(rows[1]["tags"], [])
+
+    def test_sparse_fields(self):
+        self._assert_parity(["id", "title", "published_at", "tags"])
+
+    def test_current_timezone(self):
+        for zone in ("UTC", "Asia/Tehran", "America/St_Johns"):
+            with self.subTest(zone=zone), timezone.override(zone):
+                self._assert_parity()
+
+    def test_m2m_ids_are_ascending(self):
+        rows = self._assert_parity()
+        self.assertEqual(rows[0]["tags"], sorted(rows[0]["tags"]))
+
+
+class ContentTypeDeletionTests(TransactionTestCase):
+    def test_delete_drops_model_registry_entry_and_graphql_fields(self):
+        from contro.apps.graphql.dynamic import get_schema
+
+        _content_type("Doomed", "doomed", [{"name": "Title", "slug": "title", "field_type": "text"}])
+        schema.ensure_schema_current()
+        self.assertIn("doomed", schema._DYNAMIC_MODELS)
+        self.assertIsNotNone(get_content_type("doomed"))
+        self.assertIn("doomed", get_schema().graphql_schema.query_type.fields)
+
+        generation = schema.loaded_generation()
+        ContentTypeDefinition.objects.get(slug="doomed").delete()
+        self.assertGreater(schema.loaded_generation(), generation)
+        self.assertNotIn("doomed", schema._DYNAMIC_MODELS)
+        self.assertNotIn("doomed", schema._MODEL_GENERATIONS)
+        self.assertIsNone(get_content_type("doomed"))
+        self.assertNotIn("doomed", get_schema().graphql_schema.query_type.fields)
+
+
+class SchemaRefreshTests(TransactionTestCase):
+    def test_unbuildable_type_keeps_previous_model(self):
+        model = _content_type("Fragile", "fragile", [{"name": "Title", "slug": "title", "field_type": "text"}])
+        sturdy = _content_type("Sturdy", "sturdy", [{"name": "Title", "slug": "title", "field_type": "text"}])
+        schema.ensure_schema_current()
+        fragile, sturdy_type = ContentTypeDefinition.objects.get(slug="fragile"), ContentTypeDefinition.objects.get(slug="sturdy")
+        # A relation whose target is gone cannot be built.
+        fragile.fields.update(field_type=ContentFieldDefinition.FIELD_FK, relation_target=None)
+        ContentFieldDefinition.objects.create(content_type=sturdy_type, name="Body", slug="body", field_type="text")
+        generation = SchemaGeneration.bump([fragile.pk, sturdy_type.pk])
+        with self.assertLogs("contro.apps.content.services.schema", "ERROR"):
+            self.assertEqual(schema.ensure_schema_current(), generation)
+        self.assertIs(schema._DYNAMIC_MODELS["fragile"], model)
+        self.assertIsNot(schema._DYNAMIC_MODELS["sturdy"], sturdy)
+        self.assertTrue(hasattr(schema._DYNAMIC_MODELS["sturdy"], "body"))
+
+
+class WarmupTests(TransactionTestCase):
+    def test_warm_up_never_creates_tables(self):
+        _content_type("Warm", "warm", [{"name": "Title", "slug": "title", "field_type": "text"}])
+        pending = ContentTypeDefinition.objects.create(name="Pending", slug="pending")
+        ContentFieldDefinition.objects.create(content_type=pending, name="Title", slug="title", field_type="text")
+        with (
+            mock.patch.dict(schema._DYNAMIC_MODELS, clear=True),
+            mock.patch.dict(schema._MODEL_GENERATIONS, clear=True),
+            mock.patch.object(schema, "_LOADED_GENERATION", 0),
+            mock.patch.object(dynamic, "_SCHEMA", None),
+        ):
+            result = warm_up()
+            self.assertNotIn(pending.db_table, connection.introspection.table_names())
+            self.assertEqual((result.models, result.graphql_schema), (1, True))
+            self.assertEqual(set(schema._DYNAMIC_MODELS), {"warm"})
+            # The schema without the pending type is not cached, so its first request creates the table.
+            self.assertIsNone(dynamic._SCHEMA)
+            self.assertIn("pendings", dynamic.get_schema().graphql_schema.query_type.fields)
+            self.assertIn(pending.db_table, connection.introspection.table_names())
+
+
+def _columns(table: str) -> dict[str, bool]:
+    with connection.cursor() as cursor:
+        return {column.name: column.null_ok for column in connection.introspection.get_table_description(cursor, table)}
+
+
+class SchemaPlanTests(TransactionTestCase):
+    def setUp(self):
+        _content_type(
+            "Planned",
+            "planned",
+            [
+                {"name": "Title", "slug": "title", "field_type": "text", "metadata": {"max_length": 80}},
+                {"name": "Rank", "slug": "rank", "field_type": "number", "metadata": {"integer": True}},
+            ],
+        )
+        self.content_type = ContentTypeDefinition.objects.get(slug="planned")
+
+    def _plan(self):
+        return plan_all_schemas(ContentTypeDefinition.objects.filter(slug="planned"))[0][1]
+
+    def test_nullability_change_is_altered(self):
+        self.content_type.fields.filter(slug="rank").update(required=True)
+        plan = self._plan()
+        self.assertEqual([(step.action, step.target) for step in plan.steps], [(ACTION_ALTER_COLUMN, "rank")])
+        schema.sync_all_schemas(ContentTypeDefinition.objects.filter(slug="planned"))
+        self.assertFalse(_columns("content_planned")["rank"])
+        self.assertEqual(self._plan().steps, [])
+
+    def test_type_change_is_an_error(self):
+        self.content_type.fields.filter(slug="title").update(metadata={"max_length": 120})
+        self.content_type.fields.filter(slug="rank").update(metadata={})
+        plan = self._plan()
+        self.assertEqual(len(plan.errors), 2)
+        self.assertIn("varchar(120)", plan.errors[0])
+        with self.assertRaises(ValueError):
+            schema.sync_all_schemas(ContentTypeDefinition.objects.filter(slug="planned"))
+
+    def test_removed_field_is_reported(self):
+        self.content_type.fields.filter(slug="rank").delete()
+        plan = self._plan()
+        self.assertEqual(plan.steps, [])
+        self.assertEqual(len(plan.warnings), 1)
+        self.assertIn("'rank'", plan.warnings[0])
+
+
+class SchemaChangeViewTests(TransactionTestCase):
+    def setUp(self):
+        _content_type("Edited", "edited", [{"name": "Title", "slug": "title", "field_type": "text"}])
+        self.content_type = ContentTypeDefinition.objects.get(slug="edited")
+        self.client.force_login(User.objects.create_superuser("admin@example.com", "password"))
+
+    def test_field_create_previews_then_applies(self):
+        url = f"/content/types/{self.content_type.pk}/fields/new/"
+        data = {"name": "Body", "slug": "body", "field_type": "text", "metadata": "{}", "order": 1}
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        [(slug, plan)] = response.context["schema_plan"]
+        self.assertEqual((slug, plan.targets(ACTION_ADD_COLUMN)), ("edited", ["body"]))
+        # Nothing is saved until the plan is confirmed.
+        self.assertFalse(self.content_type.fields.filter(slug="body").exists())
+        self.assertNotIn("body", _columns("content_edited"))
+        self.assertIs(apps.get_model("content", "edited"), schema._DYNAMIC_MODELS["edited"])
+        self.assertFalse(hasattr(schema._DYNAMIC_MODELS["edited"], "body"))
+
+        response = self.client.post(url, {**data, "confirm": "1"})
+        self.assertRedirects(response, f"/content/types/{self.content_type.pk}/fields/", fetch_redirect_response=False)
+        self.assertIn("body", _columns("content_edited"))
+        self.assertTrue(hasattr(schema._DYNAMIC_MODELS["edited"], "body"))
+
+    def test_changes_without_schema_steps_apply_directly(self):
+        response = self.client.post(
+            f"/content/types/{self.content_type.pk}/edit/",
+            {"name": "Edited", "slug": "edited", "plural_name": "Edits", "metadata": "{}", "is_active": "on"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(ContentTypeDefinition.objects.get(pk=self.content_type.pk).plural_name, "Edits")
+
+
+class ImportContentTests(TransactionTestCase):
+    def setUp(self):
+        _content_type("Import Tag", "import_tag", [{"name": "Label", "slug": "label", "field_type": "text"}])
+        _content_type(
+            "Import Author", "import_author", [{"name": "Code", "slug": "code", "field_type": "number", "metadata": {"integer": True}}]
+        )
+        self.model = _content_type(
+            "Import Entry",
+            "import_entry",
+            [
+                {"name": "Title", "slug": "title", "field_type": "text", "required": True, "metadata": {"max_length": 10}},
+                {
+                    "name": "Author",
+                    "slug": "author",
+                    "field_type": "fk",
+                    "relation_target": ContentTypeDefinition.objects.get(slug="import_author"),
+                },
+                {
+                    "name": "Tags",
+                    "slug": "tags",
+                    "field_type": "m2m",
+                    "relation_target": ContentTypeDefinition.objects.get(slug="import_tag"),
+                },
+            ],
+        )
+        self.author = self.model._meta.get_field("author").related_model.objects.create(code=7)
+        self.tag = self.model._meta.get_field("tags").related_model.objects.create(label="red")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        directory = directory.name
+        self.path = os.path.join(directory, "entries.ndjson")
+        self.errors_path = os.path.join(directory, "errors.ndjson")
+
+    def _import(self, path, **options):
+        call_command("import_content", "import_entry", path, stdout=io.StringIO(), **options)
+
+    def test_csv_cells_and_natural_keys(self):
+        path = self.path.replace(".ndjson", ".csv")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(f'title,author,tags\n[draft],7,[{self.tag.pk}]\nmissing,8,\nbad key,x,\n')
+        self._import(path, lookup=["author=code"], errors_path=self.errors_path)
+        entry = self.model.objects.get()
+        self.assertEqual(entry.title, "[draft]")
+        self.assertEqual(entry.author_id, self.author.pk)
+        self.assertEqual(list(entry.tags.values_list("pk", flat=True)), [self.tag.pk])
+        with open(self.errors_path, encoding="utf-8") as handle:
+            errors = {line["index"]: line["errors"]["author"] for line in map(json.loads, handle)}
+        self.assertEqual(errors, {1: ["No Import Author with code=8."], 2: ["Invalid code: 'x'."]})
+
+    def test_resume_writes_each_error_once(self):
+        titles = ["ok 0", "far too long 1", "far too long 2", "ok 3", "far too long 4", "ok 5"]
+        with open(self.path, "w", encoding="utf-8") as handle:
+            handle.writelines(json.dumps({"title": title}) + "\n" for title in titles)
+        save = importer.Checkpoint.save
+        calls = []
+
+        def crash_on_second_save(checkpoint):
+            calls.append(checkpoint.position)
+            if len(calls) == 2:
+                raise RuntimeError("interrupted")
+            save(checkpoint)
+
+        with mock.patch.object(importer.Checkpoint, "save", crash_on_second_save), self.assertRaises(RuntimeError):
+            self._import(self.path, chunk_size=2, errors_path=self.errors_path)
+        self._import(self.path, chunk_size=2, errors_path=self.errors_path)
+
+        with open(self.errors_path, encoding="utf-8") as handle:
+            self.assertEqual([json.loads(line)["index"] for line in handle], [1, 2, 4])
+        with open(f"{self.path}.checkpoint", encoding="utf-8") as handle:
+            self.assertEqual(json.load(handle)["position"], 6)
+        # The chunk after the last checkpoint is imported again.
+        self.assertEqual(sorted(self.model.objects.values_list("title", flat=True)), ["ok 0", "ok 3", "ok 3", "ok 5"])
+
+    def test_chunks_use_loaded_models_only(self):
+        with mock.patch.object(schema, "sync_schema", side_effect=AssertionError("no DDL")):
+            with mock.patch.dict(schema._DYNAMIC_MODELS, clear=True):
+                with self.assertRaisesMessage(ValueError, "not loaded"):
+                    importer.import_chunk("import_entry", 0, [{"title": "t"}], {})
+                schema.load_all_models(create_missing=False)
+                result = importer.import_chunk("import_entry", 0, [{"title": "t", "author": "7"}], {"author": "code"})
+        self.assertEqual((result.created, result.errors), (1, []))
+
+
+class IndexSpecTests(TransactionTestCase):
+    def test_clean_rejects_unknown_fields(self):
+        _content_type("Indexed", "indexed", [{"name": "Title", "slug": "title", "field_type": "text"}])
+        content_type = ContentTypeDefinition.objects.get(slug="indexed")
+        content_type.metadata = {"indexes": [{"fields": ["-published_at", "title"]}]}
+        content_type.full_clean()
+        content_type.metadata = {"indexes": [{"fields": ["title", "missing"]}]}
+        with self.assertRaisesMessage(ValidationError, "unknown fields: missing"):
+            content_type.full_clean()
+
+    def test_build_skips_unknown_fields(self):
+        _content_type("Stale Index", "stale-index", [{"name": "Title", "slug": "title", "field_type": "text"}])
+        # Saved without clean(), as older rows were.
+        ContentTypeDefinition.objects.filter(slug="stale-index").update(
+            metadata={"indexes": [{"fields": ["missing"]}, {"fields": ["title"]}]}
+        )
+        with self.assertLogs("contro.apps.content.services.schema", "ERROR"):
+            model = sync_schema(ContentTypeDefinition.objects.get(slug="stale-index")).model
+        self.assertIn(("title",), {tuple(index.fields) for index in model._meta.indexes})
+
+
+class ParseFiltersTests(SimpleTestCase):
+    def _parse(self, query):
+        return {(tuple(condition.path), condition.operator): condition.value for condition in parse_filters(QueryDict(query))}
+
+    def test_shorthand_and_operators(self):
+        self.assertEqual(
+            self._parse("filters[title]=a&filters[author][name][$startsWith]=b&page_size=2"),
+            {(("title",), "$eq"): "a", (("author", "name"), "$startsWith"): "b"},
+        )
+
+    def test_in_values(self):
+        self.assertEqual(self._parse("filters[id][$in][0]=1&filters[id][$in][1]=2"), {(("id",), "$in"): ["1", "2"]})
+        self.assertEqual(self._parse("filters[id][$in]=1&filters[id][$in]=2"), {(("id",), "$in"): ["1", "2"]})
+        self.assertEqual(self._parse("filters[id][$notIn][0]=3"), {(("id",), "$notIn"): ["3"]})
+
+    def test_rejects_malformed_keys(self):
+        for query in (
+            "filters[]=1",
+            "filters[title=1",
+            "filters[title][]=1",
+            "filters[$eq]=1",
+            "filters[title][$like]=1",
+        ):
+            with self.subTest(query=query), self.assertRaises(ValueError):
+                self._parse(query)
+
+
+class FilterPlanTests(TransactionTestCase):
+    def setUp(self):
+        _content_type("Filter Tag", "filter-tag", [{"name": "Label", "slug": "label", "field_type": "text"}])
+        tag_type = ContentTypeDefinition.objects.get(slug="filter-tag")
+        _content_type(
+            "Filter Author",
+            "filter-author",
+            [
+                {"name": "Name", "slug": "name", "field_type": "text"},
+                {"name": "Badge", "slug": "badge", "field_type": "fk", "relation_target": tag_type},
+            ],
+        )
+        author_type = ContentTypeDefinition.objects.get(slug="filter-author")
+        self.model = _content_type(
+            "Filter Entry",
+            "filter-entry",
+            [
+                {"name": "Title", "slug": "title", "field_type": "text"},
+                {"name": "Code", "slug": "code", "field_type": "slug", "unique": True},
+                {"name": "Rank", "slug": "rank", "field_type": "number", "metadata": {"integer": True}},
+                {"name": "Author", "slug": "author", "field_type": "fk", "relation_target": author_type},
+                {"name": "Tags", "slug": "tags", "field_type": "m2m", "relation_target": tag_type},
+            ],
+            metadata={"filtering": {"max_unindexed_rows": 100}},
+        )
+        author_model = self.model._meta.get_field("author").related_model
+        tag_model = self.model._meta.get_field("tags").related_model
+        red, blue = tag_model.objects.create(label="red"), tag_model.objects.create(label="blue")
+        ada = author_model.objects.create(name="Ada", badge=red)
+        self.entries = [
+            self.model.objects.create(title=f"entry {rank}", code=f"e{rank}", rank=rank, author=ada if rank % 2 else None)
+            for rank in range(4)
+        ]
+        self.entries[0].tags.add(red)
+        self.entries[1].tags.add(red, blue)
+
+    def _plan(self, query, max_depth=2):
+        return build_filter_plan(self.model, parse_filters(QueryDict(query)), max_depth)
+
+    def _ranks(self, query, max_depth=2):
+        queryset = self._plan(query, max_depth).apply(self.model.objects.all())
+        return sorted(queryset.values_list("rank", flat=True))
+
+    def test_in(self):
+        ids = [self.entries[1].pk, self.entries[3].pk]
+        self.assertEqual(self._ranks(f"filters[id][$in][0]={ids[0]}&filters[id][$in][1]={ids[1]}"), [1, 3])
+        self.assertEqual(self._ranks("filters[rank][$in]=0&filters[rank][$in]=2"), [0, 2])
+
+    def test_rejects_malformed_in(self):
+        for query in ("filters[id][$in]=x", "filters[rank][$in][0]=1&filters[rank][$in][1]=two", "filters[id][$in]="):
+            with self.subTest(query=query), self.assertRaises(ValueError):
+                self._plan(query)
+
+    def test_negated_operators(self):
+        self.assertEqual(self._ranks("filters[rank][$ne]=1"), [0, 2, 3])
+        self.assertEqual(self._ranks("filters[rank][$notIn]=1&filters[rank][$notIn]=2"), [0, 3])
+        # Rows without an author are not equal to it either.
+        self.assertEqual(self._ranks(f"filters[author][$ne]={self.entries[1].author_id}"), [0, 2])
+
+    def test_many_to_many_rows_are_not_repeated(self):
+        plan = self._plan("filters[tags][label][$in]=red&filters[tags][label][$in]=blue")
+        self.assertTrue(plan.multi_valued)
+        self.assertEqual(self._ranks("filters[tags][label][$in]=red&filters[tags][label][$in]=blue"), [0, 1])
+
+    def test_depth_limit(self):
+        self.assertEqual(self._ranks("filters[author][name]=Ada", max_depth=1), [1, 3])
+        self.assertEqual(self._ranks("filters[author][badge][label]=red", max_depth=2), [1, 3])
+        with self.assertRaisesMessage(ValueError, "crosses more than 1 relations"):
+            self._plan("filters[author][badge][label]=red", max_depth=1)
+        with self.assertRaisesMessage(ValueError, "crosses more than 0 relations"):
+            self._plan("filters[author][name]=Ada", max_depth=0)
+
+    def test_rejects_unknown_fields_and_operators(self):
+        for query in (
+            "filters[missing]=1",
+            "filters[title][name]=1",
+            "filters[id][0]=1",
+            "filters[rank][$contains]=1",
+            "filters[title][$gt]=a",
+            "filters[author][$startsWith]=A",
+        ):
+            with self.subTest(query=query), self.assertRaises(ValueError):
+                self._plan(query)
+
+    def test_index_policy(self):
+        estimate = "contro.apps.content.services.filters.estimate_table_rows"
+        with mock.patch(estimate, return_value=10_000):
+            # Keys, unique columns and relations can use an index.
+            self._plan(f"filters[id][$lt]={self.entries[2].pk}")
+            self._plan("filters[code][$in]=e1&filters[code][$in]=e2")
+            self._plan(f"filters[author][$eq]={self.entries[1].author_id}")
+            for query in ("filters[rank][$eq]=1", "filters[code][$startsWith]=e", "filters[id][$ne]=1"):
+                with self.subTest(query=query), self.assertRaisesMessage(ValueError, "needs a full scan"):
+                    self._plan(query)
+        # Small tables and unknown estimates are not checked.
+        for rows in (50, None):
+            with mock.patch(estimate, return_value=rows):
+                self.assertEqual(self._ranks("filters[rank][$gte]=2"), [2, 3])
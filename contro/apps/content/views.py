@@ -3,12 +3,14 @@ from __future__ import annotations
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import PermissionDenied
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.http import require_http_methods
 
 from contro.apps.content.forms import ContentFieldForm, ContentTypeForm, content_entry_form
 from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition
-from contro.apps.content.services.schema import get_dynamic_model, sync_schema
+from contro.apps.content.services.registry import ContentTypeSnapshot, get_content_type_by_pk
+from contro.apps.content.services.schema import apply_schema_change, get_dynamic_model_by_slug, preview_schema_change
 from contro.apps.content.services.hooks import run_hooks
 
 
@@ -17,6 +19,36 @@ def _check_perm(user, perm: str, obj=None) -> None:
         raise PermissionDenied
 
 
+def _plan_or_apply(request, change, context: dict) -> bool:
+    """Apply the definition change ``change`` makes once its schema steps are confirmed.
+
+    Changes that need no schema steps are applied straight away. Otherwise the
+    plan goes into ``context`` for the form to show with a confirm button, and
+    nothing is saved until the form is posted again with ``confirm``. Returns
+    whether the change was applied.
+    """
+    try:
+        if not request.POST.get("confirm"):
+            planned = preview_schema_change(change)
+            if any(plan.steps or plan.errors or plan.warnings for _, plan in planned):
+                context["schema_plan"] = [(content_type.slug, plan) for content_type, plan in planned]
+                context["schema_plan_blocked"] = any(plan.errors for _, plan in planned)
+                return False
+        apply_schema_change(change)
+        return True
+    except Exception as exc:
+        messages.error(request, f"Schema sync failed: {exc}")
+        return False
+
+
+def _get_content_type(pk: int) -> ContentTypeSnapshot:
+    """Read-only content type from the registry, for views that do not edit the definition."""
+    content_type = get_content_type_by_pk(pk)
+    if content_type is None:
+        raise Http404("No content type matches the given query.")
+    return content_type
+
+
 @login_required
 @require_http_methods(["GET"])
 def content_type_list(request):
@@ -30,16 +62,11 @@ def content_type_list(request):
 def content_type_create(request):
     _check_perm(request.user, "content.add_contenttypedefinition")
     form = ContentTypeForm(request.POST or None)
-    if request.method == "POST" and form.is_valid():
-        content_type = form.save()
-        try:
-            sync_schema(content_type)
-            messages.success(request, "Content type created.")
-            return redirect("content:type_edit", pk=content_type.pk)
-        except Exception as exc:
-            content_type.delete()
-            messages.error(request, f"Schema sync failed: {exc}")
-    return render(request, "content/type_form.html", {"form": form, "mode": "create"})
+    context = {"form": form, "mode": "create"}
+    if request.method == "POST" and form.is_valid() and _plan_or_apply(request, form.save, context):
+        messages.success(request, "Content type created.")
+        return redirect("content:type_edit", pk=form.instance.pk)
+    return render(request, "content/type_form.html", context)
 
 
 @login_required
@@ -48,27 +75,19 @@ def content_type_edit(request, pk: int):
     content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
     _check_perm(request.user, "content.change_contenttypedefinition", obj=content_type)
     form = ContentTypeForm(request.POST or None, instance=content_type)
-    if request.method == "POST" and form.is_valid():
-        content_type = form.save()
-        try:
-            sync_schema(content_type)
-            messages.success(request, "Content type updated.")
-            return redirect("content:type_edit", pk=content_type.pk)
-        except Exception as exc:
-            messages.error(request, f"Schema sync failed: {exc}")
-    return render(
-        request,
-        "content/type_form.html",
-        {"form": form, "mode": "edit", "content_type": content_type},
-    )
+    context = {"form": form, "mode": "edit", "content_type": content_type}
+    if request.method == "POST" and form.is_valid() and _plan_or_apply(request, form.save, context):
+        messages.success(request, "Content type updated.")
+        return redirect("content:type_edit", pk=content_type.pk)
+    return render(request, "content/type_form.html", context)
 
 
 @login_required
 @require_http_methods(["GET"])
 def field_list(request, pk: int):
-    content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
+    content_type = _get_content_type(pk)
     _check_perm(request.user, "content.view_contentfielddefinition")
-    fields = content_type.fields.all()
+    fields = content_type.fields
     return render(
         request,
         "content/field_list.html",
@@ -82,22 +101,18 @@ def field_create(request, pk: int):
     content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
     _check_perm(request.user, "content.add_contentfielddefinition")
     form = ContentFieldForm(request.POST or None)
-    if request.method == "POST" and form.is_valid():
+    context = {"form": form, "mode": "create", "content_type": content_type}
+
+    def change():
         field = form.save(commit=False)
         field.content_type = content_type
         field.save()
-        try:
-            sync_schema(content_type)
-            messages.success(request, "Field created.")
-            return redirect("content:field_list", pk=content_type.pk)
-        except Exception as exc:
-            field.delete()
-            messages.error(request, f"Schema sync failed: {exc}")
-    return render(
-        request,
-        "content/field_form.html",
-        {"form": form, "mode": "create", "content_type": content_type},
-    )
+        return content_type
+
+    if request.method == "POST" and form.is_valid() and _plan_or_apply(request, change, context):
+        messages.success(request, "Field created.")
+        return redirect("content:field_list", pk=content_type.pk)
+    return render(request, "content/field_form.html", context)
 
 
 @login_required
@@ -107,31 +122,28 @@ def field_edit(request, pk: int, field_pk: int):
     field = get_object_or_404(ContentFieldDefinition, pk=field_pk, content_type=content_type)
     _check_perm(request.user, "content.change_contentfielddefinition", obj=field)
     form = ContentFieldForm(request.POST or None, instance=field)
-    if request.method == "POST" and form.is_valid():
+    context = {"form": form, "mode": "edit", "content_type": content_type, "field": field}
+
+    def change():
         form.save()
-        try:
-            sync_schema(content_type)
-            messages.success(request, "Field updated.")
-            return redirect("content:field_list", pk=content_type.pk)
-        except Exception as exc:
-            messages.error(request, f"Schema sync failed: {exc}")
-    return render(
-        request,
-        "content/field_form.html",
-        {"form": form, "mode": "edit", "content_type": content_type, "field": field},
-    )
+        return content_type
+
+    if request.method == "POST" and form.is_valid() and _plan_or_apply(request, change, context):
+        messages.success(request, "Field updated.")
+        return redirect("content:field_list", pk=content_type.pk)
+    return render(request, "content/field_form.html", context)
 
 
 @login_required
 @require_http_methods(["GET"])
 def entry_list(request, pk: int):
-    content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
-    model = get_dynamic_model(content_type)
+    content_type = _get_content_type(pk)
+    model = get_dynamic_model_by_slug(content_type.slug)
     perm = f"content.view_{model._meta.model_name}"
     _check_perm(request.user, perm)
 
     entries = model.objects.all().order_by("-id")
-    fields = content_type.fields.all()
+    fields = content_type.fields
     return render(
         request,
         "content/entry_list.html",
@@ -142,8 +154,8 @@ def entry_list(request, pk: int):
 @login_required
 @require_http_methods(["GET", "POST"])
 def entry_create(request, pk: int):
-    content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
-    model = get_dynamic_model(content_type)
+    content_type = _get_content_type(pk)
+    model = get_dynamic_model_by_slug(content_type.slug)
     perm = f"content.add_{model._meta.model_name}"
     _check_perm(request.user, perm)
 
@@ -165,8 +177,8 @@ def entry_create(request, pk: int):
 @login_required
 @require_http_methods(["GET", "POST"])
 def entry_edit(request, pk: int, entry_id: int):
-    content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
-    model = get_dynamic_model(content_type)
+    content_type = _get_content_type(pk)
+    model = get_dynamic_model_by_slug(content_type.slug)
     entry = get_object_or_404(model, pk=entry_id)
 
     perm = f"content.change_{model._meta.model_name}"
@@ -191,8 +203,8 @@ def entry_edit(request, pk: int, entry_id: int):
 @login_required
 @require_http_methods(["POST"])
 def entry_delete(request, pk: int, entry_id: int):
-    content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
-    model = get_dynamic_model(content_type)
+    content_type = _get_content_type(pk)
+    model = get_dynamic_model_by_slug(content_type.slug)
     entry = get_object_or_404(model, pk=entry_id)
 
     perm = f"content.delete_{model._meta.model_name}"
@@ -208,8 +220,8 @@ def entry_delete(request, pk: int, entry_id: int):
 @login_required
 @require_http_methods(["POST"])
 def entry_publish(request, pk: int, entry_id: int):
-    content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
-    model = get_dynamic_model(content_type)
+    content_type = _get_content_type(pk)
+    model = get_dynamic_model_by_slug(content_type.slug)
     entry = get_object_or_404(model, pk=entry_id)
 
     perm = f"content.change_{model._meta.model_name}"
@@ -226,8 +238,8 @@ def entry_publish(request, pk: int, entry_id: int):
 @login_required
 @require_http_methods(["POST"])
 def entry_unpublish(request, pk: int, entry_id: int):
-    content_type = get_object_or_404(ContentTypeDefinition, pk=pk)
-    model = get_dynamic_model(content_type)
+    content_type = _get_content_type(pk)
+    model = get_dynamic_model_by_slug(content_type.slug)
     entry = get_object_or_404(model, pk=entry_id)
 
     perm = f"content.change_{model._meta.model_name}"
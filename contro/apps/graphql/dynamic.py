@@ -1,34 +1,100 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+
 import graphene
+from asgiref.sync import sync_to_async
 from graphene_django.types import DjangoObjectType
+from graphene_django.utils import get_model_fields
 from graphql import GraphQLError
 
 from django.db.utils import OperationalError
 
-from contro.apps.content.models import ContentFieldDefinition, ContentTypeDefinition
-from contro.apps.content.services.schema import get_dynamic_model
+from contro.apps.content.models import ContentFieldDefinition
+from contro.apps.content.services.hooks import run_hooks
+from contro.apps.content.services.registry import FieldSnapshot, all_content_types
+from contro.apps.content.services.schema import batch_registration, load_all_models, loaded_generation, loaded_models
+from contro.apps.graphql.loaders import get_loaders
 from contro.apps.iam.authentication import ApiTokenCredentials
-from contro.apps.iam.services.tokens import token_has_permission
+from contro.apps.iam.services.tokens import atoken_has_permission, token_has_permission
 from contro.apps.media.models import MediaFile
 
 
+# (schema generation, schema) last built in this process.
+_SCHEMA: tuple[int, graphene.Schema] | None = None
+_SCHEMA_LOCK = threading.Lock()
+
+
+def get_schema(create_missing: bool = True) -> graphene.Schema:
+    """The schema for the loaded content models, built once per schema generation.
+
+    The generation is the one ``SchemaGenerationMiddleware`` refreshed for the
+    current request; a stale schema is rebuilt by the first thread to ask for
+    it while the others wait. A schema is only cached if no model was
+    replaced while it was built. Without ``create_missing``, types whose table
+    does not exist yet are left out, and so is the schema from the cache.
+    """
+    global _SCHEMA
+
+    generation = loaded_generation()
+    cached = _SCHEMA
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    with _SCHEMA_LOCK:
+        cached = _SCHEMA
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        try:
+            content_types = all_content_types(active_only=True)
+        except OperationalError:
+            # Not cached, so the real schema is built once the database is ready.
+            return graphene.Schema(query=_fallback_query())
+        schema, models = _build_schema(content_types, create_missing)
+        complete = create_missing or all(content_type.slug in models for content_type in content_types)
+        if complete and models == loaded_models():
+            _SCHEMA = (generation, schema)
+    return schema
+
+
+async def aget_schema() -> graphene.Schema:
+    """Async ``get_schema``; only a rebuild leaves the event loop."""
+    cached = _SCHEMA
+    if cached is not None and cached[0] == loaded_generation():
+        return cached[1]
+    return await sync_to_async(get_schema)()
+
+
 def build_schema() -> graphene.Schema:
+    """Build a new schema from the current content types; ``get_schema`` caches the result."""
     try:
-        content_types = ContentTypeDefinition.objects.filter(is_active=True).prefetch_related("fields")
+        content_types = all_content_types(active_only=True)
     except OperationalError:
         return graphene.Schema(query=_fallback_query())
-    media_type = _build_graphene_type(MediaFile)
+    return _build_schema(content_types)[0]
 
-    type_map = {}
-    for content_type in content_types:
-        model = get_dynamic_model(content_type)
-        type_map[content_type.slug] = _build_graphene_type(model)
 
-    query_cls = _build_query(content_types, type_map, media_type)
-    mutation_cls = _build_mutation(content_types, type_map)
+def _build_schema(content_types, create_missing: bool = True) -> tuple[graphene.Schema, dict[str, type]]:
+    """Build the schema and return it with the models it was built from.
+
+    Every model is loaded before the first graphene type is built: loading a
+    type lazily syncs it, which rebuilds its relation targets, so types built
+    one at a time would point at classes that were replaced since.
+    """
+    with batch_registration():
+        load_all_models(create_missing=create_missing)
+        models = loaded_models()
+        content_types = [content_type for content_type in content_types if content_type.slug in models]
+        media_type = _build_graphene_type(MediaFile)
+
+        type_map = {}
+        for content_type in content_types:
+            type_map[content_type.slug] = _build_graphene_type(models[content_type.slug])
+
+        query_cls = _build_query(content_types, models, type_map, media_type)
+        mutation_cls = _build_mutation(content_types, models, type_map)
 
-    return graphene.Schema(query=query_cls, mutation=mutation_cls)
+    return graphene.Schema(query=query_cls, mutation=mutation_cls), models
 
 
 def _fallback_query():
@@ -41,18 +107,42 @@ def _fallback_query():
     return Query
 
 
-def _build_graphene_type(model):
+def _build_graphene_type(model_class):
     class Meta:
-        model = model
+        model = model_class
         fields = "__all__"
 
-    return type(f"{model.__name__}Type", (DjangoObjectType,), {"Meta": Meta})
+    attrs = {"Meta": Meta}
+    for name, field in get_model_fields(model_class):
+        if field.is_relation:
+            attrs[f"resolve_{name}"] = _make_relation_resolver(name, field)
+    return type(f"{model_class.__name__}Type", (DjangoObjectType,), attrs)
+
+
+def _make_relation_resolver(name: str, field):
+    """Resolve a relation through the request's loader, which batches it across the objects of a level."""
+    many = field.many_to_many or field.one_to_many
+
+    def resolver(root, info, **kwargs):
+        loader = get_loaders(info).relation(type(root), name, many)
+        return loader.aload(root) if _running_async() else loader.load(root)
+
+    return resolver
+
+
+def _running_async() -> bool:
+    """True inside the event loop (``schema.execute_async``); sync execution runs outside any loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
 
 
-def _build_query(content_types, type_map, media_type):
+def _build_query(content_types, models, type_map, media_type):
     attrs = {}
     for content_type in content_types:
-        model = get_dynamic_model(content_type)
+        model = models[content_type.slug]
         gql_type = type_map[content_type.slug]
         list_name = _to_snake(content_type.plural_name or f"{content_type.slug}s")
         detail_name = _to_snake(content_type.slug)
@@ -71,15 +161,15 @@ def _build_query(content_types, type_map, media_type):
     return type("Query", (graphene.ObjectType,), attrs)
 
 
-def _build_mutation(content_types, type_map):
+def _build_mutation(content_types, models, type_map):
     attrs = {}
     for content_type in content_types:
-        model = get_dynamic_model(content_type)
+        model = models[content_type.slug]
         gql_type = type_map[content_type.slug]
         base_name = _to_snake(content_type.slug)
 
-        create_mutation = _build_create_mutation(model, gql_type, content_type.fields.all())
-        update_mutation = _build_update_mutation(model, gql_type, content_type.fields.all())
+        create_mutation = _build_create_mutation(model, gql_type, content_type.fields)
+        update_mutation = _build_update_mutation(model, gql_type, content_type.fields)
         delete_mutation = _build_delete_mutation(model)
 
         attrs[f"create_{base_name}"] = create_mutation.Field()
@@ -96,8 +186,10 @@ def _build_create_mutation(model, gql_type, field_defs):
     def mutate(root, info, **kwargs):
         _require_perm(info, f"content.add_{model._meta.model_name}")
         data, m2m_data = _split_relations(model, field_defs, kwargs)
+        run_hooks("pre_create", data=kwargs, request=info.context)
         instance = model.objects.create(**data)
         _apply_m2m(instance, m2m_data)
+        run_hooks("post_create", instance=instance, request=info.context)
         return mutation_class(ok=True, result=instance)
 
     attrs = {
@@ -119,10 +211,12 @@ def _build_update_mutation(model, gql_type, field_defs):
         instance = model.objects.get(pk=kwargs.pop("id"))
         _require_perm(info, f"content.change_{model._meta.model_name}", obj=instance)
         data, m2m_data = _split_relations(model, field_defs, kwargs)
+        run_hooks("pre_update", instance=instance, data=kwargs, request=info.context)
         for key, value in data.items():
             setattr(instance, key, value)
         instance.save()
         _apply_m2m(instance, m2m_data)
+        run_hooks("post_update", instance=instance, request=info.context)
         return mutation_class(ok=True, result=instance)
 
     attrs = {
@@ -142,7 +236,9 @@ def _build_delete_mutation(model):
     def mutate(root, info, id):
         instance = model.objects.get(pk=id)
         _require_perm(info, f"content.delete_{model._meta.model_name}", obj=instance)
+        run_hooks("pre_delete", instance=instance, request=info.context)
         instance.delete()
+        run_hooks("post_delete", instance=instance, request=info.context)
         return mutation_class(ok=True)
 
     attrs = {
@@ -165,7 +261,7 @@ def _build_mutation_arguments(field_defs, include_id: bool, force_optional: bool
     return type("Arguments", (), attrs)
 
 
-def _graphene_field_for_def(field_def: ContentFieldDefinition, force_optional: bool = False):
+def _graphene_field_for_def(field_def: FieldSnapshot, force_optional: bool = False):
     required = field_def.required and not force_optional
     if field_def.field_type == ContentFieldDefinition.FIELD_TEXT:
         return graphene.String(required=required)
@@ -197,14 +293,20 @@ def _attach_base_arguments(arguments, model, force_optional: bool):
 
 def _make_list_resolver(model):
     def resolver(root, info):
+        if _running_async():
+            return _alist(info, model)
         _require_perm(info, _perm_for_model("view", model))
-        return model.objects.all()
+        instances = list(model.objects.all())
+        get_loaders(info).add_batch(instances)
+        return instances
 
     return resolver
 
 
 def _make_detail_resolver(model):
     def resolver(root, info, id):
+        if _running_async():
+            return _adetail(info, model, id)
         instance = model.objects.get(pk=id)
         _require_perm(info, _perm_for_model("view", model), obj=instance)
         return instance
@@ -212,6 +314,17 @@ def _make_detail_resolver(model):
     return resolver
 
 
+async def _alist(info, model):
+    await _arequire_perm(info, _perm_for_model("view", model))
+    return [instance async for instance in model.objects.all()]
+
+
+async def _adetail(info, model, id):
+    instance = await model.objects.aget(pk=id)
+    await _arequire_perm(info, _perm_for_model("view", model), obj=instance)
+    return instance
+
+
 def _require_perm(info, perm: str, obj=None):
     request = info.context
     user = getattr(request, "user", None)
@@ -220,7 +333,21 @@ def _require_perm(info, perm: str, obj=None):
     if not user.has_perm(perm, obj=obj):
         raise GraphQLError("Permission denied")
 
-    if isinstance(request.auth, ApiTokenCredentials) and not token_has_permission(request.auth.token, perm):
+    auth = getattr(request, "auth", None)
+    if isinstance(auth, ApiTokenCredentials) and not token_has_permission(auth.token, perm):
+        raise GraphQLError("API token not authorized")
+
+
+async def _arequire_perm(info, perm: str, obj=None):
+    request = info.context
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        raise GraphQLError("Authentication required")
+    if not await user.ahas_perm(perm, obj=obj):
+        raise GraphQLError("Permission denied")
+
+    auth = getattr(request, "auth", None)
+    if isinstance(auth, ApiTokenCredentials) and not await atoken_has_permission(auth.token, perm):
         raise GraphQLError("API token not authorized")
 
 
@@ -1,6 +1,13 @@
+import logging
+import time
+
 import graphene
+from django.db import DatabaseError
+
+from contro.apps.graphql.dynamic import get_schema
 
-from contro.apps.graphql.dynamic import build_schema
+
+logger = logging.getLogger(__name__)
 
 
 class FallbackQuery(graphene.ObjectType):
@@ -10,7 +17,54 @@ class FallbackQuery(graphene.ObjectType):
         return "Contro GraphQL API"
 
 
-try:
-    schema = build_schema()
-except Exception:
-    schema = graphene.Schema(query=FallbackQuery)
+class CurrentSchema:
+    """What ``GRAPHENE["SCHEMA"]`` points at: the schema of the loaded generation.
+
+    graphene-django imports that setting once per process, so a built schema
+    there would go stale. This is not a ``graphene.Schema``; it forwards what
+    tools such as ``manage.py graphql_schema`` use to ``current_schema()``.
+    The views take their schema from ``get_schema()`` directly.
+    """
+
+    @property
+    def graphql_schema(self):
+        return current_schema().graphql_schema
+
+    def introspect(self):
+        return current_schema().introspect()
+
+    def execute(self, *args, **kwargs):
+        return current_schema().execute(*args, **kwargs)
+
+    async def execute_async(self, *args, **kwargs):
+        return await current_schema().execute_async(*args, **kwargs)
+
+    def __str__(self):
+        return str(current_schema())
+
+
+def current_schema() -> graphene.Schema:
+    """``get_schema()``, or a placeholder schema while the database is unavailable."""
+    try:
+        return get_schema()
+    except DatabaseError:
+        return graphene.Schema(query=FallbackQuery)
+
+
+schema = CurrentSchema()
+
+
+def warm_up_schema(result=None):
+    """Build the cached schema so it covers every loaded content type, without creating tables."""
+    started = time.perf_counter()
+    try:
+        built_schema = get_schema(create_missing=False)
+    except DatabaseError as exc:
+        logger.warning("GraphQL warm-up skipped, database unavailable: %s", exc)
+        built_schema = None
+    elapsed = time.perf_counter() - started
+    logger.info("GraphQL schema warm-up took %.1fms", elapsed * 1000)
+    if result is not None:
+        result.duration += elapsed
+        result.graphql_schema = built_schema is not None
+    return built_schema or current_schema()
@@ -1,17 +1,36 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import AnonymousUser
-from graphene_django.views import GraphQLView
+from django.http import HttpResponse, HttpResponseBadRequest
+from django.views.decorators.csrf import ensure_csrf_cookie
+from graphene_django.settings import graphene_settings
+from graphene_django.utils.utils import set_rollback
+from graphene_django.views import GraphQLView, HttpError
+from graphql import (
+    ExecutionResult,
+    GraphQLError,
+    OperationType,
+    execute,
+    get_operation_ast,
+    parse,
+    validate,
+    validate_schema,
+)
+from graphql.pyutils import is_awaitable
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
-from contro.apps.graphql.dynamic import build_schema
-from contro.apps.iam.authentication import ApiTokenAuthentication
+from contro.apps.api.encoding import dumps, loads
+from contro.apps.graphql.dynamic import aget_schema, get_schema
+from contro.apps.iam.authentication import ASYNC_AUTHENTICATION_CLASSES, ApiTokenAuthentication
 
 
 class DynamicGraphQLView(GraphQLView):
     authentication_classes = (ApiTokenAuthentication, JWTAuthentication)
+    async_authentication_classes = ASYNC_AUTHENTICATION_CLASSES
 
-    def get_schema(self, request=None):
-        return build_schema()
+    def __init__(self, schema=None, **kwargs):
+        # A view instance serves one request, which keeps the schema current when it started.
+        super().__init__(schema=schema or get_schema(), **kwargs)
 
     def get_context(self, request):
         if not getattr(request, "user", None) or not request.user.is_authenticated:
@@ -26,3 +45,117 @@ class DynamicGraphQLView(GraphQLView):
         if not getattr(request, "user", None):
             request.user = AnonymousUser()
         return request
+
+    def json_encode(self, request, d, pretty=False):
+        if self.pretty or pretty:
+            return super().json_encode(request, d, pretty=pretty)
+        return dumps(d)
+
+    def parse_body(self, request):
+        if self.get_content_type(request) != "application/json":
+            return super().parse_body(request)
+        # GraphQLView.parse_body, decoding through orjson when it is installed.
+        try:
+            request_json = loads(request.body)
+        except ValueError:
+            raise HttpError(HttpResponseBadRequest("POST body sent invalid JSON."))
+        if self.batch:
+            if not isinstance(request_json, list):
+                raise HttpError(
+                    HttpResponseBadRequest(f"Batch requests should receive a list, but received {request_json!r}.")
+                )
+            if not request_json:
+                raise HttpError(HttpResponseBadRequest("Received an empty list in the batch request."))
+        elif not isinstance(request_json, dict):
+            raise HttpError(HttpResponseBadRequest("The received data is not a valid JSON query."))
+        return request_json
+
+    async def aget_context(self, request):
+        if hasattr(request, "auser"):
+            request.user = await request.auser()
+        if not getattr(request, "user", None) or not request.user.is_authenticated:
+            for auth_class in self.async_authentication_classes:
+                try:
+                    result = await auth_class().aauthenticate(request)
+                except AuthenticationFailed:
+                    result = None
+                if result:
+                    request.user, request.auth = result
+                    break
+        if not getattr(request, "user", None):
+            request.user = AnonymousUser()
+        return request
+
+    async def aexecute(self, request):
+        """Run a single query operation with async resolvers.
+
+        Returns ``None`` for what ``dispatch`` should handle instead: mutations,
+        batches, GraphiQL, and requests that fail before execution.
+        """
+        if request.method not in ("GET", "POST") or self.batch:
+            return None
+        try:
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                return None
+            query, variables, operation_name, _ = self.get_graphql_params(request, data)
+        except HttpError:
+            return None
+        if not query:
+            return None
+
+        schema = self.schema.graphql_schema
+        try:
+            document = parse(query)
+        except GraphQLError:
+            return None
+        operation = get_operation_ast(document, operation_name)
+        if operation is None or operation.operation != OperationType.QUERY:
+            return None
+        if validate_schema(schema) or validate(
+            schema, document, self.validation_rules, graphene_settings.MAX_VALIDATION_ERRORS
+        ):
+            return None
+
+        execute_options = {
+            "root_value": self.get_root_value(request),
+            "context_value": await self.aget_context(request),
+            "variable_values": variables,
+            "operation_name": operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options["execution_context_class"] = self.execution_context_class
+        try:
+            result = execute(schema, document, **execute_options)
+            if is_awaitable(result):
+                result = await result
+        except Exception as exc:
+            result = ExecutionResult(errors=[exc])
+
+        # Same body and status as GraphQLView.get_response.
+        response, status_code = {}, 200
+        if result.errors:
+            set_rollback()
+            response["errors"] = [self.format_error(error) for error in result.errors]
+        if result.errors and any(not getattr(error, "path", None) for error in result.errors):
+            status_code = 400
+        else:
+            response["data"] = result.data
+        return HttpResponse(
+            status=status_code, content=self.json_encode(request, response), content_type="application/json"
+        )
+
+
+def async_graphql_view(**initkwargs):
+    """``/graphql/`` for ASGI: queries run on ``aexecute``, everything else on the synchronous view in a thread."""
+    fallback = sync_to_async(DynamicGraphQLView.as_view(**initkwargs))
+
+    @ensure_csrf_cookie
+    async def view(request, *args, **kwargs):
+        response = await DynamicGraphQLView(schema=await aget_schema(), **initkwargs).aexecute(request)
+        if response is None:
+            return await fallback(request, *args, **kwargs)
+        return response
+
+    return view
@@ -5,6 +5,10 @@ from dataclasses import dataclass
 from django.utils import timezone
 from rest_framework import authentication, exceptions
 from rest_framework.authentication import get_authorization_header
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
 
 from contro.apps.iam.models import ApiToken
 
@@ -41,6 +45,29 @@ class ApiTokenAuthentication(authentication.BaseAuthentication):
 
         return (api_token.user, ApiTokenCredentials(token=api_token, raw_token=raw_token))
 
+    async def aauthenticate(self, request):
+        raw_token = self._get_token_from_headers(request)
+        if not raw_token:
+            return None
+
+        token_hash = ApiToken.hash_token(raw_token)
+        try:
+            api_token = (
+                await ApiToken.objects.select_related("user")
+                .prefetch_related("permissions")
+                .aget(token_hash=token_hash)
+            )
+        except ApiToken.DoesNotExist:
+            raise exceptions.AuthenticationFailed("Invalid API token.")
+
+        if not api_token.is_active or api_token.is_expired():
+            raise exceptions.AuthenticationFailed("API token is inactive or expired.")
+
+        api_token.last_used_at = timezone.now()
+        await api_token.asave(update_fields=["last_used_at"])
+
+        return (api_token.user, ApiTokenCredentials(token=api_token, raw_token=raw_token))
+
     def authenticate_header(self, request):
         return self.keyword
 
@@ -56,3 +83,53 @@ class ApiTokenAuthentication(authentication.BaseAuthentication):
             return token.strip()
 
         return None
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` with an ``aauthenticate`` that loads the user through the async ORM."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        """Mirror of ``JWTAuthentication.get_user``."""
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError as exc:
+            raise InvalidToken("Token contained no recognizable user identification") from exc
+
+        try:
+            user = await self.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist as exc:
+            raise exceptions.AuthenticationFailed("User not found", code="user_not_found") from exc
+
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise exceptions.AuthenticationFailed("User is inactive", code="user_inactive")
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise exceptions.AuthenticationFailed("The user's password has been changed.", code="password_changed")
+        return user
+
+
+# Async counterparts of the API's DEFAULT_AUTHENTICATION_CLASSES, in the same order.
+ASYNC_AUTHENTICATION_CLASSES = (ApiTokenAuthentication, AsyncJWTAuthentication)
+
+
+async def aauthenticate(request):
+    """Authenticate ``request`` like the API's authentication classes, on the async ORM.
+
+    Returns ``(user, auth)`` or ``None``; bad credentials raise ``AuthenticationFailed``.
+    """
+    for auth_class in ASYNC_AUTHENTICATION_CLASSES:
+        result = await auth_class().aauthenticate(request)
+        if result is not None:
+            return result
+    return None
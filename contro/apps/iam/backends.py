@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import Permission
 from django.contrib.contenttypes.models import ContentType
 
@@ -27,6 +28,21 @@ class RolePermissionBackend:
 
         return self._user_has_object_permission(user_obj, perm_obj, obj)
 
+    async def ahas_perm(self, user_obj, perm, obj=None):
+        if not user_obj or not user_obj.is_active:
+            return False
+        if user_obj.is_superuser:
+            return True
+
+        perm_obj = await self._aresolve_permission(perm)
+        if not perm_obj:
+            return False
+
+        if obj is None:
+            return await Role.objects.filter(users=user_obj, permissions=perm_obj).aexists()
+
+        return await self._auser_has_object_permission(user_obj, perm_obj, obj)
+
     def has_module_perms(self, user_obj, app_label):
         if not user_obj or not user_obj.is_active:
             return False
@@ -50,6 +66,16 @@ class RolePermissionBackend:
         except Permission.DoesNotExist:
             return None
 
+    @staticmethod
+    async def _aresolve_permission(perm):
+        if not perm or "." not in perm:
+            return None
+        app_label, codename = perm.split(".", 1)
+        try:
+            return await Permission.objects.aget(content_type__app_label=app_label, codename=codename)
+        except Permission.DoesNotExist:
+            return None
+
     @staticmethod
     def _user_has_role_permission(user, perm_obj: Permission) -> bool:
         return Role.objects.filter(users=user, permissions=perm_obj).exists()
@@ -73,3 +99,26 @@ class RolePermissionBackend:
             content_type=content_type,
             object_id=object_id,
         ).exists()
+
+    @staticmethod
+    async def _auser_has_object_permission(user, perm_obj: Permission, obj) -> bool:
+        try:
+            content_type = ContentType.objects._get_from_cache(obj._meta)
+        except KeyError:
+            content_type = await sync_to_async(ContentType.objects.get_for_model)(obj)
+        object_id = str(obj.pk)
+
+        if await ObjectPermission.objects.filter(
+            permission=perm_obj,
+            user=user,
+            content_type=content_type,
+            object_id=object_id,
+        ).aexists():
+            return True
+
+        return await ObjectPermission.objects.filter(
+            permission=perm_obj,
+            role__in=user.roles.all(),
+            content_type=content_type,
+            object_id=object_id,
+        ).aexists()
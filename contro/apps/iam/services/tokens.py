@@ -57,3 +57,16 @@ def token_has_permission(api_token: ApiToken, perm: str) -> bool:
         content_type__app_label=app_label,
         codename=codename,
     ).exists()
+
+
+async def atoken_has_permission(api_token: ApiToken, perm: str) -> bool:
+    if not await api_token.permissions.aexists():
+        return True
+
+    if "." not in perm:
+        return False
+    app_label, codename = perm.split(".", 1)
+    return await api_token.permissions.filter(
+        content_type__app_label=app_label,
+        codename=codename,
+    ).aexists()
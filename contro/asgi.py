@@ -1,7 +1,13 @@
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "contro.settings")
 
 application = get_asgi_application()
+
+if settings.CONTRO_WARMUP:
+    from contro.apps.content.services.warmup import warm_up_in_thread
+
+    warm_up_in_thread()
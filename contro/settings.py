@@ -49,6 +49,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "contro.apps.content.middleware.SchemaGenerationMiddleware",
 ]
 
 ROOT_URLCONF = "contro.urls"
@@ -141,6 +142,16 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
         "rest_framework.filters.SearchFilter",
     ),
+    # DRF's JSON classes, through orjson when it is installed.
+    "DEFAULT_RENDERER_CLASSES": (
+        "contro.apps.api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "contro.apps.api.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
 }
 
 # JWT duration parsing
@@ -179,6 +190,38 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# Dynamic content
+# Build dynamic models, serializers and the GraphQL schema when contro.wsgi/contro.asgi load, not on first request.
+CONTRO_WARMUP = env.bool("CONTRO_WARMUP", default=False)
+# Serve content reads and GraphQL queries through async views; enable when running under ASGI.
+CONTRO_ASYNC_VIEWS = env.bool("CONTRO_ASYNC_VIEWS", default=False)
+# Cursor pagination of content lists; content types may set metadata.pagination.page_size up to the maximum.
+CONTRO_API_PAGE_SIZE = env.int("CONTRO_API_PAGE_SIZE", default=25)
+CONTRO_API_MAX_PAGE_SIZE = env.int("CONTRO_API_MAX_PAGE_SIZE", default=100)
+# Totals in paginated lists: "exact", "estimated" (planner statistics above the threshold) or "none"; metadata.pagination.count overrides.
+CONTRO_API_COUNT_STRATEGY = env("CONTRO_API_COUNT_STRATEGY", default="none")
+CONTRO_API_COUNT_ESTIMATE_THRESHOLD = env.int("CONTRO_API_COUNT_ESTIMATE_THRESHOLD", default=100000)
+# Serializer classes kept for ?fields= projections.
+CONTRO_API_SERIALIZER_CACHE_SIZE = env.int("CONTRO_API_SERIALIZER_CACHE_SIZE", default=256)
+# Serve reads without ?populate= through compiled serializers over .values() rows.
+CONTRO_API_COMPILED_SERIALIZERS = env.bool("CONTRO_API_COMPILED_SERIALIZERS", default=True)
+# Deepest relation path accepted by ?populate= (e.g. 2 allows "author.avatar").
+CONTRO_API_POPULATE_MAX_DEPTH = env.int("CONTRO_API_POPULATE_MAX_DEPTH", default=2)
+# Relations a filters[...] path may cross (e.g. 1 allows filters[author][name]).
+CONTRO_API_FILTER_MAX_DEPTH = env.int("CONTRO_API_FILTER_MAX_DEPTH", default=2)
+# Reject filters no index can answer on tables estimated above this many rows; 0 disables, metadata.filtering overrides.
+CONTRO_API_FILTER_MAX_UNINDEXED_ROWS = env.int("CONTRO_API_FILTER_MAX_UNINDEXED_ROWS", default=0)
+# Bulk endpoints: items accepted per request and entries written per transaction.
+CONTRO_API_BULK_MAX_ITEMS = env.int("CONTRO_API_BULK_MAX_ITEMS", default=1000)
+CONTRO_API_BULK_CHUNK_SIZE = env.int("CONTRO_API_BULK_CHUNK_SIZE", default=500)
+# Seconds content reads stay in the response cache; 0 disables it. Use a cache shared by all workers.
+CONTRO_API_CACHE_TIMEOUT = env.int("CONTRO_API_CACHE_TIMEOUT", default=0)
+CONTRO_API_CACHE_ALIAS = env("CONTRO_API_CACHE_ALIAS", default="default")
+# Unpaginated JSON lists longer than this are streamed in chunks instead of encoded in one piece; 0 disables.
+CONTRO_API_STREAM_MIN_ROWS = env.int("CONTRO_API_STREAM_MIN_ROWS", default=1000)
+# Rows fetched per round trip by content exports.
+CONTRO_EXPORT_CHUNK_SIZE = env.int("CONTRO_EXPORT_CHUNK_SIZE", default=2000)
+
 # Graphene
 GRAPHENE = {
     "SCHEMA": "contro.apps.graphql.schema.schema",
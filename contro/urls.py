@@ -3,7 +3,13 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import RedirectView
-from contro.apps.graphql.views import DynamicGraphQLView
+from contro.apps.graphql.views import DynamicGraphQLView, async_graphql_view
+
+graphql_view = (
+    async_graphql_view(graphiql=settings.DEBUG)
+    if settings.CONTRO_ASYNC_VIEWS
+    else DynamicGraphQLView.as_view(graphiql=settings.DEBUG)
+)
 
 urlpatterns = [
     path("", RedirectView.as_view(pattern_name="iam:dashboard", permanent=False)),
@@ -12,7 +18,7 @@ urlpatterns = [
     path("iam/", include("contro.apps.iam.urls")),
     path("content/", include("contro.apps.content.urls")),
     path("media/", include("contro.apps.media.urls")),
-    path("graphql/", DynamicGraphQLView.as_view(graphiql=settings.DEBUG)),
+    path("graphql/", graphql_view),
 ]
 
 if settings.DEBUG:
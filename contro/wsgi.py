@@ -1,7 +1,13 @@
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "contro.settings")
 
 application = get_wsgi_application()
+
+if settings.CONTRO_WARMUP:
+    from contro.apps.content.services.warmup import warm_up
+
+    warm_up()